@@ -0,0 +1,57 @@
+"""Measure the temporary memory allocated by each fidelity of each function.
+
+The peak memory traced by ``tracemalloc`` during a single call with ``N`` rows
+is reported as the number of simultaneously allocated arrays of ``N`` floats,
+including the output array itself. Both regular row-major input and columnar
+input (mf2.Columns of 1D arrays) are measured.
+"""
+from collections import namedtuple
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import mf2
+
+
+N = 100_000
+Record = namedtuple('Record', 'ndim name fidelity input peak_bytes arrays_of_N')
+
+
+def peak_allocation(func, X):
+    func(X)  # warm-up, e.g. for cached constants
+    tracemalloc.start()
+    try:
+        func(X)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def create_allocation_data():
+    records = []
+    bi_fidelity_functions = [
+        *mf2.bi_fidelity_functions,
+        *[func(0.5) for func in mf2.adjustable.bi_fidelity_functions]
+    ]
+
+    rng = np.random.default_rng(20221014)
+    for func in bi_fidelity_functions:
+        X = rng.uniform(func.l_bound, func.u_bound, size=(N, func.ndim))
+        inputs = {'rows': X, 'columns': mf2.Columns(*np.ascontiguousarray(X.T))}
+        for fid in func.fidelity_names:
+            for input_name, X_in in inputs.items():
+                peak = peak_allocation(func[fid], X_in)
+                records.append(Record(func.ndim, func.name, fid, input_name,
+                                      peak, peak / (N * 8)))
+
+    return pd.DataFrame.from_records(records, columns=Record._fields)
+
+
+if __name__ == '__main__':
+    df = create_allocation_data()
+    table = df.pivot_table(index=['ndim', 'name'], columns=['fidelity', 'input'],
+                           values='arrays_of_N')
+    with pd.option_context('display.width', 120, 'display.float_format', '{:.1f}'.format):
+        print(table)
@@ -0,0 +1,68 @@
+"""Compute the correlation lookup tables for the adjustable functions.
+
+The resulting tables are stored as ``correlation_table`` in the modules in
+``mf2/adjustable/`` and used by ``AdjustableMultiFidelityFunction.for_correlation``.
+For every function, `a` is sampled along the range in which the correlation
+between high- and low-fidelity changes monotonically. The same random sample
+is reused for every value of `a`, which keeps the estimated curve smooth.
+"""
+import numpy as np
+
+import mf2
+
+
+NUM_SAMPLES = 1_000_000
+NUM_ENTRIES = 41
+SEED = 20221014
+
+
+def correlation(func, a, X, y_high):
+    y_low = func(a).low(X)
+    return np.corrcoef(y_high, y_low)[0, 1]
+
+
+def peak_of_correlation(func, X, y_high, lower, upper, tol=1e-4):
+    """Golden-section search for the `a` with maximum correlation"""
+    inv_phi = (np.sqrt(5) - 1) / 2
+    while upper - lower > tol:
+        a1 = upper - inv_phi * (upper - lower)
+        a2 = lower + inv_phi * (upper - lower)
+        if correlation(func, a1, X, y_high) > correlation(func, a2, X, y_high):
+            upper = a2
+        else:
+            lower = a1
+    return (lower + upper) / 2
+
+
+def create_table(func, a_start, a_end, rng):
+    X = rng.uniform(func.l_bound, func.u_bound, size=(NUM_SAMPLES, func.ndim))
+    y_high = func.high(X)
+    if a_end is None:
+        a_end = peak_of_correlation(func, X, y_high, a_start, 1)
+
+    a_values = np.linspace(a_start, a_end, NUM_ENTRIES)
+    correlations = [correlation(func, a, X, y_high) for a in a_values]
+    return a_values, correlations
+
+
+def format_table(a_values, correlations):
+    lines = ['correlation_table = (']
+    for a, r in zip(a_values, correlations):
+        lines.append(f'    ({a: .6f}, {r: .6f}),')
+    lines.append(')')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(SEED)
+    branches = [
+        # function               a_start  a_end (None: at maximum correlation)
+        (mf2.adjustable.branin,    -0.5,   1),
+        (mf2.adjustable.paciorek,   0,     1),
+        (mf2.adjustable.hartmann3,  1/3,   1),
+        (mf2.adjustable.trid,       0,     None),
+    ]
+    for func, a_start, a_end in branches:
+        print(f'# {func.name}')
+        print(format_table(*create_table(func, a_start, a_end, rng)))
+        print()
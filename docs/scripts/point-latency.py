@@ -0,0 +1,44 @@
+"""Compare the latency of evaluating a single point with the vectorized
+fidelity functions and with their scalar ``.point`` fast path.
+"""
+from collections import namedtuple
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+import mf2
+
+
+NUMBER = 10_000
+Record = namedtuple('Record', 'ndim name fidelity vectorized_us point_us speedup')
+
+
+def latency(func, x):
+    """Best time per call in microseconds"""
+    return min(repeat(lambda: func(x), number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+
+def create_latency_data():
+    records = []
+    bi_fidelity_functions = [
+        *mf2.bi_fidelity_functions,
+        *[func(0.5) for func in mf2.adjustable.bi_fidelity_functions]
+    ]
+
+    rng = np.random.default_rng(20221014)
+    for func in bi_fidelity_functions:
+        x = rng.uniform(func.l_bound, func.u_bound).tolist()
+        for fid in func.fidelity_names:
+            vectorized = latency(func[fid], x)
+            point = latency(func[fid].point, x)
+            records.append(Record(func.ndim, func.name, fid,
+                                  vectorized, point, vectorized / point))
+
+    return pd.DataFrame.from_records(records, columns=Record._fields)
+
+
+if __name__ == '__main__':
+    df = create_latency_data()
+    with pd.option_context('display.width', 120, 'display.float_format', '{:.2f}'.format):
+        print(df.to_string(index=False))
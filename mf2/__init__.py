@@ -4,42 +4,78 @@
 mf2
 
 A collection of analytical functions with 2 or more available fidelities.
+
+Functions and utility modules are only imported on first access, so that e.g.
+``import mf2.registry`` does not import any function.
 """
-from .multi_fidelity_function import MultiFidelityFunction, invert
-from .borehole import borehole
-from .currin import currin
-from .park91a import park91a
-from .park91b import park91b
-from .bohachevsky import bohachevsky
-from .branin import branin
-from .booth import booth
-from .forrester import forrester, Forrester
-from .himmelblau import himmelblau
-from .six_hump_camelback import six_hump_camelback
-from .hartmann import hartmann6
-
-import mf2.adjustable
+
+from importlib import import_module
 
 __author__ = 'Sander van Rijn'
 __email__ = 's.j.van.rijn@liacs.leidenuniv.nl'
 __version__ = '2022.06.0'
 
 
-bi_fidelity_functions = (
+#: Attributes of this package, and the module that each is imported from
+_attributes = {
+    'MultiFidelityFunction': 'multi_fidelity_function',
+    'invert': 'multi_fidelity_function',
+    'Columns': 'multi_fidelity_function',
+    'borehole': 'borehole',
+    'currin': 'currin',
+    'park91a': 'park91a',
+    'park91b': 'park91b',
+    'bohachevsky': 'bohachevsky',
+    'branin': 'branin',
+    'booth': 'booth',
+    'forrester': 'forrester',
+    'Forrester': 'forrester',
+    'himmelblau': 'himmelblau',
+    'six_hump_camelback': 'six_hump_camelback',
+    'hartmann6': 'hartmann',
+}
+
+_submodules = (
+    'adjustable', 'registry', 'handles', 'coalesce', 'additive', 'continuous',
+    'tracing', 'chunking', 'grid', 'incremental', 'recording', 'campaign',
+    'design', 'accuracy', 'instances', 'vectorize', 'external', 'reductions',
+    'cache', 'workspace',
+)
+
+_bi_fidelity_names = (
     # 1D
-    forrester,
+    'forrester',
     # 2D
-    bohachevsky,
-    booth,
-    branin,
-    currin,
-    himmelblau,
-    six_hump_camelback,
+    'bohachevsky',
+    'booth',
+    'branin',
+    'currin',
+    'himmelblau',
+    'six_hump_camelback',
     # 4D
-    park91a,
-    park91b,
+    'park91a',
+    'park91b',
     # 6D
-    hartmann6,
+    'hartmann6',
     # 8D
-    borehole,
+    'borehole',
 )
+
+__all__ = [*_attributes, 'bi_fidelity_functions']
+
+
+def __getattr__(name):
+    if name in _attributes:
+        value = getattr(import_module(f'.{_attributes[name]}', __name__), name)
+    elif name in _submodules:
+        value = import_module(f'.{name}', __name__)
+    elif name == 'bi_fidelity_functions':
+        value = tuple(__getattr__(func) for func in _bi_fidelity_names)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_attributes, *_submodules, 'bi_fidelity_functions'})
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+accuracy.py:
+
+Accuracy of a surrogate model of a fidelity function on very large test sets.
+The test design is generated and evaluated in chunks, and all error measures
+are accumulated per chunk, so neither the full design nor the full vectors of
+true and predicted values are needed in memory.
+
+* RMSE, MAE and maximum error are kept as running sums and maximum.
+* R² uses the running mean and sum of squared deviations of the true values,
+  merged per chunk with the parallel variant of Welford's algorithm for
+  numerical stability.
+* Quantiles of the absolute error are computed from a uniform random sample
+  of at most `sample_size` errors, kept in a :class:`~mf2.reductions.Reservoir`.
+  They are exact as long as the test set is not larger than the sample.
+
+Example:
+
+    >>> report = surrogate_accuracy(model.predict, mf2.hartmann6, 'high',
+    ...                             num_points=10**7, seed=0)
+    >>> report.rmse, report.r2, report.quantiles[0.99]
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .design import uniform_chunks
+from .reductions import Reservoir
+
+
+#: Summary of the accuracy of a surrogate. `quantiles` maps each quantile
+#: level to the corresponding quantile of the absolute error.
+AccuracyReport = namedtuple('AccuracyReport', ['num_points', 'rmse', 'mae', 'r2',
+                                               'max_error', 'quantiles'])
+
+
+def surrogate_accuracy(predict, mff, fidelity='high', num_points=10**6, *,
+                       design=None, seed=None, chunk_size=None,
+                       quantiles=(0.5, 0.9, 0.99), sample_size=100_000,
+                       concurrent=True) -> AccuracyReport:
+    """Compare `predict` with a fidelity of `mff` on a large test design
+
+    :param predict:     Surrogate model prediction, called with a chunk of
+                        points of shape ``(n, ndim)``
+    :param mff:         MultiFidelityFunction to compare with
+    :param fidelity:    Name or index of the fidelity used as ground truth
+    :param num_points:  Number of uniform random test points, if no `design`
+                        is given
+    :param design:      Iterable of chunks of test points instead of the
+                        uniform random design of :func:`~mf2.design.uniform_chunks`
+    :param seed:        Seed of the uniform random design and error sample
+    :param chunk_size:  Number of points per chunk of the uniform random design
+    :param quantiles:   Quantile levels of the absolute error to report
+    :param sample_size: Maximum number of errors kept for the quantiles
+    :param concurrent:  If True, evaluate the fidelity and `predict` for each
+                        chunk in parallel threads
+    :return:            AccuracyReport
+    """
+    func = mff[fidelity]
+    if design is None:
+        design = uniform_chunks(mff, num_points, chunk_size, seed)
+
+    statistics = AccuracyStatistics(sample_size, seed)
+    if not concurrent:
+        for X in design:
+            statistics.update(func(X), predict(X))
+        return statistics.report(quantiles)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for X in design:
+            y_true = pool.submit(func, X)
+            y_pred = pool.submit(predict, X)
+            statistics.update(y_true.result(), y_pred.result())
+    return statistics.report(quantiles)
+
+
+class AccuracyStatistics:
+    """Error measures of predictions, accumulated in chunks"""
+
+    def __init__(self, sample_size=100_000, seed=None):
+        """
+        :param sample_size: Maximum number of absolute errors to keep for the
+                            quantiles
+        :param seed:        Seed for the random sample of errors
+        """
+        self.num_points = 0
+        self.sum_squared_error = 0.0
+        self.sum_absolute_error = 0.0
+        self.max_error = 0.0
+        self.mean_true = 0.0
+        self.sum_squared_deviation = 0.0  # of the true values
+
+        self.reservoir = Reservoir(sample_size, seed)
+        self._num_chunks = 0
+
+    def update(self, y_true, y_pred):
+        """Add a chunk of true and predicted values"""
+        y_true = np.asarray(y_true, dtype=float).reshape(-1)
+        y_pred = np.asarray(y_pred, dtype=float).reshape(-1)
+        if y_true.shape != y_pred.shape:
+            raise ValueError(f"Got {len(y_pred)} predictions for {len(y_true)} true values")
+        if not len(y_true):
+            return
+
+        errors = np.abs(y_pred - y_true)
+        self.sum_squared_error += float(errors @ errors)
+        self.sum_absolute_error += float(np.sum(errors))
+        self.max_error = max(self.max_error, float(np.max(errors)))
+
+        # merge mean and sum of squared deviations of this chunk (Chan et al.)
+        n, mean = len(y_true), float(np.mean(y_true))
+        deviations = y_true - mean
+        total = self.num_points + n
+        delta = mean - self.mean_true
+        self.sum_squared_deviation += float(deviations @ deviations) \
+                                      + delta**2 * self.num_points * n / total
+        self.mean_true += delta * n / total
+        self.num_points = total
+
+        self.reservoir.add(errors, self._num_chunks)
+        self._num_chunks += 1
+
+    @property
+    def rmse(self):
+        return np.sqrt(self.sum_squared_error / self.num_points)
+
+    @property
+    def mae(self):
+        return self.sum_absolute_error / self.num_points
+
+    @property
+    def r2(self):
+        return 1 - self.sum_squared_error / self.sum_squared_deviation
+
+    def quantile(self, q):
+        """Quantile(s) `q` of the absolute error, estimated from the sample"""
+        return np.quantile(self.reservoir.sample, q)
+
+    def report(self, quantiles=(0.5, 0.9, 0.99)) -> AccuracyReport:
+        if not self.num_points:
+            raise ValueError("No points have been evaluated")
+        return AccuracyReport(
+            self.num_points, float(self.rmse), float(self.mae), float(self.r2),
+            self.max_error,
+            {q: float(self.quantile(q)) for q in quantiles},
+        )
@@ -11,7 +11,7 @@ __email__ = 's.j.van.rijn@liacs.leidenuniv.nl'
 from .branin import branin
 from .hartmann import hartmann3
 from .paciorek import paciorek
-from .trid import trid
+from .trid import trid, Trid
 
 
 bi_fidelity_functions = (
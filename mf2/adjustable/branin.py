@@ -28,28 +28,95 @@ Note that :math:`f_h` is equal to the non-adjustable :math:`f_b` defined in
 """
 
 
+import math
+
 import numpy as np
 
-from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction
-from mf2.branin import branin_base, l_bound, u_bound
+from mf2.grid import open_axes
+from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction, array_namespace, as_columns, as_point
+from mf2.branin import branin_base, _branin_cosine, _branin_quadratic, l_bound, u_bound
 
 
-_four_pi_square = 4*np.pi**2
+def adjustable_branin_lf(xx, a):
+    x1, x2 = as_columns(xx)
+    xp = array_namespace(x1)
 
+    term2 = _branin_quadratic(x1, x2, xp)
+    term1 = term2**2 + _branin_cosine(x1, xp) + 10  # == branin_base(xx)
 
-def adjustable_branin_lf(xx, a):
-    xx = np.atleast_2d(xx)
+    return term1 - (a + 0.5) * term2 ** 2
 
-    x1, x2 = xx.T
 
-    term1 = branin_base(xx)
-    term2 = x2 - (5.1 * (x1**2 / _four_pi_square)) + ((5*x1) / np.pi) - 6
+def _adjustable_branin_lf_point(x, a):
+    x1, x2 = as_point(x)
+    term2 = _branin_quadratic(x1, x2, math)
+    return float(term2**2 + _branin_cosine(x1, math) + 10 - (a + 0.5) * term2**2)
 
-    return term1 - (a + 0.5) * term2 ** 2
+
+def _adjustable_branin_lf_on_grid(axes, a):
+    x1, x2 = open_axes(axes)
+    term2 = _branin_quadratic(x1, x2)
+    return term2**2 + _branin_cosine(x1) + 10 - (a + 0.5) * term2**2
+
+
+adjustable_branin_lf.point = _adjustable_branin_lf_point
+
+# Terms of a single variable are computed per axis value, see mf2.grid
+adjustable_branin_lf.on_grid = _adjustable_branin_lf_on_grid
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+adjustable_branin_lf.bytes_per_row = 40
 
 
 x_opt = [np.pi, 2.275]  # one of three optima
 
+#: Correlation between high- and low-fidelity for values of `a` along a
+#: monotonic range, as (a, correlation) pairs. Computed offline with
+#: ``docs/scripts/correlation-table.py``
+correlation_table = (
+    (-0.500000,  1.000000),
+    (-0.462500,  0.999987),
+    (-0.425000,  0.999944),
+    (-0.387500,  0.999862),
+    (-0.350000,  0.999733),
+    (-0.312500,  0.999545),
+    (-0.275000,  0.999281),
+    (-0.237500,  0.998922),
+    (-0.200000,  0.998441),
+    (-0.162500,  0.997804),
+    (-0.125000,  0.996964),
+    (-0.087500,  0.995860),
+    (-0.050000,  0.994408),
+    (-0.012500,  0.992489),
+    ( 0.025000,  0.989938),
+    ( 0.062500,  0.986517),
+    ( 0.100000,  0.981877),
+    ( 0.137500,  0.975494),
+    ( 0.175000,  0.966562),
+    ( 0.212500,  0.953805),
+    ( 0.250000,  0.935153),
+    ( 0.287500,  0.907158),
+    ( 0.325000,  0.863977),
+    ( 0.362500,  0.795783),
+    ( 0.400000,  0.687148),
+    ( 0.437500,  0.518889),
+    ( 0.475000,  0.282285),
+    ( 0.512500,  0.004670),
+    ( 0.550000, -0.255459),
+    ( 0.587500, -0.457554),
+    ( 0.625000, -0.599098),
+    ( 0.662500, -0.695082),
+    ( 0.700000, -0.760653),
+    ( 0.737500, -0.806534),
+    ( 0.775000, -0.839568),
+    ( 0.812500, -0.864032),
+    ( 0.850000, -0.882624),
+    ( 0.887500, -0.897082),
+    ( 0.925000, -0.908556),
+    ( 0.962500, -0.917825),
+    ( 1.000000, -0.925430),
+)
+
 docstring = """Factory method for adjustable Branin function using parameter value `a1`
 
     :param a1:  Parameter to tune the correlation between high- and low-fidelity
@@ -65,4 +132,5 @@ branin = AdjustableMultiFidelityFunction(
     adjustable_functions=[adjustable_branin_lf],
     fidelity_names=['high', 'low'],
     x_opt=x_opt,
+    correlation_table=correlation_table,
 )
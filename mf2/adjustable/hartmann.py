@@ -48,9 +48,13 @@ and where :math:`a \in [0, 1]` is the adjustable parameter.
 """
 
 
+import math
+
 import numpy as np
 
-from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction
+from mf2.grid import fallback
+from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction, as_point, as_rows
+from mf2.workspace import evaluate
 
 
 # Some constant values
@@ -71,30 +75,68 @@ _P3 = np.array([
 
 
 def hartmann3_hf(xx):
-    xx = np.atleast_2d(xx)
+    return evaluate(_hartmann3, as_rows(xx))
+
 
-    xx = xx[:,:,np.newaxis]
+def adjustable_hartmann3_lf(xx, a):
+    return evaluate(_hartmann3, as_rows(xx), a=a)
 
-    tmp1 = (xx - _P3) ** 2 * _beta3
-    tmp2 = np.exp(-np.sum(tmp1, axis=1))
-    tmp3 = tmp2.dot(_alpha3)
 
-    return -tmp3.reshape((-1,))
+def _hartmann3(xx, xp=np, a=None):
+    """Row-level implementation of :func:`hartmann3_hf` and, if `a` is
+    given, :func:`adjustable_hartmann3_lf`"""
+    xx = xx[:,:,None]
 
+    tmp1 = (xx - _centres(a, xp)) ** 2 * xp.asarray(_beta3)
+    tmp2 = xp.exp(-xp.sum(tmp1, axis=1))
+    tmp3 = tmp2 @ xp.asarray(_alpha3)
 
-def adjustable_hartmann3_lf(xx, a):
-    xx = np.atleast_2d(xx)
+    return -xp.reshape(tmp3, (-1,))
+
+
+def _centres(a, xp):
+    """Centres `_P3`, moved by the low fidelity parameter `a` unless it is None"""
+    if a is None:
+        return xp.asarray(_P3)
+    factor = 3/4 * (xp.reshape(xp.asarray(a), (-1, 1, 1)) + 1)  # `a` may be given per row
+    return xp.asarray(_P3) * factor
+
+
+# Python copies of the constants for the scalar fast paths
+_alpha3_list = _alpha3.ravel().tolist()
+_beta3_rows = _beta3[0].T.tolist()
+_P3_rows = _P3[0].T.tolist()
 
-    factor = 3/4 * (a + 1)
 
-    xx = xx[:,:,np.newaxis]
+def _hartmann3_point(x, factor=1):
+    x = as_point(x)
+    return -sum(
+        alpha * math.exp(-sum(b * (xj - p*factor) ** 2
+                              for xj, b, p in zip(x, b_row, p_row)))
+        for alpha, b_row, p_row in zip(_alpha3_list, _beta3_rows, _P3_rows)
+    )
 
-    tmp1 = (xx - (_P3 * factor))
-    tmp2 = tmp1 ** 2 * _beta3
-    tmp3 = np.exp(-np.sum(tmp2, axis=1))
-    tmp4 = tmp3.dot(_alpha3)
 
-    return -tmp4.reshape((-1,))
+def _hartmann3_hf_point(x):
+    return _hartmann3_point(x)
+
+
+def _adjustable_hartmann3_lf_point(x, a):
+    return _hartmann3_point(x, factor=3/4 * (a + 1))
+
+
+hartmann3_hf.point = _hartmann3_hf_point
+adjustable_hartmann3_lf.point = _adjustable_hartmann3_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+hartmann3_hf.on_grid = fallback(hartmann3_hf)
+adjustable_hartmann3_lf.on_grid = fallback(adjustable_hartmann3_lf)
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking.
+# Dominated by two (N, 3, 4) intermediate tensors, with a margin for the fixed
+# size buffers of numpy's broadcasting, which are relatively large for small blocks.
+hartmann3_hf.bytes_per_row = 232
+adjustable_hartmann3_lf.bytes_per_row = 232
 
 
 u_bound = [1]*3
@@ -102,6 +144,53 @@ l_bound = [0]*3
 
 x_opt = [0.11458889011259411, 0.5556488928818787, 0.852546981666729]
 
+#: Correlation between high- and low-fidelity for values of `a` along a
+#: monotonic range, as (a, correlation) pairs. Computed offline with
+#: ``docs/scripts/correlation-table.py``
+correlation_table = (
+    ( 0.333333,  1.000000),
+    ( 0.350000,  0.997954),
+    ( 0.366667,  0.992108),
+    ( 0.383333,  0.982921),
+    ( 0.400000,  0.970861),
+    ( 0.416667,  0.956387),
+    ( 0.433333,  0.939936),
+    ( 0.450000,  0.921906),
+    ( 0.466667,  0.902653),
+    ( 0.483333,  0.882482),
+    ( 0.500000,  0.861644),
+    ( 0.516667,  0.840340),
+    ( 0.533333,  0.818718),
+    ( 0.550000,  0.796876),
+    ( 0.566667,  0.774868),
+    ( 0.583333,  0.752706),
+    ( 0.600000,  0.730365),
+    ( 0.616667,  0.707788),
+    ( 0.633333,  0.684894),
+    ( 0.650000,  0.661579),
+    ( 0.666667,  0.637727),
+    ( 0.683333,  0.613213),
+    ( 0.700000,  0.587911),
+    ( 0.716667,  0.561696),
+    ( 0.733333,  0.534458),
+    ( 0.750000,  0.506096),
+    ( 0.766667,  0.476531),
+    ( 0.783333,  0.445707),
+    ( 0.800000,  0.413594),
+    ( 0.816667,  0.380194),
+    ( 0.833333,  0.345545),
+    ( 0.850000,  0.309726),
+    ( 0.866667,  0.272863),
+    ( 0.883333,  0.235133),
+    ( 0.900000,  0.196773),
+    ( 0.916667,  0.158076),
+    ( 0.933333,  0.119392),
+    ( 0.950000,  0.081116),
+    ( 0.966667,  0.043677),
+    ( 0.983333,  0.007512),
+    ( 1.000000, -0.026958),
+)
+
 docstring = """Factory method for adjustable Hartmann3 function using parameter value `a3`
 
     :param a3:  Parameter to tune the correlation between high- and low-fidelity
@@ -117,4 +206,5 @@ hartmann3 = AdjustableMultiFidelityFunction(
     [adjustable_hartmann3_lf],
     fidelity_names=['high', 'low'],
     x_opt=x_opt,
+    correlation_table=correlation_table,
 )
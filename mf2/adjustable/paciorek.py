@@ -22,33 +22,100 @@ where :math:`a \in (0, 1]` is the adjustable parameter
 """
 
 
-import numpy as np
+import math
 
-from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction
+from mf2.grid import fallback
+from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction, array_namespace, as_columns, as_point
 
 
 def paciorek_hf(xx):
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
-    return np.sin(1/(x1*x2))
+    x1, x2 = as_columns(xx)
+    return array_namespace(x1).sin(1/(x1*x2))
 
 
 def adjustable_paciorek_lf(xx, a):
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
+    x1, x2 = as_columns(xx)
     temp1 = paciorek_hf(xx)
     temp2 = 9 * a ** 2
-    temp3 = np.cos(1/(x1*x2))
+    temp3 = array_namespace(x1).cos(1/(x1*x2))
     return temp1 - (temp2*temp3)
 
 
+def _paciorek_hf_point(x):
+    x1, x2 = as_point(x)
+    return math.sin(1/(x1*x2))
+
+
+def _adjustable_paciorek_lf_point(x, a):
+    x1, x2 = as_point(x)
+    inv = 1/(x1*x2)
+    return math.sin(inv) - 9 * a ** 2 * math.cos(inv)
+
+
+paciorek_hf.point = _paciorek_hf_point
+adjustable_paciorek_lf.point = _adjustable_paciorek_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+paciorek_hf.on_grid = fallback(paciorek_hf)
+adjustable_paciorek_lf.on_grid = fallback(adjustable_paciorek_lf)
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+paciorek_hf.bytes_per_row = 24
+adjustable_paciorek_lf.bytes_per_row = 40
+
+
 u_bound = [1]*2
 l_bound = [0.3]*2
 
 x_opt = [0.460658865961780639020326, 0.460658865961780639020326]  # sqrt(3pi/2)
 
+#: Correlation between high- and low-fidelity for values of `a` along a
+#: monotonic range, as (a, correlation) pairs. Computed offline with
+#: ``docs/scripts/correlation-table.py``
+correlation_table = (
+    ( 0.000000,  1.000000),
+    ( 0.025000,  0.999990),
+    ( 0.050000,  0.999843),
+    ( 0.075000,  0.999199),
+    ( 0.100000,  0.997452),
+    ( 0.125000,  0.993743),
+    ( 0.150000,  0.986977),
+    ( 0.175000,  0.975879),
+    ( 0.200000,  0.959123),
+    ( 0.225000,  0.935523),
+    ( 0.250000,  0.904286),
+    ( 0.275000,  0.865258),
+    ( 0.300000,  0.819057),
+    ( 0.325000,  0.767036),
+    ( 0.350000,  0.711068),
+    ( 0.375000,  0.653213),
+    ( 0.400000,  0.595402),
+    ( 0.425000,  0.539222),
+    ( 0.450000,  0.485815),
+    ( 0.475000,  0.435895),
+    ( 0.500000,  0.389811),
+    ( 0.525000,  0.347646),
+    ( 0.550000,  0.309299),
+    ( 0.575000,  0.274557),
+    ( 0.600000,  0.243150),
+    ( 0.625000,  0.214783),
+    ( 0.650000,  0.189160),
+    ( 0.675000,  0.165999),
+    ( 0.700000,  0.145038),
+    ( 0.725000,  0.126039),
+    ( 0.750000,  0.108788),
+    ( 0.775000,  0.093093),
+    ( 0.800000,  0.078787),
+    ( 0.825000,  0.065718),
+    ( 0.850000,  0.053755),
+    ( 0.875000,  0.042783),
+    ( 0.900000,  0.032699),
+    ( 0.925000,  0.023412),
+    ( 0.950000,  0.014843),
+    ( 0.975000,  0.006922),
+    ( 1.000000, -0.000413),
+)
+
 docstring = """Factory method for adjustable Paciorek function using parameter value `a2`
 
     :param a2:  Parameter to tune the correlation between high- and low-fidelity
@@ -64,4 +131,5 @@ paciorek = AdjustableMultiFidelityFunction(
     [adjustable_paciorek_lf],
     fidelity_names=['high', 'low'],
     x_opt=x_opt,
+    correlation_table=correlation_table,
 )
@@ -10,41 +10,179 @@ as defined in:
 
 .. math::
 
-    f_h(x_1, ..., x_{10}) = \sum^{10}_{i=1} (x_i - 1)^2 - \sum^{10}_{i=2} x_ix_{i-1}
+    f_h(x_1, ..., x_d) = \sum^d_{i=1} (x_i - 1)^2 - \sum^d_{i=2} x_ix_{i-1}
 
 .. math::
 
-    f_l(x_1, ..., x_{10}) = \sum^{10}_{i=1} (x_i - a)^2 - (a - 0.65) \sum^{10}_{i=2} x_ix_{i-1}
+    f_l(x_1, ..., x_d) = \sum^d_{i=1} (x_i - a)^2 - (a - 0.65) \sum^d_{i=2} x_ix_{i-1}
 
-where :math:`a \in [0, 1]` is the adjustable parameter
+where :math:`a \in [0, 1]` is the adjustable parameter. :func:`Trid` creates
+the function for any dimensionality :math:`d \geq 1`, with bounds
+:math:`[-d^2, d^2]`; :data:`trid` is the original 10-dimensional version.
 """
 
 
+from functools import lru_cache
+
 import numpy as np
 
-from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction
+from mf2.grid import fallback
+from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction, array_namespace, as_point, as_rows
+
+
+@lru_cache(maxsize=None)
+def _neighbour_weights(ndim):
+    """Weights [2, ..., ndim] of the neighbour products in the low fidelity"""
+    weights = np.arange(2, ndim+1, dtype=float)
+    weights.flags.writeable = False
+    return weights
+
+
+def _sum_of_squares(diff, xp=np):
+    if xp is np:
+        return np.einsum('ij,ij->i', diff, diff)
+    return xp.sum(diff * diff, axis=1)
+
+
+def _neighbour_products(xx, xp=np, weights=None):
+    """(Weighted) sum of the products of neighbouring variables per row"""
+    if xp is np:
+        if weights is None:
+            return np.einsum('ij,ij->i', xx[:, :-1], xx[:, 1:])
+        return np.einsum('ij,ij,j->i', xx[:, :-1], xx[:, 1:], weights)
+    products = xx[:, :-1] * xx[:, 1:]
+    if weights is not None:
+        products = products * xp.asarray(weights)
+    return xp.sum(products, axis=1)
 
 
 def trid_hf(xx):
-    xx = np.atleast_2d(xx)
+    xx = as_rows(xx)
+    xp = array_namespace(xx)
 
-    temp1 = np.sum((xx - 1) ** 2, axis=1)
-    temp2 = np.sum(xx[:,:-1] * xx[:,1:], axis=1)
+    temp1 = _sum_of_squares(xx - 1, xp)
+    temp2 = _neighbour_products(xx, xp)
     return temp1 - temp2
 
 def adjustable_trid_lf(xx, a):
-    xx = np.atleast_2d(xx)
+    xx = as_rows(xx)
+    xp = array_namespace(xx)
 
-    temp1 = np.sum((xx - a) ** 2, axis=1)
-    temp2 = np.sum((a - 0.65) * xx[:, :-1] * xx[:, 1:] * np.arange(2, 11), axis=1)
+    a = xp.reshape(xp.asarray(a), (-1, 1))  # `a` may be given per row
+    weights = _neighbour_weights(xx.shape[1])
+    temp1 = _sum_of_squares(xx - a, xp)
+    temp2 = (a[:, 0] - 0.65) * _neighbour_products(xx, xp, weights)
     return temp1 - temp2
 
 
-# u, l = [-d**2]*d, [d**2]*d
-u_bound = [100]*10
-l_bound = [-100]*10
-
-x_opt = [10, 18, 24, 28, 30, 30, 28, 24, 18, 10]  # [i*(D+1-i) for i in range(1, D+1)]
+def _trid_hf_point(x):
+    x = as_point(x)
+    temp1 = sum((xi - 1)**2 for xi in x)
+    temp2 = sum(xi * xj for xi, xj in zip(x, x[1:]))
+    return float(temp1 - temp2)
+
+
+def _adjustable_trid_lf_point(x, a):
+    x = as_point(x)
+    temp1 = sum((xi - a)**2 for xi in x)
+    temp2 = (a - 0.65) * sum(w * xi * xj for w, xi, xj in zip(range(2, len(x)+1), x, x[1:]))
+    return float(temp1 - temp2)
+
+
+def _neighbours(x, i):
+    """Values of x[i-1] and x[i+1], or 0 beyond the first and last dimension"""
+    left = np.where(i > 0, x[i-1], 0)
+    right = np.where(i < len(x)-1, x[np.minimum(i+1, len(x)-1)], 0)
+    return left, right
+
+
+def _trid_hf_delta(x, i, v):
+    left, right = _neighbours(x, i)
+    return (v - 1)**2 - (x[i] - 1)**2 - (v - x[i]) * (left + right)
+
+
+def _adjustable_trid_lf_delta(x, i, v, a):
+    left, right = _neighbours(x, i)
+    neighbours = (i+1)*left + (i+2)*right  # weights of pairs (i-1, i) and (i, i+1)
+    return (v - a)**2 - (x[i] - a)**2 - (a - 0.65) * (v - x[i]) * neighbours
+
+
+trid_hf.point = _trid_hf_point
+adjustable_trid_lf.point = _adjustable_trid_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+trid_hf.on_grid = fallback(trid_hf)
+adjustable_trid_lf.on_grid = fallback(adjustable_trid_lf)
+
+# Change in value when setting x[i] to v, in O(1) time, see mf2.incremental
+trid_hf.delta = _trid_hf_delta
+adjustable_trid_lf.delta = _adjustable_trid_lf_delta
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+trid_hf.bytes_per_row = lambda ndim: 8*ndim + 16
+adjustable_trid_lf.bytes_per_row = lambda ndim: 8*ndim + 16
+
+
+def _trid_bounds(ndim):
+    """Lower and upper bounds [-d**2]*d and [d**2]*d"""
+    return [-ndim**2]*ndim, [ndim**2]*ndim
+
+
+def _trid_x_opt(ndim):
+    """Optimum of the high fidelity: x_i = i*(d+1-i) for i = 1, ..., d"""
+    return [i*(ndim+1-i) for i in range(1, ndim+1)]
+
+
+l_bound, u_bound = _trid_bounds(10)
+
+x_opt = _trid_x_opt(10)  # [10, 18, 24, 28, 30, 30, 28, 24, 18, 10]
+
+#: Correlation between high- and low-fidelity for values of `a` along a
+#: monotonic range, as (a, correlation) pairs. Computed offline with
+#: ``docs/scripts/correlation-table.py``
+correlation_table = (
+    ( 0.000000, -0.503436),
+    ( 0.019771, -0.498024),
+    ( 0.039542, -0.492255),
+    ( 0.059313, -0.486095),
+    ( 0.079084, -0.479504),
+    ( 0.098855, -0.472435),
+    ( 0.118625, -0.464838),
+    ( 0.138396, -0.456652),
+    ( 0.158167, -0.447812),
+    ( 0.177938, -0.438236),
+    ( 0.197709, -0.427837),
+    ( 0.217480, -0.416506),
+    ( 0.237251, -0.404123),
+    ( 0.257022, -0.390542),
+    ( 0.276793, -0.375593),
+    ( 0.296564, -0.359077),
+    ( 0.316335, -0.340753),
+    ( 0.336105, -0.320339),
+    ( 0.355876, -0.297495),
+    ( 0.375647, -0.271816),
+    ( 0.395418, -0.242814),
+    ( 0.415189, -0.209912),
+    ( 0.434960, -0.172420),
+    ( 0.454731, -0.129533),
+    ( 0.474502, -0.080332),
+    ( 0.494273, -0.023808),
+    ( 0.514044,  0.041063),
+    ( 0.533815,  0.115162),
+    ( 0.553585,  0.198955),
+    ( 0.573356,  0.292061),
+    ( 0.593127,  0.392732),
+    ( 0.612898,  0.497411),
+    ( 0.632669,  0.600766),
+    ( 0.652440,  0.696527),
+    ( 0.672211,  0.779047),
+    ( 0.691982,  0.844832),
+    ( 0.711753,  0.893175),
+    ( 0.731524,  0.925686),
+    ( 0.751295,  0.945234),
+    ( 0.771065,  0.954957),
+    ( 0.790836,  0.957664),
+)
 
 docstring = """Factory method for adjustable Trid function using parameter value `a4`
 
@@ -53,11 +191,29 @@ docstring = """Factory method for adjustable Trid function using parameter value
     :return:    A MultiFidelityFunction instance
     """
 
-trid = AdjustableMultiFidelityFunction(
-    "Trid",
-    u_bound, l_bound,
-    [trid_hf],
-    [adjustable_trid_lf],
-    fidelity_names=['high', 'low'],
-    x_opt=x_opt,
-)
+def Trid(ndim: int):
+    """Factory method for `ndim`-dimensional adjustable Trid function
+
+    Bounds and optimum are scaled with `ndim`. The correlation table is only
+    available for the default 10-dimensional version.
+
+    :param ndim: Desired dimensionality
+    :return:     :class:`~mf2.multi_fidelity_function.AdjustableMultiFidelityFunction`
+                 instance with bounds of appropriate length
+    """
+    if ndim < 1:
+        raise ValueError(f"ndim must be at least 1, not {ndim}")
+
+    l_bound, u_bound = _trid_bounds(ndim)
+    return AdjustableMultiFidelityFunction(
+        "Trid",
+        u_bound, l_bound,
+        [trid_hf],
+        [adjustable_trid_lf],
+        fidelity_names=['high', 'low'],
+        x_opt=_trid_x_opt(ndim),
+        correlation_table=correlation_table if ndim == 10 else None,
+    )
+
+
+trid = Trid(ndim=10)
@@ -17,9 +17,22 @@ Function definitions:
     f_l(x_1, x_2) = f_h(0.7x_1, x_2) + x_1x_2 - 12
 """
 
+import math
+
 import numpy as np
 
-from .multi_fidelity_function import MultiFidelityFunction
+from .grid import fallback
+from .multi_fidelity_function import MultiFidelityFunction, array_namespace, as_columns, as_point
+
+
+def _bohachevsky(x1, x2, xp=np):
+    """Column-level implementation of :func:`bohachevsky_hf`. Also evaluates
+    single points if `xp` is the `math` module."""
+    term1 = x1**2 + 2*x2**2
+    term2 = 0.3*xp.cos(3*xp.pi*x1)
+    term3 = 0.4*xp.cos(4*xp.pi*x2)
+
+    return term1 - term2 - term3 + 0.7
 
 
 def bohachevsky_hf(xx):
@@ -29,15 +42,8 @@ def bohachevsky_hf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
-
-    term1 = x1**2 + 2*x2**2
-    term2 = 0.3*np.cos(3*np.pi*x1)
-    term3 = 0.4*np.cos(4*np.pi*x2)
-
-    return term1 - term2 - term3 + 0.7
+    x1, x2 = as_columns(xx)
+    return _bohachevsky(x1, x2, array_namespace(x1))
 
 
 def bohachevsky_lf(xx):
@@ -50,16 +56,36 @@ def bohachevsky_lf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
+    x1, x2 = as_columns(xx)
 
-    term1 = bohachevsky_hf(np.hstack([0.7*x1.reshape(-1,1), x2.reshape(-1,1)]))
+    term1 = _bohachevsky(0.7*x1, x2, array_namespace(x1))
     term2 = x1*x2 - 12
 
     return term1 + term2
 
 
+def _bohachevsky_hf_point(x):
+    x1, x2 = as_point(x)
+    return float(_bohachevsky(x1, x2, math))
+
+
+def _bohachevsky_lf_point(x):
+    x1, x2 = as_point(x)
+    return float(_bohachevsky(0.7*x1, x2, math) + x1*x2 - 12)
+
+
+bohachevsky_hf.point = _bohachevsky_hf_point
+bohachevsky_lf.point = _bohachevsky_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+bohachevsky_hf.on_grid = fallback(bohachevsky_hf)
+bohachevsky_lf.on_grid = fallback(bohachevsky_lf)
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+bohachevsky_hf.bytes_per_row = 48
+bohachevsky_lf.bytes_per_row = 56
+
+
 #: Lower bound for Bohachevsky function
 l_bound = [-5, -5]
 #: Upper bound for Bohachevsky function
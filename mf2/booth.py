@@ -17,9 +17,16 @@ Function definitions:
     f_l(x_1, x_2) = f_h(0.4x_1, x_2) + 1.7x_1x_2 - x_1 + 2x_2
 """
 
-import numpy as np
+from .grid import open_axes
+from .multi_fidelity_function import MultiFidelityFunction, as_columns, as_point
 
-from .multi_fidelity_function import MultiFidelityFunction
+
+def _booth(x1, x2):
+    """Column-level implementation of :func:`booth_hf`, also for single points"""
+    term1 = (x1 + 2*x2 - 7)**2
+    term2 = (2*x1 + x2 - 5)**2
+
+    return term1 + term2
 
 
 def booth_hf(xx):
@@ -29,14 +36,8 @@ def booth_hf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
-
-    term1 = (x1 + 2*x2 - 7)**2
-    term2 = (2*x1 + x2 - 5)**2
-
-    return term1 + term2
+    x1, x2 = as_columns(xx)
+    return _booth(x1, x2)
 
 
 def booth_lf(xx):
@@ -49,16 +50,46 @@ def booth_lf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
+    x1, x2 = as_columns(xx)
 
-    term1 = booth_hf(np.hstack([.4*x1.reshape(-1,1), x2.reshape(-1,1)]))
+    term1 = _booth(.4*x1, x2)
     term2 = 1.7*x1*x2 - x1 + 2*x2
 
     return term1 + term2
 
 
+def _booth_hf_point(x):
+    x1, x2 = as_point(x)
+    return float(_booth(x1, x2))
+
+
+def _booth_lf_point(x):
+    x1, x2 = as_point(x)
+    return float(_booth(.4*x1, x2) + 1.7*x1*x2 - x1 + 2*x2)
+
+
+def _booth_hf_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _booth(x1, x2)
+
+
+def _booth_lf_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _booth(.4*x1, x2) + 1.7*x1*x2 - x1 + 2*x2
+
+
+booth_hf.point = _booth_hf_point
+booth_lf.point = _booth_lf_point
+
+# Terms of a single variable are computed per axis value, see mf2.grid
+booth_hf.on_grid = _booth_hf_on_grid
+booth_lf.on_grid = _booth_lf_on_grid
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+booth_hf.bytes_per_row = 32
+booth_lf.bytes_per_row = 40
+
+
 #: Lower bound for Booth function
 l_bound = [-10, -10]
 #: Upper bound for Booth function
@@ -44,28 +44,37 @@ of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
 General Public License for more details.
 """
 
-import numpy as np
+import math
 
-from .multi_fidelity_function import MultiFidelityFunction
+import numpy as np
 
+from .grid import fallback
+from .multi_fidelity_function import MultiFidelityFunction, as_columns, as_point
+from .workspace import evaluate
 
-_tau = 2*np.pi
 
+_tau = 2*math.pi
 
-def _borehole_base(xx, a, b):
-    xx = np.atleast_2d(xx)
+#: Names of the input variables, to pass input by name as dict or DataFrame
+variable_names = ['rw', 'r', 'Tu', 'Hu', 'Tl', 'Hl', 'L', 'Kw']
 
-    rw, r, Tu, Hu, Tl, Hl, L, Kw = xx.T
 
+def _borehole(rw, r, Tu, Hu, Tl, Hl, L, Kw, a, b, xp=np):
+    """Column-level implementation of :func:`_borehole_base`. Also evaluates
+    single points if `xp` is the `math` module."""
     frac1 = a * Tu * (Hu - Hl)
 
-    frac2a = 2*L*Tu / (np.log(r/rw) * (rw**2) * Kw)
+    frac2a = 2*L*Tu / (xp.log(r/rw) * (rw**2) * Kw)
     frac2b = Tu / Tl
-    frac2 = np.log(r/rw) * (b + frac2a + frac2b)
+    frac2 = xp.log(r/rw) * (b + frac2a + frac2b)
 
     return frac1 / frac2
 
 
+def _borehole_base(xx, a, b):
+    return evaluate(_borehole, *as_columns(xx, variable_names), a=a, b=b)
+
+
 def borehole_hf(xx):
     """
         BOREHOLE FUNCTION
@@ -90,6 +99,26 @@ def borehole_lf(xx):
     return _borehole_base(xx, a=5, b=1.5)
 
 
+def _borehole_hf_point(x):
+    return float(_borehole(*as_point(x), a=_tau, b=1, xp=math))
+
+
+def _borehole_lf_point(x):
+    return float(_borehole(*as_point(x), a=5, b=1.5, xp=math))
+
+
+borehole_hf.point = _borehole_hf_point
+borehole_lf.point = _borehole_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+borehole_hf.on_grid = fallback(borehole_hf)
+borehole_lf.on_grid = fallback(borehole_lf)
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+borehole_hf.bytes_per_row = 56
+borehole_lf.bytes_per_row = 56
+
+
 #: Lower bound for Borehole function
 l_bound = [0.05,    100,  63_070,   990, 63.1, 700, 1_120,  9_855]
 #: Upper bound for Borehole function
@@ -22,13 +22,30 @@ Function definitions:
     f_l(x_1, x_2) = f_b(0.7x_1, 0.7x_2) - 15.75x_2 + 20(0.9 + x_1)^2 - 50
 """
 
+import math
+
 import numpy as np
 
-from .multi_fidelity_function import MultiFidelityFunction
+from .grid import open_axes
+from .multi_fidelity_function import MultiFidelityFunction, array_namespace, as_columns, as_point
+
+
+_four_pi_square = 4*math.pi**2
+_eight_pi = 8*math.pi
+
+
+def _branin_quadratic(x1, x2, xp=np):
+    return x2 - (5.1 * (x1**2 / _four_pi_square)) + ((5*x1) / xp.pi) - 6
+
+
+def _branin_cosine(x1, xp=np):
+    return (10 * xp.cos(x1)) * (1 - (1/_eight_pi))
 
 
-_four_pi_square = 4*np.pi**2
-_eight_pi = 8*np.pi
+def _branin_base(x1, x2, xp=np):
+    """Column-level implementation of :func:`branin_base`. Also evaluates
+    single points if `xp` is the `math` module."""
+    return _branin_quadratic(x1, x2, xp)**2 + _branin_cosine(x1, xp) + 10
 
 
 def branin_base(xx):
@@ -38,14 +55,8 @@ def branin_base(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
-
-    term1 = x2 - (5.1 * (x1**2 / _four_pi_square)) + ((5*x1) / np.pi) - 6
-    term2 = (10 * np.cos(x1)) * (1 - (1/_eight_pi))
-
-    return term1**2 + term2 + 10
+    x1, x2 = as_columns(xx)
+    return _branin_base(x1, x2, array_namespace(x1))
 
 
 def branin_hf(xx):
@@ -58,10 +69,8 @@ def branin_hf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    _, x2 = xx.T
-    return branin_base(xx) - 22.5*x2
+    x1, x2 = as_columns(xx)
+    return _branin_base(x1, x2, array_namespace(x1)) - 22.5*x2
 
 
 def branin_lf(xx):
@@ -74,11 +83,9 @@ def branin_lf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
+    x1, x2 = as_columns(xx)
 
-    x1, x2 = xx.T
-
-    term1 = branin_base(np.hstack([0.7*x1.reshape(-1,1), 0.7*x2.reshape(-1,1)]))
+    term1 = _branin_base(0.7*x1, 0.7*x2, array_namespace(x1))
     term2 = 15.75*x2
     term3 = 20*(.9+x1)**2
     term4 = 50
@@ -86,6 +93,51 @@ def branin_lf(xx):
     return term1 - term2 + term3 - term4
 
 
+def _branin_base_point(x):
+    x1, x2 = as_point(x)
+    return float(_branin_base(x1, x2, math))
+
+
+def _branin_hf_point(x):
+    x1, x2 = as_point(x)
+    return float(_branin_base(x1, x2, math) - 22.5*x2)
+
+
+def _branin_lf_point(x):
+    x1, x2 = as_point(x)
+    return float(_branin_base(0.7*x1, 0.7*x2, math) - 15.75*x2 + 20*(.9+x1)**2 - 50)
+
+
+def _branin_base_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _branin_base(x1, x2)
+
+
+def _branin_hf_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _branin_base(x1, x2) - 22.5*x2
+
+
+def _branin_lf_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _branin_base(0.7*x1, 0.7*x2) - 15.75*x2 + 20*(.9+x1)**2 - 50
+
+
+branin_base.point = _branin_base_point
+branin_hf.point = _branin_hf_point
+branin_lf.point = _branin_lf_point
+
+# Terms of a single variable are computed per axis value, see mf2.grid
+branin_base.on_grid = _branin_base_on_grid
+branin_hf.on_grid = _branin_hf_on_grid
+branin_lf.on_grid = _branin_lf_on_grid
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+branin_base.bytes_per_row = 32
+branin_hf.bytes_per_row = 32
+branin_lf.bytes_per_row = 48
+
+
 #: Lower bound for Branin function
 l_bound = [-5,  0]
 #: Upper bound for Branin function
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+
+"""
+cache.py:
+
+Evaluation cache that is shared by all processes on a host, e.g. parallel
+optimizer runs that evaluate the same points of expensive functions. Cached
+values are stored in an SQLite database file in WAL mode, which allows many
+concurrent readers and a single writer at a time.
+
+Each value is keyed by a hash of the function name, fidelity, value of `a`,
+applied transformations such as ``'invert'`` and the exact bytes of the input
+point. Lookups and inserts are done in batches per call. If the cache holds
+more than `max_entries` values, the least recently used values are evicted
+down to :data:`evict_fraction` of the limit.
+
+Lookups only read from the database, so they never wait for each other. The
+time of use of the values that were found and the hit/miss counters are kept
+in memory, and written with the next insert of the same process, at the
+latest after :data:`flush_keys` values or :data:`flush_interval` seconds, or
+with :meth:`SharedCache.flush`, :meth:`~SharedCache.close`, when the cache is
+garbage collected or at exit. Until then, :meth:`~SharedCache.stats` does not
+include them for other processes, and eviction may consider such values older
+than they are.
+
+Example:
+
+    >>> cache = SharedCache('/tmp/mf2-cache.sqlite', max_entries=10**6)
+    >>> hartmann6 = cache.wrap(mf2.hartmann6)
+    >>> y = hartmann6.high(X)  # evaluates X
+    >>> y = hartmann6.high(X)  # also from another process: read from the cache
+    >>> cache.stats()
+    {'hits': 100, 'misses': 100, 'evicted': 0}
+"""
+
+from hashlib import blake2b
+from multiprocessing.util import Finalize
+import os
+import sqlite3
+from threading import Lock, local
+from time import time_ns
+
+import numpy as np
+
+from .multi_fidelity_function import MultiFidelityFunction, as_rows, fidelity_keys, with_functions
+
+
+#: Fraction of `max_entries` that is kept when evicting values
+evict_fraction = 0.9
+
+#: Number of values found by lookups after which their use is written
+flush_keys = 10_000
+
+#: Time in seconds after which the use of found values and the hit/miss
+#: counters are written, checked at every lookup
+flush_interval = 1.0
+
+#: Maximum number of keys per SQL statement
+_batch_size = 500
+
+_schema = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    key BLOB PRIMARY KEY,
+    value REAL NOT NULL,
+    used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS evaluations_used ON evaluations (used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters VALUES ('entries', 0), ('hits', 0), ('misses', 0), ('evicted', 0);
+"""
+
+
+class SharedCache:
+    """Cache of function values in an SQLite file, shared between processes"""
+
+    def __init__(self, path, max_entries=None, timeout=60):
+        """
+        :param path:        Database file, created if it does not exist
+        :param max_entries: Maximum number of cached values, or None for no limit
+        :param timeout:     Time in seconds to wait for another process that
+                            is writing to the cache
+        """
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.hits = self.misses = 0
+        self._local = local()
+        self._lock = Lock()
+        self._usage = _Usage()
+        self._connection().executescript(_schema)
+        # unlike weakref.finalize, also called when a multiprocessing worker exits
+        Finalize(self, _write_pending, (self.path, timeout, self._usage), exitpriority=0)
+
+    def _connection(self):
+        """Connection of the current thread and process"""
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.connection, self._local.pid = _connect(self.path, self.timeout), os.getpid()
+        return self._local.connection
+
+    def wrap(self, mff: MultiFidelityFunction) -> MultiFidelityFunction:
+        """Create a version of `mff` that uses this cache for all fidelities"""
+        names, a, transforms = fidelity_keys(mff)
+        return with_functions(mff, [CachedFunction(f, self, _prefix(mff.name, name, a, transforms))
+                                    for f, name in zip(mff.functions, names)])
+
+    def keys(self, prefix, X):
+        """Keys of the rows of `X` for the function identified by `prefix`"""
+        X = np.ascontiguousarray(X, dtype=float)
+        return [blake2b(prefix + row.tobytes(), digest_size=16).digest() for row in X]
+
+    def get(self, keys):
+        """Cached values of the given keys, as dictionary of the keys found"""
+        connection = self._connection()
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), _batch_size):
+            batch = unique[start:start+_batch_size]
+            placeholders = ','.join('?' * len(batch))
+            found.update(connection.execute(
+                f'SELECT key, value FROM evaluations WHERE key IN ({placeholders})', batch))
+
+        hits = sum(key in found for key in keys)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(keys) - hits
+        if self._usage.add(found, hits, len(keys) - hits):
+            self.flush()
+        return found
+
+    def put(self, keys, values):
+        """Store values under the given keys, evicting old values if needed"""
+        connection = self._connection()
+        now = time_ns()
+        with connection:
+            self._usage.write(connection)
+            inserted = connection.executemany(
+                'INSERT OR IGNORE INTO evaluations VALUES (?, ?, ?)',
+                [(key, float(value), now) for key, value in zip(keys, values)],
+            ).rowcount
+            connection.execute("UPDATE counters SET count = count + ? WHERE name = 'entries'",
+                               (inserted,))
+            if self.max_entries is not None:
+                self._evict(connection)
+
+    def flush(self):
+        """Write the use of found values and the hit/miss counters of this
+        process, which lookups only keep in memory"""
+        connection = self._connection()
+        with connection:
+            self._usage.write(connection)
+
+    def _evict(self, connection):
+        """Remove least recently used values if over the limit. Requires an
+        open transaction."""
+        entries, = connection.execute("SELECT count FROM counters WHERE name = 'entries'").fetchone()
+        if entries <= self.max_entries:
+            return
+        excess = entries - int(self.max_entries * evict_fraction)
+        evicted = connection.execute(
+            'DELETE FROM evaluations WHERE key IN '
+            '(SELECT key FROM evaluations ORDER BY used LIMIT ?)', (excess,)
+        ).rowcount
+        connection.executemany('UPDATE counters SET count = count + ? WHERE name = ?',
+                               [(-evicted, 'entries'), (evicted, 'evicted')])
+
+    def stats(self):
+        """Hits, misses and evicted values of all processes that used the cache"""
+        self.flush()
+        rows = self._connection().execute('SELECT name, count FROM counters').fetchall()
+        counters = dict(rows)
+        return {name: counters[name] for name in ('hits', 'misses', 'evicted')}
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups by this process that were found in the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return self._connection().execute(
+            "SELECT count FROM counters WHERE name = 'entries'").fetchone()[0]
+
+    def clear(self):
+        """Remove all cached values and reset the statistics"""
+        connection = self._connection()
+        with connection:
+            self._usage.take()
+            connection.execute('DELETE FROM evaluations')
+            connection.execute('UPDATE counters SET count = 0')
+        self.hits = self.misses = 0
+
+    def close(self):
+        """Write pending updates and close the connection of the current thread"""
+        if getattr(self._local, 'pid', None) == os.getpid():
+            self.flush()
+            self._local.connection.close()
+            del self._local.connection, self._local.pid
+
+    def __getstate__(self):
+        return {'path': self.path, 'max_entries': self.max_entries, 'timeout': self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return f"SharedCache({self.path!r}, max_entries={self.max_entries})"
+
+
+def _connect(path, timeout):
+    connection = sqlite3.connect(path, timeout=timeout, isolation_level='IMMEDIATE')
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class _Usage:
+    """Time of use of found values and hit/miss counts of lookups in this
+    process, that have not been written to the database yet"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.used, self.hits, self.misses = {}, 0, 0
+        self.written = time_ns()
+
+    @property
+    def pending(self):
+        return self.pid == os.getpid() and bool(self.used or self.hits or self.misses)
+
+    def add(self, found, hits, misses):
+        """Add the result of a lookup, returning whether a write is due"""
+        now = time_ns()
+        with self._lock:
+            if self.pid != os.getpid():  # inherited from the parent process
+                self._reset()
+            self.used.update(dict.fromkeys(found, now))
+            self.hits += hits
+            self.misses += misses
+            return (len(self.used) >= flush_keys
+                    or now - self.written >= flush_interval * 1e9)
+
+    def take(self):
+        """Return and reset the pending used keys, hits and misses"""
+        with self._lock:
+            pending = (self.used, self.hits, self.misses) if self.pid == os.getpid() else ({}, 0, 0)
+            self._reset()
+        return pending
+
+    def write(self, connection):
+        """Write and reset the pending updates. Requires an open transaction"""
+        used, hits, misses = self.take()
+        if used:
+            connection.executemany('UPDATE evaluations SET used = ? WHERE key = ?',
+                                   [(now, key) for key, now in used.items()])
+        if hits or misses:
+            connection.executemany('UPDATE counters SET count = count + ? WHERE name = ?',
+                                   [(hits, 'hits'), (misses, 'misses')])
+
+
+def _write_pending(path, timeout, usage):
+    """Write the pending updates of a cache that is no longer used"""
+    if usage.pending:
+        connection = _connect(path, timeout)
+        with connection:
+            usage.write(connection)
+        connection.close()
+
+
+def _prefix(function, fidelity, a, transforms=()):
+    """Bytes that identify a fidelity, to be hashed with each point"""
+    return (f'{function}\0{fidelity}\0{a!r}\0'
+            + ''.join(f'{transform}\0' for transform in transforms)).encode()
+
+
+class CachedFunction:
+    """Fidelity function that looks up values in a :class:`SharedCache` and
+    only evaluates the points that are not found"""
+
+    def __init__(self, func, cache, prefix):
+        self.func = func
+        self.cache = cache
+        self.prefix = prefix
+
+    def __call__(self, xx):
+        X = np.asarray(as_rows(xx), dtype=float)
+        keys = self.cache.keys(self.prefix, X)
+        found = self.cache.get(keys)
+
+        y = np.empty(len(X))
+        missing = {}  # first row of every missing key, so duplicates are evaluated once
+        for i, key in enumerate(keys):
+            if key in found:
+                y[i] = found[key]
+            else:
+                missing.setdefault(key, i)
+        if missing:
+            rows = list(missing.values())
+            values = np.asarray(self.func(X[rows]), dtype=float)
+            self.cache.put(list(missing), values)
+            found = dict(zip(missing, values))
+            for i, key in enumerate(keys):
+                if key in found:
+                    y[i] = found[key]
+        return y
+
+    def point(self, x):
+        return float(self(np.reshape(x, (1, -1)))[0])
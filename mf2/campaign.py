@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+"""
+campaign.py:
+
+Run an optimizer on a grid of functions, `a` values, seeds and cost budgets in
+parallel, e.g. to benchmark optimizer variants on the whole function suite.
+
+Every run is described by a :class:`Run`, which only refers to its function by
+the name in :mod:`mf2.registry`, so it can be sent to worker processes cheaply.
+Each worker builds and caches the functions it needs with
+:func:`mf2.handles.build`. The optimizer is called as
+``optimizer(func, budget, seed)``, where every fidelity of `func` keeps track
+of the cost of all evaluated points, as given by `costs` per fidelity. Any
+evaluation that would exceed the budget raises :class:`BudgetExhausted`,
+which ends the run normally.
+
+Results are streamed to a results directory as batches of columns, each a
+compressed ``.npz`` file with one array per column, and can be read back with
+:func:`load_results`. Runs that already have results are skipped, so an
+interrupted campaign continues where it left off when restarted.
+
+Example:
+
+    >>> grid = runs([mf2.branin, (mf2.adjustable.branin, [0, 0.5])],
+    ...             seeds=range(10), budgets=[50, 100])
+    >>> run_campaign(my_optimizer, grid, 'results/')
+    >>> results = load_results('results/')
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+import os
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from . import registry
+from .handles import build
+from .multi_fidelity_function import AdjustableMultiFidelityFunction, MultiFidelityFunction, \
+    as_rows
+
+
+#: Cost per evaluated point of each fidelity, used if no `costs` are given
+default_costs = {'high': 1.0, 'low': 0.2}
+
+#: Columns of the results, in order
+columns = ('function', 'a', 'seed', 'budget', 'status', 'cost', 'evaluations_high',
+           'evaluations_low', 'best_high', 'result', 'elapsed', 'error')
+
+
+#: A single optimizer run. `function` is the name in :mod:`mf2.registry`,
+#: `a` is None for functions that are not adjustable.
+Run = namedtuple('Run', ['function', 'a', 'seed', 'budget'])
+
+
+class BudgetExhausted(Exception):
+    """Raised by an evaluation that would exceed the cost budget of a run"""
+
+
+def runs(functions, seeds, budgets):
+    """All combinations of functions, seeds and budgets as :class:`Run` tuples
+
+    :param functions: Registered bi-fidelity functions, such as
+                      ``mf2.bi_fidelity_functions``, adjustable functions with
+                      a fixed `a`, or pairs of an adjustable function and an
+                      iterable of `a` values
+    :param seeds:     Iterable of integer seeds
+    :param budgets:   Iterable of cost budgets
+    :return:          List of Run tuples
+    """
+    keys = []
+    for func in functions:
+        if isinstance(func, tuple):
+            func, a_values = func
+            keys.extend((_registry_name(func), float(a)) for a in a_values)
+        else:
+            keys.append(_function_key(func))
+    return [_normalize(Run(name, a, seed, budget))
+            for (name, a), seed, budget in product(keys, seeds, budgets)]
+
+
+def _normalize(run):
+    """Run with consistent types, to compare with runs read from results"""
+    name, a, seed, budget = run
+    return Run(str(name), None if a is None or np.isnan(a) else float(a), int(seed), float(budget))
+
+
+def _registry_name(func):
+    entry = registry.find(func)
+    if entry is None:
+        raise ValueError(f"{func.name} is not a registered function")
+    return entry.name
+
+
+def _function_key(func: MultiFidelityFunction):
+    if isinstance(func, AdjustableMultiFidelityFunction):
+        raise ValueError(f"{func.name} is adjustable, give it with a list of `a` values")
+    base, a, transforms = func._origin or (func, None, ())
+    if transforms:
+        raise ValueError(f"{func.name} is transformed, only registered functions can be used")
+    return _registry_name(base), None if a is None else float(a)
+
+
+def run_campaign(optimizer, campaign_runs, path, *, costs=None, processes=None,
+                 flush_every=64):
+    """Run `optimizer` for all `campaign_runs` in a process pool, streaming the
+    results to `path`. Runs that already have results in `path` are skipped.
+
+    :param optimizer:     Picklable callable ``optimizer(func, budget, seed)``,
+                          e.g. a module-level function. Its return value is
+                          stored as `result` if it is a number.
+    :param campaign_runs: Iterable of :class:`Run` tuples, see :func:`runs`
+    :param path:          Results directory, created if it does not exist
+    :param costs:         Cost per evaluated point of each fidelity. Defaults
+                          to :data:`default_costs`.
+    :param processes:     Number of worker processes, defaults to the number
+                          of CPUs. With 0, all runs are executed in this process.
+    :param flush_every:   Number of completed runs per results batch
+    :return:              Number of runs executed
+    """
+    costs = dict(default_costs if costs is None else costs)
+    writer = _ResultsWriter(path, flush_every)
+    pending = [run for run in dict.fromkeys(_normalize(run) for run in campaign_runs)
+               if run not in writer.completed]
+
+    try:
+        if processes == 0:
+            for run in pending:
+                writer.append(execute(optimizer, run, costs))
+        else:
+            with ProcessPoolExecutor(processes) as pool:
+                futures = [pool.submit(execute, optimizer, run, costs) for run in pending]
+                for future in as_completed(futures):
+                    writer.append(future.result())
+    finally:
+        writer.flush()
+    return len(pending)
+
+
+def execute(optimizer, run, costs=None):
+    """Execute a single run in the current process
+
+    :return: Dictionary with a value for each of :data:`columns`
+    """
+    costs = default_costs if costs is None else costs
+    func = _CostAccountant(build(run.function, run.a), run.budget, costs)
+    status, result, error = 'ok', None, ''
+    start = perf_counter()
+    try:
+        result = optimizer(func.mff, run.budget, run.seed)
+    except BudgetExhausted:
+        status = 'budget'
+    except Exception as e:  # a failing run should not end the whole campaign
+        status, error = 'error', repr(e)
+    elapsed = perf_counter() - start
+
+    return {
+        'function': run.function,
+        'a': np.nan if run.a is None else run.a,
+        'seed': run.seed,
+        'budget': run.budget,
+        'status': status,
+        'cost': func.cost,
+        'evaluations_high': func.evaluations.get('high', 0),
+        'evaluations_low': func.evaluations.get('low', 0),
+        'best_high': func.best_high,
+        'result': float(result) if isinstance(result, (int, float, np.number)) else np.nan,
+        'elapsed': elapsed,
+        'error': error,
+    }
+
+
+def load_results(path):
+    """Read all results in `path`
+
+    :return: Dictionary of column name to 1D array, in order of completion
+    """
+    batches = []
+    for file in sorted(Path(path).glob('results-*.npz')):
+        with np.load(file) as batch:
+            batches.append(dict(batch))
+    if not batches:
+        return {column: np.array([]) for column in columns}
+    return {column: np.concatenate([batch[column] for batch in batches])
+            for column in columns}
+
+
+class _CostAccountant:
+    """Version of a function that adds up the cost of every evaluation"""
+
+    def __init__(self, mff, budget, costs):
+        self.budget = budget
+        self.costs = costs
+        self.cost = 0.0
+        self.evaluations = {}
+        self.best_high = np.nan
+
+        names = mff.fidelity_names or list(range(len(mff.functions)))
+        self.mff = MultiFidelityFunction(
+            mff._name, mff.u_bound, mff.l_bound,
+            [_CountedFunction(f, self, name) for f, name in zip(mff.functions, names)],
+            fidelity_names=mff.fidelity_names,
+            x_opt=mff.x_opt,
+            maximize=mff.maximize,
+        )
+
+    def charge(self, fidelity, num_points):
+        cost = num_points * self.costs[fidelity]
+        if self.cost + cost > self.budget:
+            raise BudgetExhausted(f"Evaluating {num_points} points of fidelity "
+                                  f"'{fidelity}' exceeds the budget of {self.budget}")
+        self.cost += cost
+        self.evaluations[fidelity] = self.evaluations.get(fidelity, 0) + num_points
+
+    def observe(self, fidelity, y):
+        if fidelity == 'high' and len(y):
+            if self.mff.maximize:
+                best = float(np.max(y))
+                improved = best > self.best_high
+            else:
+                best = float(np.min(y))
+                improved = best < self.best_high
+            if np.isnan(self.best_high) or improved:
+                self.best_high = best
+
+
+class _CountedFunction:
+    """Fidelity function that is charged to a :class:`_CostAccountant`"""
+
+    def __init__(self, func, accountant, fidelity):
+        self.func = func
+        self.accountant = accountant
+        self.fidelity = fidelity
+
+    def __call__(self, xx):
+        xx = as_rows(xx)
+        self.accountant.charge(self.fidelity, len(xx))
+        y = np.asarray(self.func(xx))
+        self.accountant.observe(self.fidelity, y)
+        return y
+
+    def point(self, x):
+        return float(self(np.reshape(x, (1, -1)))[0])
+
+
+class _ResultsWriter:
+    """Buffers results and writes them as batches of columns"""
+
+    def __init__(self, path, flush_every):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self._buffer = []
+
+        existing = load_results(self.path)
+        self.completed = {_normalize(run) for run in zip(*(existing[c] for c in Run._fields))}
+        self._batch = len(list(self.path.glob('results-*.npz')))
+
+    def append(self, result):
+        self._buffer.append(result)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        data = {column: np.array([result[column] for result in self._buffer])
+                for column in columns}
+        file = self.path / f'results-{self._batch:06d}.npz'
+        temporary = self.path / f'.results-{self._batch:06d}.npz'
+        np.savez_compressed(temporary, **data)
+        os.replace(temporary, file)  # complete batches only, even if interrupted
+        self._batch += 1
+        self._buffer = []
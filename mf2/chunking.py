@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""
+chunking.py:
+
+Evaluate large batches in blocks of rows, such that the temporary memory used
+by a fidelity function stays within a given budget. Optionally, blocks are
+also limited to fit in the L2 cache for better locality.
+
+Every built-in fidelity function declares its temporary memory per row of
+input as a `bytes_per_row` attribute: either a number, or a function of the
+dimensionality for scalable functions. This includes its output, but not the
+input itself. Functions without this attribute are assumed to need
+:data:`fallback_floats_per_dim` floats per row per dimension.
+
+The budget covers the full output array, the temporary memory of one block
+at a time and the scratch buffers kept in the workspace of the calling
+thread, see :mod:`mf2.workspace`. If these buffers would take more than half
+of the budget, they are released instead. The input is not counted, as it
+already exists before the call.
+
+The budget only applies to calls through :func:`evaluate` or functions
+created by :func:`chunked`, including :data:`default_max_memory`. Plain calls
+such as ``mf2.hartmann6.high(X)`` always evaluate all rows at once, so every
+caller that may pass large batches should use one of these.
+
+Example:
+
+    >>> mf2.chunking.default_max_memory = 256 * 2**20  # global default of 256 MiB
+    >>> hartmann6 = chunked(mf2.hartmann6)
+    >>> y = hartmann6.high(X)
+    >>> y = evaluate(mf2.currin.low, X, max_memory=2**30)
+"""
+
+import numpy as np
+
+from .multi_fidelity_function import Columns, MultiFidelityFunction, \
+    _is_foreign_array, as_rows, evaluate_point, with_functions
+from .workspace import workspace
+
+
+#: Default memory budget in bytes, used by :func:`evaluate` and :func:`chunked`
+#: functions when no `max_memory` is given. None for no limit. Does not apply
+#: to plain calls of fidelity functions, such as ``mf2.hartmann6.high(X)``,
+#: which always evaluate all rows at once.
+default_max_memory = None
+
+#: Assumed size of the L2 cache in bytes, for cache-sized blocks
+l2_cache_size = 1 << 20
+
+#: Assumed number of temporary floats per row per dimension for functions
+#: that do not declare their `bytes_per_row`
+fallback_floats_per_dim = 32
+
+
+def bytes_per_row(func, ndim):
+    """Temporary memory in bytes that `func` needs per row of input
+
+    :param func: A fidelity function
+    :param ndim: Dimensionality of the input
+    :return:     Declared or fallback number of bytes per row
+    """
+    declared = getattr(func, 'bytes_per_row', None)
+    if callable(declared):
+        declared = declared(ndim)
+    if declared is None:
+        declared = 8 * fallback_floats_per_dim * ndim
+    return declared
+
+
+def block_size(func, num_rows, ndim, max_memory=None, cache_blocks=False):
+    """Number of rows per block to stay within `max_memory` bytes
+
+    :param func:         A fidelity function
+    :param num_rows:     Total number of rows to evaluate
+    :param ndim:         Dimensionality of the input
+    :param max_memory:   Memory budget in bytes, see :func:`evaluate`
+    :param cache_blocks: Also limit blocks to :data:`l2_cache_size`
+    :return:             Number of rows per block, at most `num_rows`
+    """
+    max_memory = default_max_memory if max_memory is None else max_memory
+    per_row = bytes_per_row(func, ndim)
+
+    rows = num_rows
+    if max_memory is not None:
+        available = max_memory - 8*num_rows  # output is kept in full
+        retained = workspace().nbytes
+        if retained > available // 2:
+            workspace().clear()
+            retained = 0
+        rows = (available - retained) // per_row
+        if rows < 1:
+            raise ValueError(f"max_memory of {max_memory} bytes is too small to "
+                             f"evaluate {num_rows} rows of {per_row} bytes each")
+    if cache_blocks:
+        rows = min(rows, max(l2_cache_size // per_row, 1))
+    return int(min(rows, num_rows))
+
+
+def evaluate(func, xx, *, max_memory=None, cache_blocks=False):
+    """Evaluate `func` on `xx` in blocks of rows, within a memory budget
+
+    :param func:         A (vectorized) fidelity function
+    :param xx:           Row-major array-like or :class:`Columns`
+    :param max_memory:   Memory budget in bytes for the output and temporary
+                         memory. Defaults to :data:`default_max_memory`.
+    :param cache_blocks: If True, also limit blocks to fit in the L2 cache
+    :return:             1D array of function values
+    """
+    if _is_foreign_array(xx):
+        return func(xx)  # e.g. Dask arrays are already evaluated in chunks
+
+    columnar = isinstance(xx, Columns)
+    if not columnar:
+        xx = as_rows(xx)
+    num_rows, ndim = (len(xx[0]), len(xx)) if columnar else xx.shape
+
+    block = block_size(func, num_rows, ndim, max_memory, cache_blocks)
+    if block >= num_rows:
+        return func(xx)
+
+    y = np.empty(num_rows)
+    for start in range(0, num_rows, block):
+        rows = slice(start, start+block)
+        y[rows] = func(Columns(*(col[rows] for col in xx)) if columnar else xx[rows])
+    return y
+
+
+def chunked(mff: MultiFidelityFunction, max_memory: int=None,
+            cache_blocks: bool=False) -> MultiFidelityFunction:
+    """Create a version of `mff` that evaluates all fidelities with
+    :func:`evaluate`
+
+    :param mff:          The MultiFidelityFunction to wrap
+    :param max_memory:   Memory budget in bytes. Defaults to
+                         :data:`default_max_memory` at the time of each call.
+    :param cache_blocks: If True, also limit blocks to fit in the L2 cache
+    :return:             A new MultiFidelityFunction with chunked fidelities
+    """
+    return with_functions(mff, [ChunkedFunction(f, max_memory, cache_blocks)
+                                for f in mff.functions])
+
+
+class ChunkedFunction:
+    """Fidelity function that is evaluated in blocks within a memory budget"""
+
+    def __init__(self, func, max_memory=None, cache_blocks=False):
+        self.func = func
+        self.max_memory = max_memory
+        self.cache_blocks = cache_blocks
+
+    def __call__(self, xx):
+        return evaluate(self.func, xx, max_memory=self.max_memory,
+                        cache_blocks=self.cache_blocks)
+
+    def point(self, x):
+        return evaluate_point(self.func, x)
+
+    def on_grid(self, axes):
+        from .grid import on_grid
+        return on_grid(self.func, axes)
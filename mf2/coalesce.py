@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+"""
+coalesce.py:
+
+Thread-safe front end that merges concurrent calls to the same fidelity into a
+single vectorized call. This is useful when many threads each evaluate single
+points, e.g. in a population-based optimiser with one thread per individual:
+instead of paying the per-call overhead and contending for the GIL once per
+point, all points that arrive within a short time window are evaluated
+together.
+
+Batching follows a leader-follower scheme: the first caller to arrive opens a
+new batch and becomes its leader. Callers arriving within `window` seconds add
+their points to the same batch and wait. The leader then closes the batch,
+evaluates all points at once and hands every caller its own result. A batch is
+closed early once it holds `max_batch` points. The leader does not wait at
+all if the previous batch had no followers and no other caller is in progress,
+so single-threaded use is only delayed on its first call.
+
+Each caller's points are checked before they join a batch, so invalid input
+only raises an error for its own caller. If evaluating a batch still fails,
+the points of every caller are evaluated separately, and only the callers
+whose points fail receive the error.
+
+Example:
+
+    >>> coalesced = coalesce(mf2.hartmann6, window=1e-3)
+    >>> with ThreadPoolExecutor(max_workers=32) as pool:
+    ...     values = list(pool.map(coalesced.high.point, population))
+"""
+
+from threading import Event, Lock
+
+import numpy as np
+
+from .grid import on_grid
+from .multi_fidelity_function import MultiFidelityFunction, as_rows, with_functions
+
+
+def coalesce(mff: MultiFidelityFunction, window: float=1e-3,
+             max_batch: int=1024) -> MultiFidelityFunction:
+    """Create a version of `mff` in which concurrent calls to each fidelity
+    are merged into a single vectorized call
+
+    :param mff:       The MultiFidelityFunction to wrap
+    :param window:    Time in seconds that the first caller of a batch waits
+                      for other callers to join
+    :param max_batch: Number of points at which a batch is evaluated without
+                      waiting for the full window
+    :return:          A new MultiFidelityFunction with coalescing fidelities
+    """
+    if window < 0:
+        raise ValueError(f"window must be non-negative, not {window}")
+    if max_batch < 1:
+        raise ValueError(f"max_batch must be at least 1, not {max_batch}")
+
+    return with_functions(mff, [CoalescedFunction(f, window, max_batch, ndim=mff.ndim)
+                                for f in mff.functions])
+
+
+class _Batch:
+    """Points collected from concurrent callers, and their results"""
+
+    __slots__ = ('points', 'size', 'results', 'full', 'done')
+
+    def __init__(self):
+        self.points = []  # one array of rows per caller
+        self.size = 0
+        self.results = None  # one array of values or exception per caller
+        self.full = Event()
+        self.done = Event()
+
+
+class CoalescedFunction:
+    """Fidelity function that evaluates concurrent calls as one batch"""
+
+    def __init__(self, func, window=1e-3, max_batch=1024, ndim=None):
+        """
+        :param func:      Vectorized fidelity function to wrap
+        :param window:    Time in seconds the leader of a batch waits for
+                          other callers to join
+        :param max_batch: Number of points at which a batch is closed early
+        :param ndim:      Number of input variables of `func`, used to check
+                          the points of each caller. Not checked if None
+        """
+        self.func = func
+        self.window = window
+        self.max_batch = max_batch
+        self.ndim = ndim
+        self._lock = Lock()
+        self._batch = None
+        self._callers = 0  # callers in progress
+        self._alone = False  # whether the previous batch had no followers
+
+    def __call__(self, xx):
+        """Evaluate `xx` as part of a batch with any concurrent callers
+
+        :param xx: One or more points, in any input format the wrapped
+                   function accepts
+        :return:   1D array with the values of only the given points
+        """
+        with self._lock:
+            self._callers += 1
+        try:
+            batch, index = self._join(self._check(xx))
+        finally:
+            with self._lock:
+                self._callers -= 1
+
+        result = batch.results[index]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def point(self, x):
+        """Evaluate a single point as part of a batch, returning a float"""
+        return float(self(x)[0])
+
+    def on_grid(self, axes):
+        """Evaluate a grid directly, as it already is a large batch"""
+        return on_grid(self.func, axes)
+
+    def _check(self, xx):
+        """Return `xx` as float rows, raising an error in the caller's own
+        thread if it cannot be evaluated as part of a batch"""
+        rows = np.asarray(as_rows(xx), dtype=float)
+        if rows.ndim != 2:
+            raise ValueError(f"Expected one or more points, got an array of shape {rows.shape}")
+        if self.ndim is not None and rows.shape[1] != self.ndim:
+            raise ValueError(f"Expected points with {self.ndim} values, got {rows.shape[1]}")
+        return rows
+
+    def _join(self, rows):
+        """Add `rows` to the open batch and wait until it is evaluated
+
+        :return: The batch and the index of this caller in it
+        """
+        with self._lock:
+            batch = self._batch
+            is_leader = batch is None
+            if is_leader:
+                batch = self._batch = _Batch()
+                # nobody is expected to join if the previous batch had no
+                # followers and no other caller is in progress now
+                wait = not (self._alone and self._callers == 1)
+            index = len(batch.points)
+            batch.points.append(rows)
+            batch.size += len(rows)
+            if batch.size >= self.max_batch:
+                self._close(batch)
+
+        if is_leader:
+            if wait:
+                batch.full.wait(self.window)
+            with self._lock:
+                self._close(batch)
+            self._alone = len(batch.points) == 1
+            self._evaluate(batch)
+        else:
+            batch.done.wait()
+        return batch, index
+
+    def _close(self, batch):
+        """Stop new callers from joining `batch`. Requires `self._lock`"""
+        if self._batch is batch:
+            self._batch = None
+        batch.full.set()
+
+    def _evaluate(self, batch):
+        """Evaluate all points of `batch` at once, or per caller if that fails"""
+        try:
+            if len(batch.points) > 1:
+                try:
+                    values = np.asarray(self.func(np.concatenate(batch.points)))
+                except Exception:  # find out which callers' points fail
+                    pass
+                else:
+                    offsets = np.cumsum([len(rows) for rows in batch.points[:-1]])
+                    batch.results = np.split(values, offsets)
+                    return
+            batch.results = [self._evaluate_caller(rows) for rows in batch.points]
+        finally:
+            batch.done.set()
+
+    def _evaluate_caller(self, rows):
+        try:
+            return np.asarray(self.func(rows))
+        except Exception as error:  # raised in the thread of this caller only
+            return error
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+r"""
+continuous.py:
+
+Evaluate bi-fidelity functions at an arbitrary fidelity level :math:`t \in
+[0, 1]`, given per row, where :math:`t=0` is the low and :math:`t=1` the high
+fidelity. All (x, t) pairs are evaluated in a single call, with at most one
+vectorized call per underlying fidelity.
+
+* For regular bi-fidelity functions, the levels in between are a linear
+  interpolation: :math:`f(x, t) = t f_h(x) + (1-t) f_l(x)`.
+* For adjustable functions, the parameter `a` serves as the fidelity axis:
+  :math:`f(x, t) = f_l(x, a(t))` for :math:`t < 1`, with `a` linearly
+  interpolated along `a_range`. Rows with :math:`t=1` use the high fidelity.
+
+Optionally, `t` is rounded to the nearest of `levels` equally spaced discrete
+levels, for many-fidelity rather than continuous-fidelity settings.
+
+Example:
+
+    >>> f = continuous(mf2.adjustable.branin, levels=5)
+    >>> f(X, t=[0, 0.25, 0.5, 0.75, 1])
+"""
+
+import numpy as np
+
+from .multi_fidelity_function import AdjustableMultiFidelityFunction, \
+    MultiFidelityFunction, as_rows
+
+
+def continuous(mff: MultiFidelityFunction, *, levels: int=None,
+               a_range=None) -> 'ContinuousFidelityFunction':
+    """Create a version of the bi-fidelity `mff` with a continuous fidelity axis
+
+    :param mff:     Bi-fidelity MultiFidelityFunction or
+                    AdjustableMultiFidelityFunction
+    :param levels:  If given, round `t` to this many equally spaced levels
+    :param a_range: Adjustable functions only: values of `a` at `t=0` and at
+                    `t` approaching 1. Defaults to the endpoints of the
+                    correlation table, such that correlation with the high
+                    fidelity increases with `t`.
+    :return:        ContinuousFidelityFunction instance
+    """
+    return ContinuousFidelityFunction(mff, levels=levels, a_range=a_range)
+
+
+class ContinuousFidelityFunction:
+    """Bi-fidelity function with fidelity level `t` in [0, 1] given per row"""
+
+    def __init__(self, mff, levels=None, a_range=None):
+        if len(mff.functions) != 2:
+            raise ValueError(f"{mff.name} is not a bi-fidelity function")
+        if levels is not None and levels < 2:
+            raise ValueError(f"levels must be at least 2, not {levels}")
+
+        self.mff = mff
+        self.levels = levels
+        self.adjustable = isinstance(mff, AdjustableMultiFidelityFunction)
+        if self.adjustable:
+            if len(mff.adjustable_functions) != 1:
+                raise ValueError(f"{mff.name} must have exactly one adjustable fidelity")
+            self.a_range = tuple(_default_a_range(mff) if a_range is None else a_range)
+        elif a_range is not None:
+            raise ValueError(f"a_range given, but {mff.name} is not adjustable")
+        else:
+            self.a_range = None
+
+    @property
+    def name(self):
+        return self.mff.name
+
+    @property
+    def ndim(self):
+        return self.mff.ndim
+
+    @property
+    def l_bound(self):
+        return self.mff.l_bound
+
+    @property
+    def u_bound(self):
+        return self.mff.u_bound
+
+    def fidelity_levels(self, t):
+        """Return `t` as float array, rounded to discrete levels if set"""
+        t = np.asarray(t, dtype=float)
+        if np.any((t < 0) | (t > 1)):
+            raise ValueError("Fidelity levels must lie in [0, 1]")
+        if self.levels is not None:
+            t = np.round(t * (self.levels-1)) / (self.levels-1)
+        return t
+
+    def a(self, t):
+        """Value of `a` used for fidelity level(s) `t` of an adjustable function"""
+        a_low, a_high = self.a_range
+        return a_low + self.fidelity_levels(t) * (a_high - a_low)
+
+    def __call__(self, xx, t):
+        """Evaluate every row of `xx` at its own fidelity level
+
+        :param xx: Points in any input format accepted by the fidelities
+        :param t:  Fidelity level per row, or a single level for all rows
+        :return:   1D array of function values
+        """
+        xx = as_rows(xx)
+        t = np.broadcast_to(self.fidelity_levels(t), (len(xx),))
+        high, low = self.mff.functions
+        y = np.zeros(len(xx))
+
+        use_high = t == 1
+        if np.any(use_high):
+            y[use_high] = high(_select(xx, use_high))
+
+        if self.adjustable:
+            use_low = ~use_high
+            if np.any(use_low):
+                y[use_low] = low(_select(xx, use_low), a=self.a(t[use_low]))
+            return y
+
+        interpolate = (t > 0) & ~use_high
+        if np.any(interpolate):
+            t_mid = t[interpolate]
+            y[interpolate] = t_mid * high(_select(xx, interpolate))
+        use_low = t < 1
+        if np.any(use_low):
+            y[use_low] += (1 - t[use_low]) * low(_select(xx, use_low))
+        return y
+
+    def __repr__(self):
+        return f"ContinuousFidelityFunction({self.name}, levels={self.levels}, " \
+               f"a_range={self.a_range})"
+
+
+def _select(xx, mask):
+    """Rows of `xx` where `mask` is set, without copying if that is all rows"""
+    return xx if mask.all() else xx[mask]
+
+
+def _default_a_range(mff):
+    """Endpoints of the correlation table, ordered by increasing correlation"""
+    if mff.correlation_table is None:
+        raise ValueError(f"No correlation table available for {mff.name}, "
+                         f"a_range must be given")
+    (a_first, r_first), (a_last, r_last) = mff.correlation_table[[0, -1]]
+    return (a_first, a_last) if r_first < r_last else (a_last, a_first)
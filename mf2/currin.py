@@ -40,30 +40,24 @@ of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
 General Public License for more details.
 """
 
-import numpy as np
-
-from .multi_fidelity_function import MultiFidelityFunction
-
+import math
 
-def currin_hf(xx):
-    """
-    CURRIN ET AL. (1988) EXPONENTIAL FUNCTION
+import numpy as np
 
-    INPUT:
-    xx = [x1, x2]
-    """
-    xx = np.atleast_2d(xx)
+from .grid import fallback
+from .multi_fidelity_function import MultiFidelityFunction, as_columns, as_point
+from .workspace import evaluate
 
-    x1, x2 = xx.T
 
+def _currin(x1, x2, xp=np):
+    """Column-level implementation of :func:`currin_hf`"""
     are_zero = x2 <= 1e-8  # Assumes x2 approaches 0 from positive
-    fact1 = np.ones(x2.shape)
-
-    fact1[~are_zero] -= np.exp(-1 / (2*x2[~are_zero]))
+    safe_x2 = xp.where(are_zero, 1., x2)  # Prevents division by 0 error/warning
+    fact1 = xp.where(are_zero, 1., 1 - xp.exp(-1 / (2*safe_x2)))
 
     # if abs(x2) <= 1e-8:
     #     fact1 = 1
-    # else:        # Prevents division by 0 error/warning
+    # else:
     #     fact1 = 1 - np.exp(-1 / (2*x2))
 
     fact2 = 2300*(x1 ** 3) + 1900*(x1 ** 2) + 2092*x1 + 60
@@ -72,6 +66,16 @@ def currin_hf(xx):
     return fact1 * fact2 / fact3
 
 
+def currin_hf(xx):
+    """
+    CURRIN ET AL. (1988) EXPONENTIAL FUNCTION
+
+    INPUT:
+    xx = [x1, x2]
+    """
+    return evaluate(_currin, *as_columns(xx))
+
+
 def currin_lf(xx):
     """
     CURRIN ET AL. (1988) EXPONENTIAL FUNCTION, LOWER FIDELITY CODE
@@ -82,24 +86,62 @@ def currin_lf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
+    return evaluate(_currin_lf, *as_columns(xx))
 
-    x1, x2 = xx.T
 
-    x1_plus = (x1 + .05).reshape(-1,1)
-    x1_minus = (x1 - .05).reshape(-1,1)
-    x2_plus = (x2 + .05).reshape(-1,1)
-    x2_minus = (x2 - .05).reshape(-1,1)
-    x2_minus[x2_minus < 0] = 0
+def _currin_lf(x1, x2, xp=np):
+    """Column-level implementation of :func:`currin_lf`"""
+    x1_plus = x1 + .05
+    x1_minus = x1 - .05
+    x2_plus = x2 + .05
+    x2_minus = xp.maximum(x2 - .05, 0.)
 
-    yh1 = currin_hf(np.hstack([x1_plus, x2_plus]))
-    yh2 = currin_hf(np.hstack([x1_plus, x2_minus]))
-    yh3 = currin_hf(np.hstack([x1_minus, x2_plus]))
-    yh4 = currin_hf(np.hstack([x1_minus, x2_minus]))
+    yh1 = _currin(x1_plus, x2_plus, xp)
+    yh2 = _currin(x1_plus, x2_minus, xp)
+    yh3 = _currin(x1_minus, x2_plus, xp)
+    yh4 = _currin(x1_minus, x2_minus, xp)
 
     return (yh1 + yh2 + yh3 + yh4) / 4
 
 
+def _currin_scalar(x1, x2):
+    """Single-point equivalent of :func:`_currin`"""
+    fact1 = 1 if x2 <= 1e-8 else 1 - math.exp(-1 / (2*x2))
+    fact2 = 2300*(x1 ** 3) + 1900*(x1 ** 2) + 2092*x1 + 60
+    fact3 = 100*(x1 ** 3) + 500*(x1 ** 2) + 4*x1 + 20
+
+    return fact1 * fact2 / fact3
+
+
+def _currin_hf_point(x):
+    x1, x2 = as_point(x)
+    return float(_currin_scalar(x1, x2))
+
+
+def _currin_lf_point(x):
+    x1, x2 = as_point(x)
+    x2_minus = max(x2 - .05, 0)
+
+    yh1 = _currin_scalar(x1 + .05, x2 + .05)
+    yh2 = _currin_scalar(x1 + .05, x2_minus)
+    yh3 = _currin_scalar(x1 - .05, x2 + .05)
+    yh4 = _currin_scalar(x1 - .05, x2_minus)
+
+    return float((yh1 + yh2 + yh3 + yh4) / 4)
+
+
+currin_hf.point = _currin_hf_point
+currin_lf.point = _currin_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+currin_hf.on_grid = fallback(currin_hf)
+currin_lf.on_grid = fallback(currin_lf)
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+currin_hf.bytes_per_row = 56
+currin_lf.bytes_per_row = 112
+
+
 #: Lower bound for Currin function
 l_bound = [0, 0]
 #: Upper bound for Currin function
@@ -114,4 +156,5 @@ currin = MultiFidelityFunction(
     [currin_hf, currin_lf],
     fidelity_names=['high', 'low'],
     x_opt=x_opt,
+    maximize=True,
 )
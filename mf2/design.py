@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+"""
+design.py:
+
+Reproducible designs of (very) many points within the bounds of a function,
+generated in chunks such that they never have to be in memory all at once.
+
+The points only depend on the seed, not on the chunk size: concatenating all
+chunks gives the same design for any `chunk_size`.
+
+Example:
+
+    >>> for X in uniform_chunks(mf2.hartmann6, 10**7, seed=42):
+    ...     y = mf2.hartmann6.high(X)
+"""
+
+import numpy as np
+
+
+#: Default number of points per chunk
+default_chunk_size = 65536
+
+
+def uniform_chunks(mff, num_points, chunk_size=None, seed=None):
+    """Uniformly random points within the bounds of `mff`, in chunks
+
+    :param mff:        MultiFidelityFunction that defines the bounds
+    :param num_points: Total number of points
+    :param chunk_size: Number of points per chunk, defaults to
+                       :data:`default_chunk_size`
+    :param seed:       Seed for :func:`numpy.random.default_rng`
+    :return:           Iterator of arrays of shape ``(chunk_size, ndim)``, the
+                       last one possibly smaller
+    """
+    chunk_size = chunk_size or default_chunk_size
+    rng = np.random.default_rng(seed)
+    l_bound, u_bound = np.asarray(mff.l_bound, dtype=float), np.asarray(mff.u_bound, dtype=float)
+    for start in range(0, num_points, chunk_size):
+        size = min(chunk_size, num_points - start)
+        yield rng.uniform(l_bound, u_bound, size=(size, len(l_bound)))
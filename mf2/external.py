@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+
+"""
+external.py:
+
+Fidelities computed by an external executable, such as an in-house solver,
+that can be used like any other fidelity function in a MultiFidelityFunction.
+
+The executable is started once per worker and kept running, so no new process
+is created per call. Every call is split into batches of at most `batch_size`
+points, which are sent to idle workers. Results are returned in input order.
+A batch that times out or whose worker crashes is retried on a restarted
+worker, at most `retries` times.
+
+Workers communicate over stdin and stdout with a line-based protocol:
+
+* ``protocol='stdin'``: a batch is sent as one line per point, with the
+  coordinates separated by spaces, followed by an empty line. The worker
+  replies with one line per point containing its function value.
+* ``protocol='files'``: the batch is written to a temporary text file in the
+  format of :func:`numpy.savetxt`. The worker is sent a single line with the
+  input and output file names, separated by a tab, writes one value per line
+  to the output file and replies with a single line ``done``.
+
+:func:`serve` implements the worker side of both protocols for Python
+functions, so an existing solver interface only needs a small script:
+
+.. code-block:: python
+
+    # solver_worker.py
+    from mf2.external import serve
+    serve(my_solver)
+
+Example:
+
+    >>> high = ExternalFunction([sys.executable, 'solver_worker.py'], workers=8,
+    ...                         timeout=60)
+    >>> func = MultiFidelityFunction('solver', u_bound, l_bound,
+    ...                              [high, mf2.branin.low], fidelity_names=['high', 'low'])
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from queue import Empty, Queue
+import subprocess
+import sys
+import tempfile
+from threading import Lock, Thread
+from time import monotonic
+import weakref
+
+import numpy as np
+
+from .multi_fidelity_function import as_rows
+
+
+class WorkerError(RuntimeError):
+    """Raised when an external worker crashed or gave an invalid reply"""
+
+
+def serve(func, stdin=None, stdout=None):
+    """Answer requests of an :class:`ExternalFunction` until stdin is closed
+
+    :param func:   Vectorized function, called with an ``(N, ndim)`` array
+    :param stdin:  Input stream, defaults to :data:`sys.stdin`
+    :param stdout: Output stream, defaults to :data:`sys.stdout`
+    """
+    stdin, stdout = stdin or sys.stdin, stdout or sys.stdout
+    rows = []
+    for line in stdin:
+        line = line.strip()
+        if '\t' in line:  # files protocol
+            input_file, output_file = line.split('\t')
+            X = np.loadtxt(input_file, ndmin=2)
+            np.savetxt(output_file, np.asarray(func(X), dtype=float).reshape(-1), fmt='%.17g')
+            stdout.write('done\n')
+            stdout.flush()
+        elif line:
+            rows.append([float(value) for value in line.split()])
+        elif rows:
+            y = np.asarray(func(np.array(rows)), dtype=float).reshape(-1)
+            stdout.write(''.join(f'{value!r}\n' for value in y.tolist()))
+            stdout.flush()
+            rows = []
+
+
+class ExternalFunction:
+    """Fidelity function evaluated by a pool of persistent external processes"""
+
+    def __init__(self, command, *, workers=1, batch_size=1000, timeout=None,
+                 retries=2, protocol='stdin', cwd=None, env=None):
+        """
+        :param command:    Command to start a worker, as list of arguments
+        :param workers:    Number of worker processes
+        :param batch_size: Maximum number of points sent to a worker at once
+        :param timeout:    Maximum time in seconds for a worker to accept and
+                           reply to a batch, or None to wait indefinitely
+        :param retries:    Number of times a timed out or failed batch is
+                           retried on a restarted worker
+        :param protocol:   'stdin' or 'files', see module documentation
+        :param cwd:        Working directory of the workers
+        :param env:        Environment variables of the workers
+        """
+        if protocol not in ('stdin', 'files'):
+            raise ValueError(f"protocol must be 'stdin' or 'files', not {protocol!r}")
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, not {workers}")
+        self.command = list(command)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.retries = retries
+        self.protocol = protocol
+        self.cwd = cwd
+        self.env = env
+
+        self._idle = Queue()
+        self._all = []
+        for _ in range(workers):
+            self._start_worker()
+        self._pool = ThreadPoolExecutor(workers)
+        self._finalizer = weakref.finalize(self, _shutdown, self._all, self._pool)
+
+    def __call__(self, xx):
+        xx = np.asarray(as_rows(xx), dtype=float)
+        if not len(xx):
+            return np.empty(0)
+        batches = [xx[start:start+self.batch_size]
+                   for start in range(0, len(xx), self.batch_size)]
+        return np.concatenate(list(self._pool.map(self._evaluate_batch, batches)))
+
+    def point(self, x):
+        return float(self(np.reshape(x, (1, -1)))[0])
+
+    def _start_worker(self):
+        worker = _Worker(self.command, self.cwd, self.env)
+        self._all.append(worker)
+        self._idle.put(worker)
+
+    def _evaluate_batch(self, X):
+        for attempt in range(self.retries + 1):
+            worker = self._idle.get()
+            succeeded = False
+            try:
+                y = worker.evaluate(X, self.protocol, self.timeout)
+                succeeded = True
+                return y
+            except (TimeoutError, WorkerError):
+                if attempt == self.retries:
+                    raise
+            finally:
+                # any failure, also unexpected ones, may leave the worker in an
+                # unknown state, so it is replaced rather than reused
+                if succeeded:
+                    self._idle.put(worker)
+                else:
+                    self._replace(worker)
+
+    def _replace(self, worker):
+        worker.kill()
+        self._all.remove(worker)
+        self._start_worker()
+
+    def close(self):
+        """Stop all worker processes"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        return _rebuild, (self.command, dict(
+            workers=self.workers, batch_size=self.batch_size, timeout=self.timeout,
+            retries=self.retries, protocol=self.protocol, cwd=self.cwd, env=self.env,
+        ))
+
+    def __repr__(self):
+        return f"ExternalFunction({self.command!r}, workers={self.workers})"
+
+
+def _rebuild(command, kwargs):
+    return ExternalFunction(command, **kwargs)
+
+
+def _shutdown(workers, pool):
+    pool.shutdown(wait=False)
+    for worker in list(workers):
+        worker.close()
+
+
+class _Worker:
+    """A single external process, with threads that write its input and
+    collect its output lines, so neither can block the caller beyond the
+    timeout"""
+
+    def __init__(self, command, cwd=None, env=None):
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        cwd=cwd, env=env, text=True, bufsize=1)
+        self.lines = Queue()
+        self._requests = Queue()
+        self._written = Queue()
+        self._reader = Thread(target=self._read, daemon=True)
+        self._reader.start()
+        self._writer = Thread(target=self._write, daemon=True)
+        self._writer.start()
+        self._lock = Lock()
+
+    def _read(self):
+        try:
+            for line in self.process.stdout:
+                self.lines.put(line)
+        except (OSError, ValueError):  # stdout closed while reading
+            pass
+        self.lines.put(None)  # end of output, the process has exited
+
+    def _write(self):
+        for request in iter(self._requests.get, None):
+            try:
+                self.process.stdin.write(request)
+                self.process.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._written.put(e)
+            else:
+                self._written.put(None)
+
+    def evaluate(self, X, protocol, timeout):
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._lock:
+            if protocol == 'files':
+                return self._evaluate_files(X, deadline)
+            request = ''.join(' '.join(map(repr, row)) + '\n' for row in X.tolist()) + '\n'
+            self._send(request, deadline)
+            return np.array([self._parse(self._receive(deadline)) for _ in range(len(X))])
+
+    def _evaluate_files(self, X, deadline):
+        with tempfile.TemporaryDirectory(prefix='mf2-') as directory:
+            input_file = os.path.join(directory, 'input.txt')
+            output_file = os.path.join(directory, 'output.txt')
+            np.savetxt(input_file, X, fmt='%.17g')
+            self._send(f'{input_file}\t{output_file}\n', deadline)
+            reply = self._receive(deadline)
+            if reply.strip() != 'done':
+                raise WorkerError(f"Expected 'done' from worker, got {reply!r}")
+            y = np.loadtxt(output_file, ndmin=1)
+        if len(y) != len(X):
+            raise WorkerError(f"Worker returned {len(y)} values for {len(X)} points")
+        return y
+
+    def _send(self, request, deadline):
+        self._requests.put(request)
+        try:
+            error = self._written.get(timeout=_remaining(deadline))
+        except Empty:  # the worker does not read its input
+            raise TimeoutError("Worker did not accept its input within the timeout") from None
+        if error is not None:
+            raise WorkerError(f"Worker exited with code {self.process.poll()}") from error
+
+    def _receive(self, deadline):
+        try:
+            line = self.lines.get(timeout=_remaining(deadline))
+        except Empty:
+            raise TimeoutError("Worker did not reply within the timeout") from None
+        if line is None:
+            self.lines.put(None)
+            raise WorkerError(f"Worker exited with code {self.process.wait()}")
+        return line
+
+    @staticmethod
+    def _parse(line):
+        try:
+            return float(line)
+        except ValueError:
+            raise WorkerError(f"Invalid reply from worker: {line!r}") from None
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+        self._release()
+
+    def close(self):
+        """Ask the worker to exit by closing its input, kill it if it does not"""
+        self._requests.put(None)
+        self._writer.join()
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self._release()
+
+    def _release(self):
+        """Stop both threads and close the pipes, once the process has exited"""
+        self._requests.put(None)
+        self._writer.join()  # a pending write fails, as the process has exited
+        try:
+            self.process.stdin.close()
+        except OSError:  # input that the worker never read
+            pass
+        self._reader.join(timeout=1)
+        self.process.stdout.close()
+
+
+def _remaining(deadline):
+    """Seconds until `deadline`, or None to wait indefinitely"""
+    return None if deadline is None else max(deadline - monotonic(), 0)
@@ -27,29 +27,83 @@ many dimensions. Output value is calculated as the mean of the outcomes for all
 separate dimensions.
 """
 
+import math
+
 import numpy as np
 
-from .multi_fidelity_function import MultiFidelityFunction
+from .grid import as_axes, outer_sum
+from .multi_fidelity_function import MultiFidelityFunction, array_namespace, as_point, as_rows
 
 
 def forrester_high(xx):
-    xx = np.atleast_2d(xx)
+    xx = as_rows(xx)
+    xp = array_namespace(xx)
 
     ndim = xx.shape[1]
     term1 = (6 * xx - 2) ** 2
-    term2 = np.sin(12 * xx - 4)
-    return np.sum(term1 * term2, axis=1) / ndim
+    term2 = xp.sin(12 * xx - 4)
+    return xp.sum(term1 * term2, axis=1) / ndim
 
 
 def forrester_low(xx, *, A=0.5, B=10, C=-5):
-    xx = np.atleast_2d(xx)
+    xx = as_rows(xx)
+    xp = array_namespace(xx)
 
     ndim = xx.shape[1]
     term1 = A*forrester_high(xx)
     term2 = B*(xx - 0.5)
     term3 = C
 
-    return term1 + (np.sum(term2, axis=1) / ndim) + term3
+    return term1 + (xp.sum(term2, axis=1) / ndim) + term3
+
+
+def _forrester_high_point(x):
+    x = as_point(x)
+    return sum((6*xi - 2)**2 * math.sin(12*xi - 4) for xi in x) / len(x)
+
+
+def _forrester_low_point(x, *, A=0.5, B=10, C=-5):
+    x = as_point(x)
+    return A*_forrester_high_point(x) + sum(B*(xi - 0.5) for xi in x) / len(x) + C
+
+
+def _forrester_high_terms(ax):
+    return (6*ax - 2)**2 * np.sin(12*ax - 4)
+
+
+def _forrester_high_on_grid(axes):
+    axes = as_axes(axes)
+    return outer_sum([_forrester_high_terms(ax) for ax in axes]) / len(axes)
+
+
+def _forrester_low_on_grid(axes, *, A=0.5, B=10, C=-5):
+    axes = as_axes(axes)
+    terms = [A*_forrester_high_terms(ax) + B*(ax - 0.5) for ax in axes]
+    return outer_sum(terms) / len(axes) + C
+
+
+def _forrester_high_delta(x, i, v):
+    return (_forrester_high_terms(v) - _forrester_high_terms(x[i])) / len(x)
+
+
+def _forrester_low_delta(x, i, v, *, A=0.5, B=10, C=-5):
+    return (A*(_forrester_high_terms(v) - _forrester_high_terms(x[i])) + B*(v - x[i])) / len(x)
+
+
+forrester_high.point = _forrester_high_point
+forrester_low.point = _forrester_low_point
+
+# Mean of per-dimension terms: O(n*d) work and a sum over the grid, see mf2.grid
+forrester_high.on_grid = _forrester_high_on_grid
+forrester_low.on_grid = _forrester_low_on_grid
+
+# Change in value when setting x[i] to v, in O(1) time, see mf2.incremental
+forrester_high.delta = _forrester_high_delta
+forrester_low.delta = _forrester_low_delta
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+forrester_high.bytes_per_row = lambda ndim: 24*ndim + 16
+forrester_low.bytes_per_row = lambda ndim: 24*ndim + 16
 
 
 #: Lower bound for Forrester function
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+grid.py:
+
+Evaluate fidelity functions on the Cartesian product of 1D axes, e.g. to
+create dense landscape plots, without creating the full grid of input points
+as with :func:`numpy.meshgrid`.
+
+Every built-in fidelity has an `on_grid(axes)` attribute. Functions with a
+separable structure, such as Forrester or Six-hump Camelback, compute all
+terms that depend on a single variable only once per axis value, and only
+combine them on the full grid: for Forrester, this is O(n*d) work and a sum
+over the grid, rather than evaluating all n^d points. All other functions fall
+back to :func:`streamed`, which evaluates the grid in blocks of points, so
+memory use is only the output plus one block.
+
+Example:
+
+    >>> x1, x2 = np.linspace(-5, 10, 1000), np.linspace(0, 15, 1000)
+    >>> landscape = mf2.branin.high.on_grid([x1, x2])
+    >>> landscape.shape
+    (1000, 1000)
+"""
+
+from functools import partial
+
+import numpy as np
+
+from .chunking import bytes_per_row
+from .multi_fidelity_function import Columns
+
+
+#: Memory in bytes for the input and temporaries of each block in
+#: :func:`streamed`
+block_memory = 16 * 2**20
+
+
+def on_grid(func, axes, **kwargs):
+    """Evaluate `func` on the grid spanned by `axes`
+
+    :param func:   A fidelity function
+    :param axes:   Sequence of 1D arrays, one for each dimension
+    :param kwargs: Passed on to `func`, e.g. `a` for adjustable functions
+    :return:       Array of shape ``(len(axes[0]), ..., len(axes[-1]))``, as
+                   for :func:`numpy.meshgrid` with ``indexing='ij'``
+    """
+    grid_func = getattr(func, 'on_grid', None)
+    if grid_func is not None:
+        return grid_func(axes, **kwargs)
+    return streamed(func, axes, **kwargs)
+
+
+def streamed(func, axes, **kwargs):
+    """Evaluate `func` on the grid spanned by `axes` in blocks of points,
+    without any assumptions on the structure of `func`. See :func:`on_grid`.
+    """
+    axes = as_axes(axes)
+    shape = tuple(len(ax) for ax in axes)
+    y = np.empty(shape)
+    y_flat = y.reshape(-1)
+
+    per_point = bytes_per_row(func, len(axes)) + 8*len(axes)
+    block = max(block_memory // per_point, 1)
+    for start in range(0, y_flat.size, block):
+        indices = np.unravel_index(np.arange(start, min(start+block, y_flat.size)), shape)
+        columns = Columns(*(ax[idx] for ax, idx in zip(axes, indices)))
+        y_flat[start:start+block] = func(columns, **kwargs)
+    return y
+
+
+def fallback(func):
+    """Grid evaluation for `func` without a separable structure, to be
+    attached as ``func.on_grid``"""
+    return partial(streamed, func)
+
+
+def as_axes(axes):
+    """Return `axes` as list of 1D float arrays"""
+    return [np.asarray(ax, dtype=float).reshape(-1) for ax in axes]
+
+
+def open_axes(axes):
+    """Axes as broadcastable arrays, e.g. shapes ``(n1, 1)`` and ``(1, n2)``.
+    Column-level implementations then compute terms that depend on a single
+    variable once per axis value, and broadcast them to the full grid."""
+    return np.ix_(*as_axes(axes))
+
+
+def outer_sum(terms):
+    """Sum of per-axis `terms` on the grid spanned by them, i.e.
+    ``y[i, j, ...] = terms[0][i] + terms[1][j] + ...``"""
+    shape = tuple(len(term) for term in terms)
+    y = np.zeros(shape)
+    for axis, term in enumerate(terms):
+        y += term.reshape([-1 if i == axis else 1 for i in range(len(shape))])
+    return y
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+handles.py:
+
+Compact, picklable handles to the fidelities of registered multi-fidelity
+functions, for use with e.g. :mod:`multiprocessing` or
+:class:`concurrent.futures.ProcessPoolExecutor`.
+
+A :class:`FidelityHandle` only stores a small key: the name of the function
+in :mod:`mf2.registry`, the fidelity, the value of `a` for adjustable
+functions and the names of any applied transformations such as
+:func:`~mf2.multi_fidelity_function.invert`. The actual function is rebuilt
+from this key on first use within each process, and cached from then on.
+
+Example:
+
+    >>> low = mf2.handles.handle(mf2.invert(mf2.adjustable.branin(0.5)), 'low')
+    >>> low
+    FidelityHandle('adjustable.branin', 'low', a=0.5, transforms=('invert',))
+    >>> with ProcessPoolExecutor() as pool:
+    ...     results = list(pool.map(low, chunks))
+"""
+
+from functools import lru_cache
+
+from . import registry
+from .multi_fidelity_function import invert
+
+
+#: Transformations that can be applied by name when rebuilding a function
+transformations = {
+    'invert': invert,
+}
+
+
+class FidelityHandle:
+    """Picklable reference to one fidelity of a registered function"""
+
+    __slots__ = ('name', 'fidelity', 'a', 'transforms')
+
+    def __init__(self, name, fidelity, a=None, transforms=()):
+        """
+        :param name:       Name of the function in :mod:`mf2.registry`
+        :param fidelity:   Name or index of the fidelity
+        :param a:          Parameter value if the function is adjustable
+        :param transforms: Names of transformations in :data:`transformations`,
+                           in order of application
+        """
+        self.name = name
+        self.fidelity = fidelity
+        self.a = a
+        self.transforms = tuple(transforms)
+
+    def __call__(self, xx):
+        return self.function(xx)
+
+    @property
+    def function(self):
+        """The fidelity function this handle refers to"""
+        return build(self.name, self.a, self.transforms)[self.fidelity]
+
+    def __reduce__(self):
+        return FidelityHandle, (self.name, self.fidelity, self.a, self.transforms)
+
+    def __eq__(self, other):
+        return isinstance(other, FidelityHandle) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def _key(self):
+        return self.name, self.fidelity, self.a, self.transforms
+
+    def __repr__(self):
+        return f"FidelityHandle({self.name!r}, {self.fidelity!r}, " \
+               f"a={self.a!r}, transforms={self.transforms!r})"
+
+
+@lru_cache(maxsize=256)
+def build(name, a=None, transforms=()):
+    """Build (and cache) the MultiFidelityFunction identified by the given key
+
+    The 256 most recently used functions are kept, so workers that see many
+    different values of `a` do not grow without bound.
+
+    :param name:       Name of the function in :mod:`mf2.registry`
+    :param a:          Parameter value if the function is adjustable
+    :param transforms: Names of transformations to apply, in order
+    :return:           MultiFidelityFunction instance
+    """
+    mff = registry.get(name).build(a=a)
+    for transform in transforms:
+        mff = transformations[transform](mff)
+    return mff
+
+
+def handle(mff, fidelity):
+    """Create a :class:`FidelityHandle` for a fidelity of `mff`
+
+    :param mff:      Registered MultiFidelityFunction, or a function derived
+                     from one by fixing `a` and/or applying transformations
+    :param fidelity: Name or index of the fidelity
+    :return:         FidelityHandle
+    """
+    base, a, transforms = mff._origin or (mff, None, ())
+    entry = registry.find(base)
+    if entry is None:
+        raise ValueError(f"{mff.name} is not derived from a registered function")
+    return FidelityHandle(entry.name, fidelity, a, transforms)
+
+
+def handles(mff):
+    """Create a :class:`FidelityHandle` for each fidelity of `mff`, in the same
+    order as `mff.functions`
+    """
+    names = mff.fidelity_names or range(len(mff.functions))
+    return [handle(mff, fidelity) for fidelity in names]
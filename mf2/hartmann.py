@@ -52,9 +52,13 @@ with the following matrices and vectors:
 
 """
 
+import math
+
 import numpy as np
 
-from .multi_fidelity_function import MultiFidelityFunction
+from .grid import fallback
+from .multi_fidelity_function import MultiFidelityFunction, as_point, as_rows
+from .workspace import evaluate
 
 # Some constant values for the Hartmann 6d calculations
 _alpha6_high = np.array([1.0, 1.2, 3.0, 3.2])[:, np.newaxis]
@@ -71,37 +75,79 @@ _P6 = np.array([
     [.2348, .1451, .3522, .2883, .3047, .6650],
     [.4047, .8828, .8732, .5743, .1091, .0381],
 ]).T[np.newaxis,:,:]
-_four_nine_exp = np.exp(-4 / 9)
+_four_nine_exp = math.exp(-4 / 9)
 
 
 def hartmann6_hf(xx):
-    xx = np.atleast_2d(xx)
-
-    xx = xx[:,:,np.newaxis]
-
-    tmp1 = (xx - _P6) ** 2 * _A6
-    tmp2 = np.exp(-np.sum(tmp1, axis=1))
-    tmp3 = tmp2.dot(_alpha6_high) + 2.58
-
-    return -(1/1.94) * tmp3.reshape((-1,))
+    return evaluate(_hartmann6, as_rows(xx), low=False)
 
 
 def hartmann6_lf(xx):
-    xx = np.atleast_2d(xx)
+    return evaluate(_hartmann6, as_rows(xx), low=True)
+
 
-    xx = xx[:,:,np.newaxis]
+def _hartmann6(xx, low, xp=np):
+    """Row-level implementation of :func:`hartmann6_hf` and, if `low`,
+    :func:`hartmann6_lf`"""
+    xx = xx[:,:,None]
 
-    tmp1 = (xx - _P6) ** 2 * _A6
-    tmp2 = _f_exp(-np.sum(tmp1, axis=1))
-    tmp3 = tmp2.dot(_alpha6_low) + 2.58
+    tmp1 = (xx - xp.asarray(_P6)) ** 2 * xp.asarray(_A6)
+    if low:
+        tmp2 = _f_exp(-xp.sum(tmp1, axis=1))
+        tmp3 = tmp2 @ xp.asarray(_alpha6_low) + 2.58
+    else:
+        tmp2 = xp.exp(-xp.sum(tmp1, axis=1))
+        tmp3 = tmp2 @ xp.asarray(_alpha6_high) + 2.58
 
-    return -(1/1.94) * tmp3.reshape((-1,))
+    return -(1/1.94) * xp.reshape(tmp3, (-1,))
 
 
 def _f_exp(xx):
     return (_four_nine_exp + (_four_nine_exp * (xx + 4)/9)) ** 9
 
 
+# Python copies of the constants for the scalar fast paths
+_A6_rows = _A6[0].T.tolist()
+_P6_rows = _P6[0].T.tolist()
+_alpha6_high_list = _alpha6_high.ravel().tolist()
+_alpha6_low_list = _alpha6_low.ravel().tolist()
+
+
+def _hartmann6_exponents(x):
+    """Inner sums of the Hartmann6 function for a single point"""
+    x = as_point(x)
+    return [
+        -sum(a * (xj - p) ** 2 for xj, a, p in zip(x, a_row, p_row))
+        for a_row, p_row in zip(_A6_rows, _P6_rows)
+    ]
+
+
+def _hartmann6_hf_point(x):
+    exponents = _hartmann6_exponents(x)
+    total = sum(alpha * math.exp(e) for alpha, e in zip(_alpha6_high_list, exponents))
+    return -(1/1.94) * (total + 2.58)
+
+
+def _hartmann6_lf_point(x):
+    exponents = _hartmann6_exponents(x)
+    total = sum(alpha * (_four_nine_exp + (_four_nine_exp * (e + 4)/9)) ** 9
+                for alpha, e in zip(_alpha6_low_list, exponents))
+    return -(1/1.94) * (total + 2.58)
+
+
+hartmann6_hf.point = _hartmann6_hf_point
+hartmann6_lf.point = _hartmann6_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+hartmann6_hf.on_grid = fallback(hartmann6_hf)
+hartmann6_lf.on_grid = fallback(hartmann6_lf)
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking.
+# Dominated by the (N, 6, 4) intermediate tensors.
+hartmann6_hf.bytes_per_row = 400
+hartmann6_lf.bytes_per_row = 400
+
+
 #: Lower bound for Hartmann6 function
 l_bound = [0.1] * 6
 #: Upper bound for Hartmann6 function
@@ -17,9 +17,16 @@ Function definitions:
     f_l(x_1, x_2) = f_h(0.5x_1, 0.8x_2) + x_2^3 - (x_1+1)^2
 """
 
-import numpy as np
+from .grid import open_axes
+from .multi_fidelity_function import MultiFidelityFunction, as_columns, as_point
 
-from .multi_fidelity_function import MultiFidelityFunction
+
+def _himmelblau(x1, x2):
+    """Column-level implementation of :func:`himmelblau_hf`, also for single points"""
+    term1 = (x1**2 + x2 - 11)**2
+    term2 = (x2**2 + x1 - 7)**2
+
+    return term1 + term2
 
 
 def himmelblau_hf(xx):
@@ -29,14 +36,8 @@ def himmelblau_hf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
-
-    term1 = (x1**2 + x2 - 11)**2
-    term2 = (x2**2 + x1 - 7)**2
-
-    return term1 + term2
+    x1, x2 = as_columns(xx)
+    return _himmelblau(x1, x2)
 
 
 def himmelblau_lf(xx):
@@ -49,16 +50,46 @@ def himmelblau_lf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
+    x1, x2 = as_columns(xx)
 
-    term1 = himmelblau_hf(np.hstack([0.5*x1.reshape(-1,1), 0.8*x2.reshape(-1,1)]))
+    term1 = _himmelblau(0.5*x1, 0.8*x2)
     term2 = x2**3 - (x1 + 1)**2
 
     return term1 + term2
 
 
+def _himmelblau_hf_point(x):
+    x1, x2 = as_point(x)
+    return float(_himmelblau(x1, x2))
+
+
+def _himmelblau_lf_point(x):
+    x1, x2 = as_point(x)
+    return float(_himmelblau(0.5*x1, 0.8*x2) + x2**3 - (x1 + 1)**2)
+
+
+def _himmelblau_hf_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _himmelblau(x1, x2)
+
+
+def _himmelblau_lf_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _himmelblau(0.5*x1, 0.8*x2) + x2**3 - (x1 + 1)**2
+
+
+himmelblau_hf.point = _himmelblau_hf_point
+himmelblau_lf.point = _himmelblau_lf_point
+
+# Terms of a single variable are computed per axis value, see mf2.grid
+himmelblau_hf.on_grid = _himmelblau_hf_on_grid
+himmelblau_lf.on_grid = _himmelblau_lf_on_grid
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+himmelblau_hf.bytes_per_row = 32
+himmelblau_lf.bytes_per_row = 48
+
+
 #: Lower bound for Himmelblau function
 l_bound = [-4, -4]
 #: Upper bound for Himmelblau function
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+incremental.py:
+
+Incremental evaluation of single-coordinate changes to a base point, as made
+by coordinate descent or local search. The base point and its function value
+are cached in an :class:`IncrementalState`.
+
+Fidelities that are a sum of terms over the dimensions, or of terms of
+neighbouring dimensions, such as Forrester and Trid, declare a `delta(x, i, v)`
+attribute: the change in function value when `x[i]` is set to `v`. Every change
+then takes O(1) time instead of O(ndim). For all other functions, the changed
+points are evaluated in full.
+
+As the value of the base point is updated by adding deltas for every
+:meth:`~IncrementalState.move`, it is re-evaluated in full every
+:data:`refresh_interval` moves to avoid accumulating rounding errors.
+
+Example:
+
+    >>> state = incremental(mf2.Forrester(ndim=1000).high, x)
+    >>> values = state.evaluate_changes([3, 3, 500], [0.1, 0.9, 0.2])
+    >>> state.move(3, 0.9)
+    >>> state.value
+"""
+
+import numpy as np
+
+from .chunking import evaluate
+from .multi_fidelity_function import evaluate_point
+
+
+#: Number of moves after which the base value is re-evaluated in full
+refresh_interval = 1000
+
+
+def incremental(func, x) -> 'IncrementalState':
+    """Cache the evaluation of `func` at base point `x` for incremental changes
+
+    :param func: A fidelity function, e.g. ``mf2.Forrester(1000).high``
+    :param x:    The base point, a single point as list, tuple or 1D array
+    :return:     IncrementalState instance
+    """
+    return IncrementalState(func, x)
+
+
+class IncrementalState:
+    """Base point `x` with its function `value`, to evaluate single-coordinate
+    changes relative to it"""
+
+    def __init__(self, func, x):
+        self.func = func
+        self.x = np.array(x, dtype=float).ravel()
+        self.value = evaluate_point(func, self.x)
+        self._moves = 0
+
+    @property
+    def ndim(self):
+        return len(self.x)
+
+    def evaluate_changes(self, indices, values) -> np.ndarray:
+        """Function values of the base point with ``x[indices[k]] = values[k]``,
+        each change applied separately
+
+        :param indices: Coordinate index per change
+        :param values:  New value of the coordinate per change
+        :return:        1D array with the function value per change
+        """
+        indices, values = np.broadcast_arrays(self._as_indices(indices),
+                                              np.asarray(values, dtype=float))
+        indices, values = indices.ravel(), values.ravel()
+
+        delta = getattr(self.func, 'delta', None)
+        if delta is not None:
+            return self.value + delta(self.x, indices, values)
+
+        candidates = np.repeat(self.x.reshape(1, -1), len(indices), axis=0)
+        candidates[np.arange(len(indices)), indices] = values
+        return np.asarray(evaluate(self.func, candidates), dtype=float)
+
+    def move(self, index, value) -> float:
+        """Set ``x[index] = value`` in the base point and update its value
+
+        :return: The new function value of the base point
+        """
+        if getattr(self.func, 'delta', None) is None:
+            self.x[self._as_indices(index)] = value
+            return self.refresh()
+
+        self.value = float(self.evaluate_changes(index, value)[0])
+        self.x[self._as_indices(index)] = value
+        self._moves += 1
+        if self._moves >= refresh_interval:
+            self.refresh()
+        return self.value
+
+    def refresh(self) -> float:
+        """Re-evaluate the base point in full, discarding accumulated rounding
+        errors of previous moves"""
+        self.value = evaluate_point(self.func, self.x)
+        self._moves = 0
+        return self.value
+
+    def _as_indices(self, indices):
+        indices = np.asarray(indices)
+        if not np.issubdtype(indices.dtype, np.integer):
+            raise TypeError(f"Coordinate indices must be integers, not {indices.dtype}")
+        if np.any((indices < -self.ndim) | (indices >= self.ndim)):
+            raise IndexError(f"Coordinate index out of range for {self.ndim} dimensions")
+        return indices % self.ndim
+
+    def __repr__(self):
+        return f"IncrementalState({self.func!r}, value={self.value})"
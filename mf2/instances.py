@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+r"""
+instances.py:
+
+Random instances of any MultiFidelityFunction, in the style of the BBOB
+benchmark suite: a seeded random rotation around the optimum, a shift of the
+optimum to a random location, a random offset of the output, and optionally a
+random embedding into a higher-dimensional ambient space, of which only a
+random `ndim`-dimensional linear subspace affects the function value.
+
+All transformations of the input are combined into a single affine map,
+which is applied as one matrix multiplication per call:
+
+.. math::
+
+    f_{inst}(z) = f(zA + b) + f_{offset}
+
+Rotation and embedding are applied to inputs normalized to :math:`[-1, 1]`
+per dimension, and rotated inputs may lie outside the original bounds. The
+optimum, if known, is mapped to its new location, and all fidelities of an
+instance share the same transformations. Instances with the same seed are
+identical, and their matrices are cached.
+
+Example:
+
+    >>> inst = instance(mf2.hartmann6, seed=3)
+    >>> inst.high(inst.x_opt) == mf2.hartmann6.high(mf2.hartmann6.x_opt) + inst.offset
+    >>> embedded = instance(mf2.branin, seed=3, ambient_ndim=100)
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .grid import streamed
+from .multi_fidelity_function import AdjustableMultiFidelityFunction, MultiFidelityFunction, \
+    array_namespace, as_point, as_rows, evaluate_point
+
+
+#: Absolute bound on the random output offsets
+max_offset = 1000
+
+#: Absolute bound on the random location of the shifted optimum, in
+#: normalized coordinates
+max_shift = 0.8
+
+
+def instance(mff: MultiFidelityFunction, seed: int, *, rotate: bool=True,
+             shift: bool=True, offset: bool=True,
+             ambient_ndim: int=None) -> MultiFidelityFunction:
+    """Create a random instance of `mff`
+
+    :param mff:          MultiFidelityFunction, with `a` already fixed for
+                         adjustable functions
+    :param seed:         Instance number, seeds all random transformations
+    :param rotate:       Rotate the input space around the optimum
+    :param shift:        Move the optimum to a random location. Without
+                         shift, a ValueError is raised if rotation or
+                         embedding moves the optimum out of the bounds.
+    :param offset:       Add a random offset to the output
+    :param ambient_ndim: If given, embed the function in a space of this many
+                         dimensions, with bounds :math:`[-1, 1]`
+    :return:             A new MultiFidelityFunction with an `offset` attribute
+    """
+    if isinstance(mff, AdjustableMultiFidelityFunction):
+        raise ValueError(f"{mff.name} is adjustable, fix `a` before creating instances")
+    ndim = mff.ndim
+    if ambient_ndim is not None and ambient_ndim < ndim:
+        raise ValueError(f"ambient_ndim must be at least {ndim}, not {ambient_ndim}")
+
+    l_bound, u_bound = np.asarray(mff.l_bound, dtype=float), np.asarray(mff.u_bound, dtype=float)
+    center, half_width = (u_bound + l_bound) / 2, (u_bound - l_bound) / 2
+    has_optimum = mff.x_opt is not None
+    u_opt = (np.asarray(mff.x_opt, dtype=float) - center) / half_width if has_optimum else np.zeros(ndim)
+
+    # normalized input v is mapped to normalized original input u = u_opt + (v - v_opt) @ M
+    M = np.eye(ndim)
+    if rotate:
+        M = _rotation(ndim, seed).T
+    if ambient_ndim is not None:
+        embedding = _embedding(ndim, ambient_ndim, seed)
+        M = embedding.T @ M
+    v_opt = u_opt @ M.T  # M has orthonormal columns, so this maps to u_opt
+    rng = np.random.default_rng((seed, 2))
+    if shift:
+        v_opt = rng.uniform(-max_shift, max_shift, size=len(M))
+    elif has_optimum and np.any(np.abs(v_opt) > 1 + 1e-9):
+        raise ValueError(f"The optimum of {mff.name} lies outside the bounds after rotating "
+                         f"or embedding with seed {seed}, use shift=True instead")
+    f_offset = float(np.round(rng.uniform(-max_offset, max_offset), 2)) if offset else 0.0
+
+    # combined affine map from the input z of the instance to the original input x
+    if ambient_ndim is None:  # v = (z - center) / half_width, same bounds as `mff`
+        M = M / half_width.reshape(-1, 1)
+        z_opt = center + half_width * v_opt
+        new_l_bound, new_u_bound = l_bound, u_bound
+    else:  # v = z
+        z_opt = v_opt
+        new_l_bound, new_u_bound = -np.ones(ambient_ndim), np.ones(ambient_ndim)
+    A = M * half_width
+    b = center + half_width * u_opt - z_opt @ A
+    A.flags.writeable = b.flags.writeable = False
+
+    wrapped = MultiFidelityFunction(
+        f'{mff._name} instance {seed}',
+        u_bound=new_u_bound, l_bound=new_l_bound,
+        functions=[_AffineFunction(f, A, b, f_offset) for f in mff.functions],
+        fidelity_names=mff.fidelity_names,
+        # clipping only removes rounding errors, e.g. for an optimum on the bounds
+        x_opt=np.clip(z_opt, new_l_bound, new_u_bound) if has_optimum else None,
+        maximize=mff.maximize,
+    )
+    wrapped.offset = f_offset
+    return wrapped
+
+
+@lru_cache(maxsize=128)
+def _rotation(ndim, seed):
+    """Random orthogonal matrix, uniformly distributed (QR with sign correction)"""
+    rng = np.random.default_rng((seed, 0))
+    q, r = np.linalg.qr(rng.standard_normal((ndim, ndim)))
+    q *= np.sign(np.diag(r))
+    q.flags.writeable = False
+    return q
+
+
+@lru_cache(maxsize=128)
+def _embedding(ndim, ambient_ndim, seed):
+    """Random `(ndim, ambient_ndim)` matrix with orthonormal rows"""
+    rng = np.random.default_rng((seed, 1))
+    q, _ = np.linalg.qr(rng.standard_normal((ambient_ndim, ndim)))
+    embedding = np.ascontiguousarray(q.T)
+    embedding.flags.writeable = False
+    return embedding
+
+
+class _AffineFunction:
+    """Picklable fidelity `func(zz @ A + b) + offset`"""
+
+    def __init__(self, func, A, b, offset=0.0):
+        self.func = func
+        self.A = A
+        self.b = b
+        self.offset = offset
+
+    def __call__(self, zz):
+        zz = as_rows(zz)
+        xp = array_namespace(zz)
+        if xp is np:
+            xx = zz @ self.A
+            xx += self.b
+        else:
+            xx = zz @ xp.asarray(self.A) + xp.asarray(self.b)
+        return self.func(xx) + self.offset
+
+    @property
+    def bytes_per_row(self):
+        """Memory of the wrapped function, plus the transformed input"""
+        inner = getattr(self.func, 'bytes_per_row', None)
+        if callable(inner):
+            inner = inner(self.A.shape[1])
+        return None if inner is None else inner + 8*self.A.shape[1]
+
+    def point(self, z):
+        x = np.asarray(as_point(z), dtype=float) @ self.A + self.b
+        return evaluate_point(self.func, x) + self.offset
+
+    def on_grid(self, axes):
+        return streamed(self, axes)
@@ -9,17 +9,28 @@ functions that are commonly used by the various mf-functions in this package.
 """
 
 from functools import partial
-from numbers import Integral
+from numbers import Integral, Real
 from typing import Callable
 from warnings import warn
 
 import numpy as np
 
+from . import tracing
+from .optima import find_optima
+
+try:
+    import array_api_compat
+except ImportError:  # optional, only needed for arrays without __array_namespace__
+    array_api_compat = None
+
 
 class MultiFidelityFunction:
 
+    # whether calls to the fidelities are traced when mf2.tracing is enabled
+    _traceable = True
+
     def __init__(self, name, u_bound, l_bound, functions, fidelity_names=None,
-                 *, x_opt=None):
+                 *, x_opt=None, maximize=False):
         """All fidelity levels and parameters of a multi-fidelity function.
 
         :param name:           Name of the multi-fidelity function.
@@ -37,8 +48,11 @@ class MultiFidelityFunction:
                                `f.high()`
         :param x_opt:          Location of optimum x_opt for highest fidelity
                                (if known).
+        :param maximize:       Whether the optimum is a maximum rather than a
+                               minimum, e.g. for Currin.
         """
         self._name = name
+        self.maximize = maximize
         self.u_bound = np.array(u_bound, dtype=float)
         self.l_bound = np.array(l_bound, dtype=float)
         self._check_bounds()
@@ -46,18 +60,40 @@ class MultiFidelityFunction:
         self.x_opt = x_opt if x_opt is None else np.array(np.atleast_1d(x_opt),
                                                           dtype=float)
         self._check_x_opt_in_bounds()
-
+        self._optima = None
+        # (base function, a, transforms) if derived from another function
+        self._origin = None
+
+        self.fidelity_names = fidelity_names if fidelity_names else None
+        self._check_fidelity_names()
+        self._set_functions(functions)
+        tracing.register(self)
+
+
+    def _check_fidelity_names(self):
+        """Fidelity names are also set as attributes, so they may not be
+        the name of an existing attribute or method"""
+        existing = set(dir(type(self))) | set(vars(self)) | {'fidelity_dict'}
+        for name in self.fidelity_names or ():
+            if name in existing:
+                raise ValueError(f"Fidelity name {name!r} is already an attribute of "
+                                 f"{type(self).__name__}, use another name")
+
+
+    def _set_functions(self, functions):
+        """Store the fidelity functions and make them accessible by name"""
+        from .reductions import attach
+        for func in functions or ():
+            attach(func)
         self._functions = functions
-        if fidelity_names:
+        if self.fidelity_names:
             # dict-style name-indexing
-            self.fidelity_names = fidelity_names
-            self.fidelity_dict = dict(zip(fidelity_names, functions))
+            self.fidelity_dict = dict(zip(self.fidelity_names, functions))
             # class-style indexing
-            for name, func in zip(fidelity_names, functions):
+            for name, func in zip(self.fidelity_names, functions):
                 setattr(self, name, func)
         else:
             self.fidelity_dict = None
-            self.fidelity_names = None
 
 
     @property
@@ -82,6 +118,30 @@ class MultiFidelityFunction:
         return np.array([self.l_bound, self.u_bound], dtype=float)
 
 
+    @property
+    def optima(self):
+        """Global optimum of each fidelity as a list of
+        :class:`~mf2.optima.Optimum`: the maximum if :attr:`maximize` is set,
+        the minimum otherwise. Determined once using
+        :func:`~mf2.optima.find_optima` when first accessed."""
+        if self._optima is None:
+            self._optima = find_optima(self)
+        return self._optima
+
+
+    @property
+    def f_opt(self):
+        """Optimal value of the highest fidelity, e.g. to compute regret.
+        The maximum if :attr:`maximize` is set, the minimum otherwise."""
+        return self.optima[0].f
+
+
+    @property
+    def x_opt_low(self):
+        """Location of the optimum of the lowest fidelity."""
+        return self.optima[-1].x
+
+
     def _check_bounds(self):
         """Perform sanity checks on given bounds"""
         if len(self.u_bound) != len(self.l_bound):
@@ -120,15 +180,69 @@ class MultiFidelityFunction:
             raise IndexError(f"Invalid index '{item}'")
 
 
+    def evaluate_mixed(self, xx, fidelity_idx):
+        """Evaluate every row of `xx` at its own fidelity
+
+        Rows are grouped by fidelity, so each fidelity is called at most once.
+        If all rows share a fidelity, `xx` is passed on without copying.
+
+        :param xx:           Points in any input format the fidelities accept
+        :param fidelity_idx: Index or name of the fidelity per row, or a single
+                             index or name for all rows
+        :return:             1D array of function values in the order of `xx`
+        """
+        xx = as_rows(xx)
+        indices = self._fidelity_indices(fidelity_idx, len(xx))
+
+        used = np.flatnonzero(np.bincount(indices, minlength=len(self.functions)))
+        if len(used) == 1:
+            return self.functions[used[0]](xx)
+
+        y = np.empty(len(xx))
+        for fidelity in used:
+            rows = np.flatnonzero(indices == fidelity)
+            y[rows] = self.functions[fidelity](xx[rows])
+        return y
+
+
+    def _fidelity_indices(self, fidelity_idx, num_rows):
+        """Convert fidelity indices and/or names to non-negative indices"""
+        num_fidelities = len(self.functions)
+        if not isinstance(fidelity_idx, np.ndarray) and \
+                np.asarray(fidelity_idx).dtype.kind not in 'iu':
+            # sequence of names, possibly mixed with integer indices
+            fidelity_idx = np.asarray(fidelity_idx, dtype=object)
+        fidelity_idx = np.asarray(fidelity_idx)
+        fidelity_idx = np.broadcast_to(fidelity_idx, (num_rows,))
+
+        if fidelity_idx.dtype.kind in 'iu':
+            indices = fidelity_idx.astype(np.intp)
+        else:
+            indices = np.full(num_rows, -num_fidelities-1, dtype=np.intp)
+            for idx, name in enumerate(self.fidelity_names or []):
+                indices[fidelity_idx == name] = idx
+            if fidelity_idx.dtype.kind == 'O':
+                for idx in range(-num_fidelities, num_fidelities):
+                    indices[fidelity_idx == idx] = idx
+
+        invalid = (indices < -num_fidelities) | (indices >= num_fidelities)
+        if np.any(invalid):
+            raise IndexError(f"Invalid index '{fidelity_idx[np.argmax(invalid)]}'")
+        return indices % num_fidelities
+
+
     def __repr__(self):
         return f"MultiFidelityFunction({self.name}, {self.u_bound}, {self.l_bound}, fidelity_names={self.fidelity_names})"
 
 
 class AdjustableMultiFidelityFunction(MultiFidelityFunction):
 
+    # only the functions created by fixing `a` are traced
+    _traceable = False
+
     def __init__(self, name, u_bound, l_bound, static_functions,
                  adjustable_functions, fidelity_names=None,
-                 *, x_opt=None):
+                 *, x_opt=None, maximize=False, correlation_table=None):
         """All fidelity levels and parameters of a multi-fidelity function.
 
         :param name:                  Name of the multi-fidelity function.
@@ -149,24 +263,64 @@ class AdjustableMultiFidelityFunction(MultiFidelityFunction):
                                       `f['high']()` and `f.high()`
         :param x_opt:                 Location of optimum x_opt for highest
                                       fidelity (if known).
+        :param maximize:              Whether the optimum is a maximum rather
+                                      than a minimum.
+        :param correlation_table:     Sequence of (a, correlation) pairs, giving
+                                      the correlation between the highest and
+                                      lowest fidelity for a monotonic range of
+                                      `a`. Used by :meth:`for_correlation`.
         """
         name = name if name.startswith('adjustable') else f'adjustable {name}'
         self.static_functions = static_functions
         self.adjustable_functions = adjustable_functions
+        self.correlation_table = correlation_table if correlation_table is None \
+                                 else np.array(correlation_table, dtype=float)
 
         super().__init__(name, u_bound, l_bound, self.functions,
-                         fidelity_names=fidelity_names, x_opt=x_opt)
+                         fidelity_names=fidelity_names, x_opt=x_opt, maximize=maximize)
 
 
     def __call__(self, a: float) -> MultiFidelityFunction:
         """Fix adjustment to create a MultiFidelityFunction"""
-        return MultiFidelityFunction(
+        mff = MultiFidelityFunction(
             f'{self._name} {a}',
             self.u_bound, self.l_bound,
-            self.static_functions + [partial(f, a=a) for f in self.adjustable_functions],
+            self.static_functions + [_fix_parameter(f, a) for f in self.adjustable_functions],
             fidelity_names=self.fidelity_names,
             x_opt=self.x_opt,
+            maximize=self.maximize,
         )
+        mff._origin = (self, a, ())
+        return mff
+
+
+    def for_correlation(self, correlation: float) -> MultiFidelityFunction:
+        """Fix adjustment to create a MultiFidelityFunction with the given
+        correlation between highest and lowest fidelity.
+
+        The value of `a` is linearly interpolated from `correlation_table`.
+
+        :param correlation: Desired correlation, must lie within the range
+                            covered by `correlation_table`.
+        :return:            A MultiFidelityFunction instance
+        """
+        if self.correlation_table is None:
+            raise ValueError(f"No correlation table available for {self.name}")
+
+        a_values, correlations = self.correlation_table.T
+        order = np.argsort(correlations)
+        a_values, correlations = a_values[order], correlations[order]
+        if not correlations[0] <= correlation <= correlations[-1]:
+            raise ValueError(f"Correlation {correlation} out of range for "
+                             f"{self.name}: [{correlations[0]}, {correlations[-1]}]")
+
+        return self(float(np.interp(correlation, correlations, a_values)))
+
+
+    @property
+    def optima(self):
+        raise ValueError(f"The optima of {self.name} depend on `a`, use the function "
+                         f"with a fixed `a` instead, e.g. `func(a).optima`")
 
 
     @property
@@ -180,6 +334,147 @@ class AdjustableMultiFidelityFunction(MultiFidelityFunction):
                f"{self.l_bound}, fidelity_names={self.fidelity_names})"
 
 
+class Columns(tuple):
+    """Input of a fidelity function given as one 1-D array per variable
+
+    A plain tuple is read as rows, like any other array-like, so columnar
+    input has to be marked explicitly:
+
+        >>> mf2.booth.high(Columns(x1, x2))
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, *columns):
+        columns = [col if _is_foreign_array(col) else np.asarray(col) for col in columns]
+        if not columns or any(col.ndim != 1 for col in columns):
+            raise ValueError("Columns must be one or more 1-D arrays")
+        return super().__new__(cls, columns)
+
+
+def as_columns(xx, names=None):
+    """Split the input of a fidelity function into 1-D arrays per variable
+
+    Accepted input formats:
+
+    * row-major array-like of shape (ndim,) or (N, ndim), such as a (nested)
+      list, tuple or 2D numpy array. Columns are returned as strided views.
+    * :class:`Columns` of 1-D arrays, one per variable: returned as-is.
+    * dict, pandas DataFrame or numpy structured array, with one entry per
+      variable. Variables are selected by name, from the given `names` or
+      else from ``x1`` up to ``x{ndim}``. Any other set of keys/fields raises
+      a KeyError, as the input most likely contains a misspelled name.
+
+    :param xx:    Input in any of the formats above
+    :param names: Optional names of the variables in order
+    :return:      Sequence of 1-D arrays, one for each variable
+    """
+    if isinstance(xx, Columns):
+        return xx
+
+    if _is_foreign_array(xx):
+        xx = as_rows(xx)
+        return [xx[:, i] for i in range(xx.shape[1])]
+
+    keys = _keys(xx)
+    if keys is None:
+        return np.atleast_2d(xx).T
+
+    if names is None:
+        names = [f'x{i}' for i in range(1, len(keys)+1)]
+    if set(keys) != set(names):
+        missing = [name for name in names if name not in keys]
+        unknown = [key for key in keys if key not in names]
+        raise KeyError(f"Input variables do not match {list(names)}: missing {missing}, "
+                       f"unknown {unknown}")
+    return [xx[key] if _is_foreign_array(xx[key]) else np.atleast_1d(np.asarray(xx[key]))
+            for key in names]
+
+
+def as_rows(xx, names=None):
+    """Return the input of a fidelity function as a 2D array of shape (N, ndim)
+
+    Row-major input is not copied, columnar input as accepted by
+    :func:`as_columns` is stacked into a new array.
+    """
+    if isinstance(xx, Columns) or _keys(xx) is not None:
+        columns = as_columns(xx, names)
+        return array_namespace(*columns).stack(columns, axis=1)
+    if _is_foreign_array(xx):
+        return xx if xx.ndim == 2 else array_namespace(xx).reshape(xx, (1, -1))
+    return np.atleast_2d(xx)
+
+
+def array_namespace(*arrays):
+    """Return the array API namespace to use for the given arrays
+
+    Numpy arrays and any other input, such as lists, use numpy itself. Arrays
+    of other libraries, such as array-api-strict, Dask or JAX, use their
+    array API standard namespace as determined by `array_api_compat` if it is
+    installed, and by their `__array_namespace__` method otherwise.
+    """
+    foreign = [x for x in arrays if _is_foreign_array(x)]
+    if not foreign:
+        return np
+    if array_api_compat is not None:
+        return array_api_compat.array_namespace(*foreign)
+    return foreign[0].__array_namespace__()
+
+
+def _is_foreign_array(x):
+    """Whether `x` is an array, but not a numpy array"""
+    if isinstance(x, (np.ndarray, np.generic, list, tuple, Real)):
+        return False
+    if array_api_compat is not None:
+        return array_api_compat.is_array_api_obj(x)
+    return hasattr(x, '__array_namespace__')
+
+
+def _keys(xx):
+    """Keys of dict-like or structured input, None for regular array-likes"""
+    if hasattr(xx, 'keys'):
+        return list(xx.keys())
+    return getattr(getattr(xx, 'dtype', None), 'names', None)
+
+
+def _fix_parameter(func: Callable, a: float) -> Callable:
+    """Fix parameter `a` of an adjustable function, including its fast path"""
+    fixed = partial(func, a=a)
+    if hasattr(func, 'point'):
+        fixed.point = partial(func.point, a=a)
+    if hasattr(func, 'on_grid'):
+        fixed.on_grid = partial(func.on_grid, a=a)
+    if hasattr(func, 'delta'):
+        fixed.delta = partial(func.delta, a=a)
+    if hasattr(func, 'bytes_per_row'):
+        fixed.bytes_per_row = func.bytes_per_row
+    return fixed
+
+
+def as_point(x):
+    """Return a single point as a sequence of Python floats if it is a numpy
+    array, for use with the `math` module in scalar fast paths."""
+    if isinstance(x, np.ndarray):
+        return x.ravel().tolist()
+    if isinstance(x, Real):
+        return [x]
+    return x
+
+
+def evaluate_point(func: Callable, x) -> float:
+    """Evaluate `func` at a single point `x`, using the scalar fast path
+    `func.point` if available.
+
+    :param func: A (vectorized) fidelity function
+    :param x:    A single point as list, tuple or 1D array
+    :return:     Function value as Python float
+    """
+    point = getattr(func, 'point', None)
+    if point is not None:
+        return point(x)
+    return float(func(np.atleast_2d(x))[0])
+
+
 def invert(mff: MultiFidelityFunction) -> MultiFidelityFunction:
     """Invert a MultiFidelityFunction by multiplying all fidelities by -1
 
@@ -189,18 +484,91 @@ def invert(mff: MultiFidelityFunction) -> MultiFidelityFunction:
 
     functions = [_invert_function(f) for f in mff.functions]
 
-    return MultiFidelityFunction(
+    inverted = MultiFidelityFunction(
+        mff._name, mff.u_bound, mff.l_bound,
+        functions,
+        fidelity_names=mff.fidelity_names,
+        x_opt=mff.x_opt,
+        maximize=not mff.maximize,
+    )
+    base, a, transforms = mff._origin or (mff, None, ())
+    inverted._origin = (base, a, transforms + ('invert',))
+    return inverted
+
+
+def with_functions(mff: MultiFidelityFunction, functions) -> MultiFidelityFunction:
+    """Copy of `mff` with its fidelities replaced by `functions`, which must
+    compute the same values, such as wrappers that only change how the
+    original fidelities are evaluated.
+
+    As the values are unchanged, the copy keeps the origin of `mff`, so
+    handles and the registry refer to the original function.
+
+    :param mff:       The MultiFidelityFunction to copy
+    :param functions: Replacement for each function in `mff.functions`
+    :return:          A new MultiFidelityFunction
+    """
+    wrapped = MultiFidelityFunction(
         mff._name, mff.u_bound, mff.l_bound,
         functions,
         fidelity_names=mff.fidelity_names,
         x_opt=mff.x_opt,
+        maximize=mff.maximize,
     )
+    wrapped._origin = mff._origin or (mff, None, ())
+    return wrapped
+
+
+def fidelity_keys(mff: MultiFidelityFunction):
+    """Everything that identifies the values of the fidelities of `mff`, e.g.
+    to store them: the name of each fidelity, the value of `a` and the names
+    of the applied transformations such as ``'invert'``.
+
+    :param mff: The MultiFidelityFunction to identify
+    :return:    Tuple ``(names, a, transforms)``, where `names` are the
+                indices of the fidelities if they have no names, and `a` is
+                None if `mff` is not adjustable
+    """
+    names = mff.fidelity_names or list(range(len(mff.functions)))
+    origin = mff._origin
+    a = None if origin is None or origin[1] is None else float(origin[1])
+    transforms = () if origin is None else tuple(origin[2])
+    return names, a, transforms
 
 
 def _invert_function(func: Callable) -> Callable:
     """Applies a *-1 modification to the given function"""
+    return _InvertedFunction(func)
 
-    def inverted(x):
-        return func(x) * -1
 
-    return inverted
+class _InvertedFunction:
+    """Picklable equivalent of a closure returning `func(x) * -1`"""
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, x):
+        return self.func(x) * -1
+
+    def point(self, x):
+        return -evaluate_point(self.func, x)
+
+    def on_grid(self, axes):
+        from .grid import on_grid
+        return on_grid(self.func, axes) * -1
+
+    @property
+    def delta(self):
+        """Negated change in value of the wrapped function, if available"""
+        inner = getattr(self.func, 'delta', None)
+        if inner is None:
+            return None
+        return lambda x, i, v: -inner(x, i, v)
+
+    @property
+    def bytes_per_row(self):
+        """Memory of the wrapped function, plus the negated output"""
+        inner = getattr(self.func, 'bytes_per_row', None)
+        if callable(inner):
+            return lambda ndim: inner(ndim) + 8
+        return None if inner is None else inner + 8
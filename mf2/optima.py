@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""
+optima.py:
+
+Batched multi-start local optimisation to find and verify the global minimum
+of each fidelity of a multi-fidelity function. All starting points are
+optimised simultaneously, so every iteration only takes a few vectorised
+function calls, regardless of the number of starts.
+
+The local optimiser is a projected quasi-Newton (BFGS) method, using
+finite-difference gradients and a batched backtracking line search. All
+computation is done in the normalized [0, 1]^ndim space spanned by the bounds.
+"""
+
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+
+#: Location `x` and value `f` of an optimum. `verified` is set if no better
+#: point was found in random sampling and multiple starts agree on the value.
+Optimum = namedtuple('Optimum', ['x', 'f', 'verified'])
+
+# Step sizes tried simultaneously in the line search
+_step_sizes = 2.0 ** -np.arange(28)
+
+
+def find_optimum(function, l_bound, u_bound, *, x0=None, n_starts=64,
+                 max_iter=250, n_verify=10_000, tol=1e-10, seed=0):
+    """Find the global minimum of `function` within the given bounds
+
+    :param function: Vectorized function to minimize, such as `f.high`
+    :param l_bound:  Lower bound of the search space
+    :param u_bound:  Upper bound of the search space
+    :param x0:       Optional (list of) additional starting point(s), e.g. a
+                     known approximate optimum
+    :param n_starts: Number of uniform random starting points
+    :param max_iter: Maximum number of iterations per start
+    :param n_verify: Number of uniform random samples used for verification
+    :param tol:      Relative tolerance in function value for convergence,
+                     and to decide whether starts agree on the minimum.
+    :param seed:     Seed for random starts and verification samples
+    :return:         :class:`Optimum` with best location and value found
+    """
+    l_bound = np.asarray(l_bound, dtype=float)
+    width = np.asarray(u_bound, dtype=float) - l_bound
+    ndim = len(l_bound)
+    rng = np.random.default_rng(seed)
+
+    def f(U):
+        y = np.asarray(function(l_bound + U*width), dtype=float).reshape(-1)
+        return np.where(np.isnan(y), np.inf, y)
+
+    U = rng.random((n_starts, ndim))
+    if x0 is not None:
+        U0 = (np.atleast_2d(np.asarray(x0, dtype=float)) - l_bound) / width
+        U = np.vstack([np.clip(U0, 0, 1), U])
+
+    U, fU = _batched_bfgs(f, U, max_iter=max_iter, tol=tol)
+
+    best = np.argmin(fU)
+    f_best = fU[best]
+    agree = np.sum(fU - f_best <= tol * (1 + abs(f_best))) >= 2
+    not_beaten = np.all(f_best <= f(rng.random((n_verify, ndim))))
+
+    return Optimum(l_bound + U[best]*width, f_best, bool(agree and not_beaten))
+
+
+def find_optima(mff, **kwargs):
+    """Find the global optimum of every fidelity of a MultiFidelityFunction:
+    the maximum if `mff.maximize` is set, the minimum otherwise.
+
+    If known, `mff.x_opt` is used as an additional starting point.
+
+    :param mff:    The MultiFidelityFunction to optimize
+    :param kwargs: Passed on to :func:`find_optimum`
+    :return:       List of :class:`Optimum`, one for each fidelity, in the same
+                   order as `mff.functions`
+    """
+    kwargs.setdefault('x0', mff.x_opt)
+    if not mff.maximize:
+        return [find_optimum(func, mff.l_bound, mff.u_bound, **kwargs)
+                for func in mff.functions]
+
+    optima = []
+    for func in mff.functions:
+        x, f, verified = find_optimum(partial(_negated, func), mff.l_bound, mff.u_bound, **kwargs)
+        optima.append(Optimum(x, -f, verified))
+    return optima
+
+
+def _negated(func, x):
+    return -np.asarray(func(x), dtype=float)
+
+
+def _gradient(f, U, h=1e-7):
+    """Central finite-difference gradient of `f` at all rows of `U`,
+    one-sided where a step would leave the [0, 1] bounds
+    """
+    n, ndim = U.shape
+    steps = np.eye(ndim) * h
+    upper = np.clip(U[:, np.newaxis, :] + steps, 0, 1)
+    lower = np.clip(U[:, np.newaxis, :] - steps, 0, 1)
+
+    y = f(np.concatenate([upper, lower]).reshape(-1, ndim)).reshape(2, n, ndim)
+    diag = np.arange(ndim)
+    dist = upper[:, diag, diag] - lower[:, diag, diag]
+    return (y[0] - y[1]) / dist
+
+
+def _batched_bfgs(f, U, *, max_iter, tol):
+    """Projected BFGS on all rows of `U` simultaneously"""
+    n, ndim = U.shape
+    identity = np.eye(ndim)
+    fU = f(U)
+    G = _gradient(f, U)
+    H = np.tile(identity, (n, 1, 1))
+    steepest = np.ones(n, dtype=bool)  # H is (reset to) the identity
+    active = np.isfinite(fU)
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        u, fu, g, h = U[idx], fU[idx], G[idx], H[idx]
+
+        # exclude coordinates at a bound with the gradient pointing outward
+        free = ~(((u <= 0) & (g > 0)) | ((u >= 1) & (g < 0)))
+        g_free = np.where(free, g, 0)
+        p = np.where(free, -np.einsum('nij,nj->ni', h, g_free), 0)
+        reset = np.einsum('ni,ni->n', p, g_free) >= 0
+        p[reset] = -g_free[reset]
+        h[reset] = identity
+        was_steepest = steepest[idx] | reset
+
+        candidates = np.clip(u[:, np.newaxis, :] + _step_sizes[:, np.newaxis] * p[:, np.newaxis, :], 0, 1)
+        f_candidates = f(candidates.reshape(-1, ndim)).reshape(len(idx), -1)
+        best = np.argmin(f_candidates, axis=1)
+        rows = np.arange(len(idx))
+        u_new, f_new = candidates[rows, best], f_candidates[rows, best]
+
+        improved = f_new < fu
+        converged = fu - f_new <= tol * (1 + np.abs(fu))
+        # retry along the gradient before giving up on a quasi-Newton direction
+        retry = ~improved & ~was_steepest
+        h[retry] = identity
+
+        g_new = _gradient(f, u_new)
+        s, y = u_new - u, g_new - g
+        sy = np.einsum('ni,ni->n', s, y)
+        update = improved & (sy > 1e-16)
+        h[update] = _bfgs_update(h[update], s[update], y[update], sy[update])
+
+        U[idx] = np.where(improved[:, np.newaxis], u_new, u)
+        fU[idx] = np.where(improved, f_new, fu)
+        G[idx] = np.where(improved[:, np.newaxis], g_new, G[idx])
+        H[idx] = h
+        steepest[idx] = retry | (was_steepest & ~update)
+        active[idx] = (improved & ~converged) | retry
+
+    return U, fU
+
+
+def _bfgs_update(H, s, y, sy):
+    """Batched BFGS update of the inverse Hessian approximations `H`"""
+    rho = (1 / sy)[:, np.newaxis, np.newaxis]
+    Hy = np.einsum('nij,nj->ni', H, y)
+    yHy = np.einsum('ni,ni->n', y, Hy)[:, np.newaxis, np.newaxis]
+    ss = s[:, :, np.newaxis] * s[:, np.newaxis, :]
+    Hys = Hy[:, :, np.newaxis] * s[:, np.newaxis, :]
+    return H + (1 + yHy*rho) * rho * ss - rho * (Hys + Hys.transpose(0, 2, 1))
@@ -40,33 +40,39 @@ of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
 General Public License for more details.
 """
 
-import numpy as np
-
-from .multi_fidelity_function import MultiFidelityFunction
+import math
 
+import numpy as np
 
-def park91a_hf(xx):
-    """
-    PARK (1991) FUNCTION 1
-
-    INPUT:
-    xx = [x1, x2, x3, x4]
-    """
-    xx = np.atleast_2d(xx)
+from .grid import fallback
+from .multi_fidelity_function import MultiFidelityFunction, as_columns, as_point
+from .workspace import evaluate
 
-    x1, x2, x3, x4 = xx.T
 
+def _park91a(x1, x2, x3, x4, xp=np):
+    """Column-level implementation of :func:`park91a_hf`. Also evaluates
+    single points if `xp` is the `math` module."""
     term1a = x1 / 2
-    term1b = np.sqrt(1 + (x2 + x3 ** 2) * x4 / (x1 ** 2)) - 1
+    term1b = xp.sqrt(1 + (x2 + x3 ** 2) * x4 / (x1 ** 2)) - 1
     term1 = term1a * term1b
 
     term2a = x1 + 3 * x4
-    term2b = np.exp(1 + np.sin(x3))
+    term2b = xp.exp(1 + xp.sin(x3))
     term2 = term2a * term2b
 
     return term1 + term2
 
 
+def park91a_hf(xx):
+    """
+    PARK (1991) FUNCTION 1
+
+    INPUT:
+    xx = [x1, x2, x3, x4]
+    """
+    return evaluate(_park91a, *as_columns(xx))
+
+
 def park91a_lf(xx):
     """
     PARK (1991) FUNCTION 1, LOWER FIDELITY CODE
@@ -77,17 +83,42 @@ def park91a_lf(xx):
     INPUT:
     xx = [x1, x2, x3, x4]
     """
-    xx = np.atleast_2d(xx)
+    return evaluate(_park91a_lf, *as_columns(xx))
+
 
-    x1, x2, x3, _ = xx.T
-    yh = park91a_hf(xx)
+def _park91a_lf(x1, x2, x3, x4, xp=np):
+    """Column-level implementation of :func:`park91a_lf`"""
+    yh = _park91a(x1, x2, x3, x4, xp)
 
-    term1 = (1 + np.sin(x1) / 10) * yh
+    term1 = (1 + xp.sin(x1) / 10) * yh
     term2 = -2 * x1 + x2 ** 2 + x3 ** 2
 
     return term1 + term2 + 0.5
 
 
+def _park91a_hf_point(x):
+    x1, x2, x3, x4 = as_point(x)
+    return float(_park91a(x1, x2, x3, x4, math))
+
+
+def _park91a_lf_point(x):
+    x1, x2, x3, x4 = as_point(x)
+    yh = _park91a(x1, x2, x3, x4, math)
+    return float((1 + math.sin(x1) / 10) * yh - 2 * x1 + x2 ** 2 + x3 ** 2 + 0.5)
+
+
+park91a_hf.point = _park91a_hf_point
+park91a_lf.point = _park91a_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+park91a_hf.on_grid = fallback(park91a_hf)
+park91a_lf.on_grid = fallback(park91a_lf)
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+park91a_hf.bytes_per_row = 64
+park91a_lf.bytes_per_row = 64
+
+
 #: Lower bound for Park91A function
 l_bound = [1e-8, 0, 0, 0]
 #: Upper bound for Park91A function
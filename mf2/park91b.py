@@ -37,9 +37,22 @@ of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
 General Public License for more details.
 """
 
+import math
+
 import numpy as np
 
-from .multi_fidelity_function import MultiFidelityFunction
+from .grid import fallback
+from .multi_fidelity_function import MultiFidelityFunction, array_namespace, as_columns, as_point
+
+
+def _park91b(x1, x2, x3, x4, xp=np):
+    """Column-level implementation of :func:`park91b_hf`. Also evaluates
+    single points if `xp` is the `math` module."""
+    term1 = (2 / 3) * xp.exp(x1 + x2)
+    term2 = -x4 * xp.sin(x3)
+    term3 = x3
+
+    return term1 + term2 + term3
 
 
 def park91b_hf(xx):
@@ -49,15 +62,8 @@ def park91b_hf(xx):
     INPUT:
     xx = [x1, x2, x3, x4]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2, x3, x4 = xx.T
-
-    term1 = (2 / 3) * np.exp(x1 + x2)
-    term2 = -x4 * np.sin(x3)
-    term3 = x3
-
-    return term1 + term2 + term3
+    x1, x2, x3, x4 = as_columns(xx)
+    return _park91b(x1, x2, x3, x4, array_namespace(x1))
 
 
 def park91b_lf(xx):
@@ -70,12 +76,31 @@ def park91b_lf(xx):
     INPUT:
     xx = [x1, x2, x3, x4]
     """
-    xx = np.atleast_2d(xx)
-
     yh = park91b_hf(xx)
     return 1.2 * yh - 1
 
 
+def _park91b_hf_point(x):
+    x1, x2, x3, x4 = as_point(x)
+    return float(_park91b(x1, x2, x3, x4, math))
+
+
+def _park91b_lf_point(x):
+    return 1.2 * _park91b_hf_point(x) - 1
+
+
+park91b_hf.point = _park91b_hf_point
+park91b_lf.point = _park91b_lf_point
+
+# Not separable, so grids are evaluated in blocks of points, see mf2.grid
+park91b_hf.on_grid = fallback(park91b_hf)
+park91b_lf.on_grid = fallback(park91b_lf)
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+park91b_hf.bytes_per_row = 40
+park91b_lf.bytes_per_row = 40
+
+
 #: Lower bound for Park91B function
 l_bound = [0, 0, 0, 0]
 #: Upper bound for Park91B function
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+"""
+recording.py:
+
+Append-only log of every evaluation, to audit and exactly reproduce long
+optimization runs. A :class:`Recorder` wraps a MultiFidelityFunction such that
+all calls are logged with function name, fidelity, parameter `a`, applied
+transformations such as ``'invert'``, input `X`, output `y` and timestamp. A
+:class:`Replayer` serves the same calls from the log without evaluating the
+function again.
+
+Calls are buffered in memory and written in segments of at least
+`segment_rows` rows to a log directory:
+
+* ``000000-X.npy``, ``000000-y.npy``, ...: the flattened inputs and the
+  outputs of all calls in a segment, bit-for-bit as float64
+* ``index.jsonl``: one line per call, with the segment and offsets of its data
+
+The index is only extended after the segment files have been written, so an
+interrupted run leaves a consistent log of all completed segments. A trailing
+index line that was cut off is ignored. Buffered calls are also written when a
+recorder is garbage collected or the interpreter exits without closing it.
+Recording to an existing log directory appends to it.
+
+Example:
+
+    >>> with Recorder('run-log') as recorder:
+    ...     branin = recorder.wrap(mf2.branin)
+    ...     y = branin.high(X)
+    >>> with Replayer('run-log') as replayer:
+    ...     branin = replayer.wrap(mf2.branin)
+    ...     assert np.array_equal(branin.high(X), y)  # read from the log
+"""
+
+from collections import namedtuple
+import json
+from pathlib import Path
+from threading import Lock
+from time import time
+import weakref
+
+import numpy as np
+
+from .multi_fidelity_function import MultiFidelityFunction, as_rows, fidelity_keys, with_functions
+
+
+#: A single logged call of a fidelity
+Evaluation = namedtuple('Evaluation', ['function', 'fidelity', 'a', 'X', 'y', 'timestamp',
+                                       'transforms'])
+
+_index_name = 'index.jsonl'
+
+
+def read_log(path):
+    """Iterate over all logged calls in `path`, in order
+
+    :param path: Log directory written by a :class:`Recorder`
+    :return:     Iterator of :class:`Evaluation` tuples
+    """
+    segments = _SegmentCache(path)
+    for entry in _read_index(path):
+        X, y = segments.data(entry)
+        yield Evaluation(entry['function'], entry['fidelity'], entry['a'],
+                         np.array(X), np.array(y), entry['timestamp'], _transforms(entry))
+
+
+def _read_index(path, repair=False):
+    """All complete entries of the index in `path`
+
+    :param repair: If True, also remove a trailing line that was cut off by
+                   an interrupted write from the file, so it can be appended to
+    """
+    index = Path(path) / _index_name
+    if not index.exists():
+        return []
+    with open(index, 'rb') as f:
+        lines = f.readlines()
+    if lines and not lines[-1].endswith(b'\n'):
+        truncated = lines.pop()
+        if repair:
+            with open(index, 'r+b') as f:
+                f.truncate(index.stat().st_size - len(truncated))
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def _transforms(entry):
+    """Transformations of a logged call, none for logs written without them"""
+    return tuple(entry.get('transforms', ()))
+
+
+def _key(entry):
+    """Identity of the fidelity of a logged call"""
+    return entry['function'], entry['fidelity'], entry['a'], _transforms(entry)
+
+
+class Recorder:
+    """Append every call of wrapped functions to a log directory"""
+
+    def __init__(self, path, segment_rows=65536):
+        """
+        :param path:         Log directory, created if it does not exist
+        :param segment_rows: Number of buffered rows that triggers writing a
+                             new segment
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_rows = segment_rows
+        self._writer = _SegmentWriter(self.path, segment_rows)
+        self._finalizer = weakref.finalize(self, self._writer.close)
+
+    def wrap(self, mff: MultiFidelityFunction) -> MultiFidelityFunction:
+        """Create a version of `mff` that logs all calls to this recorder"""
+        names, a, transforms = fidelity_keys(mff)
+        return with_functions(mff, [RecordedFunction(f, self, mff.name, name, a, transforms)
+                                    for f, name in zip(mff.functions, names)])
+
+    def append(self, function, fidelity, a, X, y, transforms=()):
+        """Add a single call to the log"""
+        X = np.array(X, dtype=float, ndmin=2)  # copy, as the caller may reuse X
+        y = np.asarray(y, dtype=float).reshape(-1)
+        entry = {'function': function, 'fidelity': fidelity, 'a': a,
+                 'transforms': list(transforms),
+                 'rows': X.shape[0], 'ndim': X.shape[1], 'timestamp': time()}
+        self._writer.append(entry, X.reshape(-1), y)
+
+    def flush(self):
+        """Write all buffered calls to a new segment"""
+        self._writer.flush()
+
+    def close(self):
+        """Write all buffered calls and stop recording"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _SegmentWriter:
+    """Buffers logged calls of a :class:`Recorder` and writes them as segments
+
+    Kept separate from the recorder, so that it can still be closed by a
+    finalizer once the recorder itself is no longer referenced.
+    """
+
+    def __init__(self, path, segment_rows):
+        self.path = path
+        self.segment_rows = segment_rows
+        entries = _read_index(path, repair=True)
+        self._segment = entries[-1]['segment'] + 1 if entries else 0
+        self._buffer = []
+        self._buffered_rows = 0
+        self._lock = Lock()
+        self._closed = False
+
+    def append(self, entry, x, y):
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"Recorder for {self.path} is closed")
+            self._buffer.append((entry, x, y))
+            self._buffered_rows += len(y)
+            if self._buffered_rows >= self.segment_rows:
+                self._write_segment()
+
+    def flush(self):
+        with self._lock:
+            self._write_segment()
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._write_segment()
+                self._closed = True
+
+    def _write_segment(self):
+        """Requires `self._lock`"""
+        if not self._buffer:
+            return
+        entries, xs, ys = zip(*self._buffer)
+        x_offsets = np.cumsum([0] + [len(x) for x in xs[:-1]])
+        y_offsets = np.cumsum([0] + [len(y) for y in ys[:-1]])
+
+        np.save(self.path / f'{self._segment:06d}-X.npy', np.concatenate(xs))
+        np.save(self.path / f'{self._segment:06d}-y.npy', np.concatenate(ys))
+        with open(self.path / _index_name, 'a') as index:
+            for entry, x_offset, y_offset in zip(entries, x_offsets, y_offsets):
+                entry.update(segment=self._segment, x_offset=int(x_offset),
+                             y_offset=int(y_offset))
+                index.write(json.dumps(entry) + '\n')
+
+        self._segment += 1
+        self._buffer = []
+        self._buffered_rows = 0
+
+
+class RecordedFunction:
+    """Fidelity function that logs every call to a :class:`Recorder`"""
+
+    def __init__(self, func, recorder, function, fidelity, a=None, transforms=()):
+        self.func = func
+        self.recorder = recorder
+        self.function = function
+        self.fidelity = fidelity
+        self.a = a
+        self.transforms = tuple(transforms)
+
+    def __call__(self, xx):
+        xx = as_rows(xx)
+        y = self.func(xx)
+        self.recorder.append(self.function, self.fidelity, self.a, xx, y, self.transforms)
+        return y
+
+    def point(self, x):
+        return float(self(np.reshape(x, (1, -1)))[0])
+
+
+class Replayer:
+    """Serve calls of wrapped functions from a log directory
+
+    With ``match='order'``, every call must be equal to the next call in the
+    log, including the function, fidelity, `a` and transformations, and a
+    ValueError is raised otherwise. With ``match='hash'``, each row is looked
+    up by its exact bytes among all logged rows of that fidelity, in any
+    order, and a KeyError is raised for rows that were never logged.
+    """
+
+    def __init__(self, path, match='order'):
+        if match not in ('order', 'hash'):
+            raise ValueError(f"match must be 'order' or 'hash', not {match!r}")
+        self.path = Path(path)
+        self.match = match
+        self._entries = _read_index(self.path)
+        self._segments = _SegmentCache(self.path)
+        self._position = 0
+        self._tables = {}
+        self._lock = Lock()
+
+    @property
+    def remaining(self):
+        """Number of logged calls that have not been replayed in order yet"""
+        return len(self._entries) - self._position
+
+    def wrap(self, mff: MultiFidelityFunction) -> MultiFidelityFunction:
+        """Create a version of `mff` that is evaluated from the log"""
+        names, a, transforms = fidelity_keys(mff)
+        return with_functions(mff, [ReplayedFunction(self, mff.name, name, a, transforms)
+                                    for name in names])
+
+    def lookup(self, function, fidelity, a, X, transforms=()):
+        """Logged output for the call with input `X`"""
+        X = np.ascontiguousarray(X, dtype=float)
+        key = (function, fidelity, a, tuple(transforms))
+        with self._lock:
+            if self.match == 'order':
+                return self._next(key, X)
+            return self._from_table(key, X)
+
+    def _next(self, key, X):
+        if self._position >= len(self._entries):
+            raise ValueError(f"All {len(self._entries)} logged calls have been replayed")
+        entry = self._entries[self._position]
+        logged_X, logged_y = self._segments.data(entry)
+        if _key(entry) != key or logged_X.shape != X.shape or logged_X.tobytes() != X.tobytes():
+            raise ValueError(f"Call {self._position} does not match the log: expected "
+                             f"{_describe(_key(entry))} with input of shape {logged_X.shape}")
+        self._position += 1
+        return np.array(logged_y)
+
+    def _from_table(self, key, X):
+        if key not in self._tables:
+            self._tables[key] = self._build_table(key)
+        table = self._tables[key]
+        try:
+            return np.array([table[row.tobytes()] for row in X])
+        except KeyError:
+            raise KeyError(f"Input not found in log of {_describe(key)}") from None
+
+    def _build_table(self, key):
+        """Map of row bytes to logged output for all calls of one fidelity"""
+        table = {}
+        for entry in self._entries:
+            if _key(entry) == key:
+                X, y = self._segments.data(entry)
+                table.update(zip((row.tobytes() for row in X), y.tolist()))
+        return table
+
+    def close(self):
+        self._segments.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _describe(key):
+    """Readable description of a fidelity key, for error messages"""
+    function, fidelity, a, transforms = key
+    transforms = ''.join(f', {transform}' for transform in transforms)
+    return f"{function}.{fidelity} (a={a}{transforms})"
+
+
+class ReplayedFunction:
+    """Fidelity function that returns logged outputs of a :class:`Replayer`"""
+
+    def __init__(self, replayer, function, fidelity, a=None, transforms=()):
+        self.replayer = replayer
+        self.function = function
+        self.fidelity = fidelity
+        self.a = a
+        self.transforms = tuple(transforms)
+
+    def __call__(self, xx):
+        xx = np.asarray(as_rows(xx), dtype=float)
+        return self.replayer.lookup(self.function, self.fidelity, self.a, xx, self.transforms)
+
+    def point(self, x):
+        return float(self(np.reshape(x, (1, -1)))[0])
+
+
+class _SegmentCache:
+    """Memory-mapped segments of a log directory, loaded on first use"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._segments = {}
+
+    def data(self, entry):
+        """Input and output arrays of a single index entry"""
+        segment = entry['segment']
+        if segment not in self._segments:
+            self._segments[segment] = (
+                np.load(self.path / f'{segment:06d}-X.npy', mmap_mode='r'),
+                np.load(self.path / f'{segment:06d}-y.npy', mmap_mode='r'),
+            )
+        xs, ys = self._segments[segment]
+        rows, ndim = entry['rows'], entry['ndim']
+        X = xs[entry['x_offset']:entry['x_offset'] + rows*ndim].reshape(rows, ndim)
+        y = ys[entry['y_offset']:entry['y_offset'] + rows]
+        return X, y
+
+    def clear(self):
+        self._segments.clear()
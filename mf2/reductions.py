@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+"""
+reductions.py:
+
+Reduce the outputs of a fidelity over a stream of candidate points, such as
+a design from :mod:`mf2.design`, without storing all outputs: only the
+running result of every reduction is kept.
+
+* :class:`ArgMin`: best point, its value and its position in the stream
+* :class:`TopK`: the `k` best points
+* :class:`Histogram`: counts of values in fixed bins
+* :class:`Quantiles`: quantiles, estimated from a random sample of the values
+
+:func:`reduce` evaluates every block of the stream once for any number of
+reductions. Blocks can be evaluated in parallel threads, but are always added
+to the reductions in stream order, so results do not depend on the number of
+workers. Ties are resolved in favour of the earliest point in the stream.
+
+The shortcuts :func:`argmin`, :func:`top_k`, :func:`histogram` and
+:func:`quantiles` are also available as attributes of the fidelities of all
+functions and wrappers in mf2, e.g. ``mf2.borehole.high.argmin(design)``.
+Functions passed in by users are not modified, so for those, use e.g.
+``argmin(func, design)`` instead.
+
+Example:
+
+    >>> design = uniform_chunks(mf2.borehole, 10**9, seed=0)
+    >>> best, counts = reduce(mf2.borehole.high, design, ArgMin(),
+    ...                       Histogram(bins=100, range=(0, 300)), workers=8)
+    >>> x_best, y_best, index = best
+"""
+
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import FunctionType
+
+import numpy as np
+
+from .multi_fidelity_function import as_rows
+
+
+#: Result of :class:`ArgMin`, with the position of `x` in the stream as `index`
+Best = namedtuple('Best', ['x', 'y', 'index'])
+
+
+def reduce(func, design, *reducers, workers=None):
+    """Evaluate `func` on all blocks of `design` and feed them to `reducers`
+
+    :param func:     A (vectorized) fidelity function
+    :param design:   Iterable of blocks of points, e.g. from
+                     :func:`~mf2.design.uniform_chunks`
+    :param reducers: One or more :class:`Reducer` instances
+    :param workers:  Number of threads to evaluate blocks in parallel, or None
+                     to evaluate them one at a time in the calling thread
+    :return:         Result of each reducer; a single result if only one
+                     reducer is given
+    """
+    start = 0
+    for block, (X, y) in enumerate(_evaluate_blocks(func, design, workers)):
+        y = np.asarray(y, dtype=float).reshape(-1)
+        for reducer in reducers:
+            reducer.update(X, y, start, block)
+        start += len(y)
+
+    results = [reducer.result() for reducer in reducers]
+    return results[0] if len(results) == 1 else results
+
+
+def _evaluate_blocks(func, design, workers):
+    """Pairs of block and function values, in order of `design`"""
+    if workers is None:
+        for X in design:
+            X = np.asarray(as_rows(X))
+            yield X, func(X)
+        return
+
+    with ThreadPoolExecutor(workers) as pool:
+        pending = deque()  # at most 2 blocks per worker in memory
+        for X in design:
+            X = np.asarray(as_rows(X))
+            pending.append((X, pool.submit(func, X)))
+            if len(pending) >= 2 * workers:
+                X, future = pending.popleft()
+                yield X, future.result()
+        while pending:
+            X, future = pending.popleft()
+            yield X, future.result()
+
+
+def argmin(func, design, *, workers=None) -> Best:
+    """Best point of `design` for `func`, see :class:`ArgMin`"""
+    return reduce(func, design, ArgMin(), workers=workers)
+
+
+def top_k(func, design, k, *, largest=False, workers=None) -> Best:
+    """The `k` best points of `design` for `func`, see :class:`TopK`"""
+    return reduce(func, design, TopK(k, largest), workers=workers)
+
+
+def histogram(func, design, bins, range, *, workers=None):
+    """Histogram of the values of `func` on `design`, see :class:`Histogram`"""
+    return reduce(func, design, Histogram(bins, range), workers=workers)
+
+
+def quantiles(func, design, q, *, sample_size=100_000, seed=0, workers=None):
+    """Quantiles of the values of `func` on `design`, see :class:`Quantiles`"""
+    return reduce(func, design, Quantiles(q, sample_size, seed), workers=workers)
+
+
+_shortcuts = {'argmin': argmin, 'top_k': top_k, 'histogram': histogram, 'quantiles': quantiles}
+
+
+def attach(func):
+    """Make the shortcut reductions available as attributes of `func`, e.g.
+    ``func.argmin(design)``, if `func` was created by mf2. Attributes that
+    `func` already has are kept, and objects that do not accept attributes
+    are left unchanged."""
+    if not _created_by_mf2(func):
+        return
+    for name, reduction in _shortcuts.items():
+        if not hasattr(func, name):
+            try:
+                setattr(func, name, partial(reduction, func))
+            except (AttributeError, TypeError):
+                return
+
+
+def _created_by_mf2(func):
+    """Whether `func` is a kernel or wrapper of mf2, or a kernel with fixed `a`,
+    rather than a callable of a user"""
+    if isinstance(func, partial):
+        func = func.func
+    module = func.__module__ if isinstance(func, FunctionType) else type(func).__module__
+    return module == 'mf2' or module.startswith('mf2.')
+
+
+class Reducer:
+    """Running reduction over blocks of points and their function values"""
+
+    def update(self, X, y, start, block):
+        """Add a block
+
+        :param X:     Points of the block, shape ``(n, ndim)``
+        :param y:     Function values of the block, shape ``(n,)``
+        :param start: Position of the first point of the block in the stream
+        :param block: Number of the block in the stream
+        """
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+
+class ArgMin(Reducer):
+    """Point with the lowest function value, ignoring NaN values"""
+
+    def __init__(self):
+        self.best = Best(None, np.inf, None)
+
+    def update(self, X, y, start, block):
+        if not len(y) or np.all(np.isnan(y)):
+            return
+        i = int(np.nanargmin(y))
+        if y[i] < self.best.y:  # strict, so the earliest of equal values is kept
+            self.best = Best(np.array(X[i]), float(y[i]), start + i)
+
+    def result(self) -> Best:
+        return self.best
+
+
+class TopK(Reducer):
+    """The `k` points with the lowest (or highest) function values, sorted
+    from best to worst. NaN values are ignored."""
+
+    def __init__(self, k, largest=False):
+        if k < 1:
+            raise ValueError(f"k must be at least 1, not {k}")
+        self.k = k
+        self.largest = largest
+        self._X = None
+        self._y = np.empty(0)
+        self._indices = np.empty(0, dtype=np.int64)
+
+    def update(self, X, y, start, block):
+        keep = ~np.isnan(y)
+        if len(y) > self.k:  # only values up to the k-th best can be part of the result
+            keys = -y if self.largest else y
+            threshold = np.partition(np.where(keep, keys, np.inf), self.k - 1)[self.k - 1]
+            keep &= keys <= threshold
+        candidates = np.flatnonzero(keep)
+        X_all = X[candidates] if self._X is None else np.concatenate([self._X, X[candidates]])
+        y_all = np.concatenate([self._y, y[candidates]])
+        indices = np.concatenate([self._indices, start + candidates])
+
+        order = np.lexsort((indices, -y_all if self.largest else y_all))[:self.k]
+        self._X, self._y, self._indices = X_all[order], y_all[order], indices[order]
+
+    def result(self) -> Best:
+        return Best(self._X, self._y, self._indices)
+
+
+class Histogram(Reducer):
+    """Number of values in `bins` equal-width bins over `range`. Values outside
+    the range are counted separately as `below` and `above`."""
+
+    def __init__(self, bins, range):
+        self.edges = np.linspace(range[0], range[1], bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.below = self.above = 0
+
+    def update(self, X, y, start, block):
+        counts, _ = np.histogram(y, self.edges)
+        self.counts += counts
+        self.below += int(np.sum(y < self.edges[0]))
+        self.above += int(np.sum(y > self.edges[-1]))
+
+    def result(self):
+        """Counts per bin and the bin edges, as for :func:`numpy.histogram`"""
+        return self.counts, self.edges
+
+
+class Quantiles(Reducer):
+    """Quantiles `q` of the function values, estimated from a uniform random
+    sample of at most `sample_size` values. Exact if the stream is not larger
+    than the sample. NaN values are ignored."""
+
+    def __init__(self, q, sample_size=100_000, seed=0):
+        self.q = q
+        self.reservoir = Reservoir(sample_size, seed)
+
+    def update(self, X, y, start, block):
+        self.reservoir.add(y[~np.isnan(y)], block)
+
+    def result(self):
+        return np.quantile(self.reservoir.sample, self.q)
+
+
+class Reservoir:
+    """Uniform random sample of at most `size` values from a stream of blocks
+
+    Every value gets a random key, and the values with the `size` smallest
+    keys are kept. Keys are generated per block from `seed` and the block
+    number, so the sample only depends on the stream and the seed.
+    """
+
+    def __init__(self, size, seed=None):
+        self.size = size
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.sample = np.empty(0)
+        self._keys = np.empty(0)
+
+    def add(self, values, block):
+        """Add the `values` of block number `block`"""
+        keys = np.random.default_rng((self.seed, block)).random(len(values))
+        sample = np.concatenate([self.sample, values])
+        sample_keys = np.concatenate([self._keys, keys])
+        if len(sample) > self.size:
+            keep = np.argpartition(sample_keys, self.size - 1)[:self.size]
+            sample, sample_keys = sample[keep], sample_keys[keep]
+        self.sample, self._keys = sample, sample_keys
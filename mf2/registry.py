@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""
+registry.py:
+
+Static index of all multi-fidelity functions in this package. Entries contain
+the metadata of each function (dimensionality, fidelities, adjustability,
+bounds and known optimum), so functions can be selected without accessing or
+constructing any :class:`~mf2.multi_fidelity_function.MultiFidelityFunction`.
+The actual function is only looked up when :meth:`Entry.build` is called.
+
+Example:
+
+    >>> [entry.name for entry in select(ndim=2, adjustable=False)]
+    ['bohachevsky', 'booth', 'branin', 'currin', 'himmelblau', 'six_hump_camelback']
+    >>> funcs = [entry.build() for entry in select(ndim=lambda d: d >= 6)]
+"""
+
+from collections import namedtuple
+from importlib import import_module
+import sys
+
+
+_fields = [
+    'name',            # unique key, also used by mf2.handles
+    'module',          # module in which the function is defined
+    'attribute',       # name of the function within `module`
+    'ndim',
+    'num_fidelities',
+    'fidelity_names',
+    'adjustable',
+    'l_bound',
+    'u_bound',
+    'x_opt',           # None if unknown
+]
+
+
+class Entry(namedtuple('Entry', _fields)):
+    """Static metadata of a multi-fidelity function in the registry"""
+
+    __slots__ = ()
+
+    def build(self, a=None):
+        """Return the MultiFidelityFunction described by this entry
+
+        :param a: Parameter value for adjustable functions. If not given, the
+                  AdjustableMultiFidelityFunction itself is returned.
+        """
+        func = getattr(import_module(self.module), self.attribute)
+        if a is not None:
+            if not self.adjustable:
+                raise ValueError(f"Function '{self.name}' is not adjustable")
+            func = func(a)
+        return func
+
+
+def _bi_fidelity(name, ndim, l_bound, u_bound, x_opt, *,
+                 module=None, adjustable=False):
+    module = module or f'mf2.{name}'
+    attribute = name.split('.')[-1]
+    return Entry(name, module, attribute, ndim, 2, ('high', 'low'),
+                 adjustable, tuple(l_bound), tuple(u_bound),
+                 None if x_opt is None else tuple(x_opt))
+
+
+#: All registered functions, in order of dimensionality
+entries = (
+    # 1D
+    _bi_fidelity('forrester', 1, [0], [1], [0.757248757841856]),
+    # 2D
+    _bi_fidelity('bohachevsky', 2, [-5, -5], [5, 5], [0, 0]),
+    _bi_fidelity('booth', 2, [-10, -10], [10, 10], [1, 3]),
+    _bi_fidelity('branin', 2, [-5, 0], [10, 15], [-3.786088705282203, 15]),
+    _bi_fidelity('currin', 2, [0, 0], [1, 1], [0.21666666666666, 0]),
+    _bi_fidelity('himmelblau', 2, [-4, -4], [4, 4], [3, 2]),
+    _bi_fidelity('six_hump_camelback', 2, [-2, -2], [2, 2], [0.0898, -0.7126]),
+    _bi_fidelity('adjustable.branin', 2, [-5, 0], [10, 15], [3.141592653589793, 2.275],
+                 module='mf2.adjustable.branin', adjustable=True),
+    _bi_fidelity('adjustable.paciorek', 2, [0.3, 0.3], [1, 1],
+                 [0.460658865961780639020326, 0.460658865961780639020326],
+                 module='mf2.adjustable.paciorek', adjustable=True),
+    # 3D
+    _bi_fidelity('adjustable.hartmann3', 3, [0]*3, [1]*3,
+                 [0.11458889011259411, 0.5556488928818787, 0.852546981666729],
+                 module='mf2.adjustable.hartmann', adjustable=True),
+    # 4D
+    _bi_fidelity('park91a', 4, [1e-8, 0, 0, 0], [1, 1, 1, 1], [1e-8, 0, 0, 0]),
+    _bi_fidelity('park91b', 4, [0, 0, 0, 0], [1, 1, 1, 1], [0, 0, 0, 0]),
+    # 6D
+    _bi_fidelity('hartmann6', 6, [0.1]*6, [1]*6,
+                 [0.2017, 0.1500, 0.4769, 0.2753, 0.3117, 0.6573],
+                 module='mf2.hartmann'),
+    # 8D
+    _bi_fidelity('borehole', 8,
+                 [0.05,    100,  63_070,   990, 63.1, 700, 1_120,  9_855],
+                 [0.15, 50_000, 115_600, 1_110,  116, 820, 1_680, 12_045],
+                 [5e-2, 5e4, 6.307e4, 9.9e2, 6.31e1, 8.2e2, 1.68e3, 9.855e3]),
+    # 10D
+    _bi_fidelity('adjustable.trid', 10, [-100]*10, [100]*10,
+                 [10, 18, 24, 28, 30, 30, 28, 24, 18, 10],
+                 module='mf2.adjustable.trid', adjustable=True),
+)
+
+_by_name = {entry.name: entry for entry in entries}
+
+
+def get(name):
+    """Return the registry entry with the given name"""
+    try:
+        return _by_name[name]
+    except KeyError:
+        raise KeyError(f"No function named '{name}' in registry") from None
+
+
+def find(func):
+    """Return the registry entry of the given function, or None if it is not
+    registered. Only modules that have already been imported are checked.
+    """
+    for entry in entries:
+        module = sys.modules.get(entry.module)
+        if module is not None and getattr(module, entry.attribute, None) is func:
+            return entry
+    return None
+
+
+def select(**criteria):
+    """Select all registry entries matching the given criteria
+
+    Each keyword must be one of the fields of :class:`Entry`. Values are either
+    compared for equality, or called as a predicate if callable.
+
+    :param criteria: Field-value pairs, e.g. ``ndim=2`` or
+                     ``x_opt=lambda x: x is not None``
+    :return:         List of matching :class:`Entry` objects
+    """
+    unknown = set(criteria) - set(Entry._fields)
+    if unknown:
+        raise ValueError(f"Unknown criteria: {sorted(unknown)}")
+
+    return [
+        entry for entry in entries
+        if all(
+            value(getattr(entry, field)) if callable(value)
+            else getattr(entry, field) == value
+            for field, value in criteria.items()
+        )
+    ]
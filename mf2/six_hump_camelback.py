@@ -18,9 +18,19 @@ Function definitions:
     f_l(x_1, x_2) = f_h(0.7x_1, 0.7x_2) + x_1x_2 - 15
 """
 
-import numpy as np
+from .grid import open_axes
+from .multi_fidelity_function import MultiFidelityFunction, as_columns, as_point
 
-from .multi_fidelity_function import MultiFidelityFunction
+
+def _six_hump_camelback(x1, x2):
+    """Column-level implementation of :func:`six_hump_camelback_hf`, also for single points"""
+    x1sq, x2sq = x1*x1, x2*x2
+
+    term1 = (4 - 2.1*x1sq + (x1sq*x1sq)/3) * x1sq
+    term2 = x1*x2
+    term3 = (-4 + 4*x2sq) * x2sq
+
+    return term1 + term2 + term3
 
 
 def six_hump_camelback_hf(xx):
@@ -30,16 +40,8 @@ def six_hump_camelback_hf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
-    x1sq, x2sq = x1*x1, x2*x2
-
-    term1 = (4 - 2.1*x1sq + (x1sq*x1sq)/3) * x1sq
-    term2 = x1*x2
-    term3 = (-4 + 4*x2sq) * x2sq
-
-    return term1 + term2 + term3
+    x1, x2 = as_columns(xx)
+    return _six_hump_camelback(x1, x2)
 
 
 def six_hump_camelback_lf(xx):
@@ -52,16 +54,46 @@ def six_hump_camelback_lf(xx):
     INPUT:
     xx = [x1, x2]
     """
-    xx = np.atleast_2d(xx)
-
-    x1, x2 = xx.T
+    x1, x2 = as_columns(xx)
 
-    term1 = six_hump_camelback_hf(np.hstack([0.7 * x1.reshape(-1, 1), 0.7 * x2.reshape(-1, 1)]))
+    term1 = _six_hump_camelback(0.7*x1, 0.7*x2)
     term2 = x1*x2 - 15
 
     return term1 + term2
 
 
+def _six_hump_camelback_hf_point(x):
+    x1, x2 = as_point(x)
+    return float(_six_hump_camelback(x1, x2))
+
+
+def _six_hump_camelback_lf_point(x):
+    x1, x2 = as_point(x)
+    return float(_six_hump_camelback(0.7*x1, 0.7*x2) + x1*x2 - 15)
+
+
+def _six_hump_camelback_hf_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _six_hump_camelback(x1, x2)
+
+
+def _six_hump_camelback_lf_on_grid(axes):
+    x1, x2 = open_axes(axes)
+    return _six_hump_camelback(0.7*x1, 0.7*x2) + x1*x2 - 15
+
+
+six_hump_camelback_hf.point = _six_hump_camelback_hf_point
+six_hump_camelback_lf.point = _six_hump_camelback_lf_point
+
+# Terms of a single variable are computed per axis value, see mf2.grid
+six_hump_camelback_hf.on_grid = _six_hump_camelback_hf_on_grid
+six_hump_camelback_lf.on_grid = _six_hump_camelback_lf_on_grid
+
+# Temporary memory per row in bytes, including the output, see mf2.chunking
+six_hump_camelback_hf.bytes_per_row = 64
+six_hump_camelback_lf.bytes_per_row = 80
+
+
 #: Lower bound for Six-hump Camelback function
 l_bound = [-2, -2]
 #: upper bound for Six-hump Camelback function
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+"""
+tracing.py:
+
+Hooks on the invocation of fidelity functions, to profile how much time is
+spent evaluating functions, with which batch sizes.
+
+While tracing is disabled, every :class:`~mf2.multi_fidelity_function.MultiFidelityFunction`
+holds the bare fidelity functions, so there is no overhead at all. Enabling
+tracing swaps a :class:`TracedFunction` wrapper into every existing and newly
+created MultiFidelityFunction, which calls each registered hook with a
+:class:`TraceEvent` before and after every call. Calls made from within
+another traced call, e.g. by :func:`~mf2.multi_fidelity_function.invert`, are
+not reported separately. Wrappers that were created while tracing was enabled
+may still hold a TracedFunction after disabling it, but it then calls the
+fidelity directly without calling any hooks.
+
+Tracing can also be enabled without code changes by setting the ``MF2_TRACE``
+environment variable to an output file: a Chrome trace (viewable in
+``chrome://tracing`` or `Perfetto <https://ui.perfetto.dev>`_) if the name
+ends in ``.json``, a JSON Lines file otherwise. Other processes, such as
+workers of a process pool, write to their own file with their process id
+inserted before the extension, e.g. ``trace.12345.json``.
+
+Example:
+
+    >>> with JSONLExporter('trace.jsonl') as exporter:
+    ...     mf2.tracing.enable(exporter)
+    ...     mf2.branin.high(X)
+    ...     mf2.tracing.disable()
+"""
+
+from collections import namedtuple
+import atexit
+import json
+import os
+from threading import Lock, get_ident, local
+from time import perf_counter_ns, time_ns
+from weakref import WeakSet
+
+
+#: Description of a single fidelity call. `start` is in nanoseconds since the
+#: epoch; `elapsed` is in nanoseconds, or None for 'before' events.
+TraceEvent = namedtuple('TraceEvent', ['phase', 'function', 'fidelity', 'shape',
+                                       'dtype', 'start', 'elapsed', 'thread'])
+
+_instances = WeakSet()
+_exporters = WeakSet()
+_hooks = []
+_enabled = False
+_active = local()  # whether a traced call is in progress in this thread
+_epoch_offset = time_ns() - perf_counter_ns()
+
+
+def enable(*hooks):
+    """Start tracing all fidelity calls, adding any given hooks
+
+    :param hooks: Callables that are given a :class:`TraceEvent`
+    """
+    global _enabled
+    for hook in hooks:
+        add_hook(hook)
+    _enabled = True
+    for mff in list(_instances):
+        _wrap(mff)
+
+
+def disable():
+    """Stop tracing and restore the bare fidelity functions. Hooks are kept."""
+    global _enabled
+    _enabled = False
+    for mff in list(_instances):
+        _unwrap(mff)
+
+
+def is_enabled():
+    return _enabled
+
+
+def add_hook(hook):
+    """Call `hook` with a :class:`TraceEvent` before and after every call"""
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+def register(mff):
+    """Keep track of `mff`, to wrap its fidelities whenever tracing is enabled"""
+    if not mff._traceable:
+        return
+    _instances.add(mff)
+    if _enabled:
+        _wrap(mff)
+
+
+def _wrap(mff):
+    if not mff.functions or any(isinstance(func, TracedFunction) for func in mff.functions):
+        return
+    names = mff.fidelity_names or range(len(mff.functions))
+    mff._set_functions([TracedFunction(func, mff.name, name)
+                        for func, name in zip(mff.functions, names)])
+
+
+def _unwrap(mff):
+    if not mff.functions:
+        return
+    mff._set_functions([func.func if isinstance(func, TracedFunction) else func
+                        for func in mff.functions])
+
+
+def _describe(xx):
+    """Shape and dtype of the input of a fidelity call"""
+    shape, dtype = getattr(xx, 'shape', None), getattr(xx, 'dtype', None)
+    if shape is None:
+        if isinstance(xx, (list, tuple)) and xx and hasattr(xx[0], '__len__'):
+            shape = (len(xx), len(xx[0]))
+        elif isinstance(xx, (list, tuple)):
+            shape = (len(xx),)
+    return None if shape is None else tuple(shape), None if dtype is None else str(dtype)
+
+
+class TracedFunction:
+    """Wrapper around a fidelity function that calls the tracing hooks"""
+
+    # reductions such as `argmin` are attached by the MultiFidelityFunction,
+    # so the blocks they evaluate are traced as well
+    __slots__ = ('func', 'function', 'fidelity', 'argmin', 'top_k', 'histogram', 'quantiles')
+
+    def __init__(self, func, function, fidelity):
+        """
+        :param func:     The fidelity function to trace
+        :param function: Name of the MultiFidelityFunction, for the events
+        :param fidelity: Name or index of the fidelity, for the events
+        """
+        self.func = func
+        self.function = function
+        self.fidelity = fidelity
+
+    def __call__(self, xx):
+        return self._trace(self.func, xx)
+
+    def point(self, x):
+        from .multi_fidelity_function import evaluate_point
+        return self._trace(lambda x: evaluate_point(self.func, x), x)
+
+    def on_grid(self, axes, **kwargs):
+        from .grid import on_grid
+        return self._trace(lambda axes: on_grid(self.func, axes, **kwargs), axes)
+
+    def _trace(self, func, xx):
+        if not _enabled or getattr(_active, 'value', False):
+            return func(xx)
+
+        shape, dtype = _describe(xx)
+        thread = get_ident()
+        start = perf_counter_ns()
+        event = TraceEvent('before', self.function, self.fidelity, shape, dtype,
+                           start + _epoch_offset, None, thread)
+        for hook in _hooks:
+            hook(event)
+
+        _active.value = True
+        try:
+            return func(xx)
+        finally:
+            _active.value = False
+            elapsed = perf_counter_ns() - start
+            event = event._replace(phase='after', elapsed=elapsed)
+            for hook in _hooks:
+                hook(event)
+
+    def __getattr__(self, name):
+        if name in TracedFunction.__slots__:
+            raise AttributeError(name)
+        return getattr(self.func, name)
+
+    def __reduce__(self):
+        return TracedFunction, (self.func, self.function, self.fidelity)
+
+    def __repr__(self):
+        return f"TracedFunction({self.func!r})"
+
+
+class _FileExporter:
+    """Base class for hooks that write completed calls to a file. Every call
+    is written immediately, so no events are lost if a process exits without
+    closing the exporter, e.g. a worker of a process pool."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+        self._open(path)
+        _exporters.add(self)
+
+    def _open(self, path):
+        self._file = open(path, 'w')
+
+    def __call__(self, event):
+        if event.phase != 'after':
+            return
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(self._format(event))
+                self._file.flush()
+
+    def _format(self, event):
+        raise NotImplementedError
+
+    def _reopen_in_child(self):
+        """Continue in a file of its own after the process was forked"""
+        self._lock = Lock()
+        if not self._file.closed:
+            self._open(process_path(self.path, os.getpid()))
+
+    def close(self):
+        """Stop tracing to this file and close it"""
+        if self in _hooks:
+            remove_hook(self)
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JSONLExporter(_FileExporter):
+    """Write every completed call as a line of JSON, with start time and
+    elapsed time in seconds"""
+
+    def _format(self, event):
+        return json.dumps({
+            'function': event.function,
+            'fidelity': event.fidelity,
+            'shape': event.shape,
+            'dtype': event.dtype,
+            'start': event.start / 1e9,
+            'elapsed': event.elapsed / 1e9,
+            'thread': event.thread,
+        }) + '\n'
+
+
+class ChromeTraceExporter(_FileExporter):
+    """Write every completed call as a 'complete' event in the Chrome trace
+    event format. The file can already be loaded while still being written, as
+    the closing bracket of the JSON array is optional in this format."""
+
+    def _open(self, path):
+        super()._open(path)
+        self._file.write('[')
+        self._pid = os.getpid()
+        self._separator = '\n'
+
+    def _format(self, event):
+        separator, self._separator = self._separator, ',\n'
+        return separator + json.dumps({
+            'name': f'{event.function}.{event.fidelity}',
+            'cat': 'mf2',
+            'ph': 'X',
+            'ts': event.start / 1e3,
+            'dur': event.elapsed / 1e3,
+            'pid': self._pid,
+            'tid': event.thread,
+            'args': {'shape': event.shape, 'dtype': event.dtype},
+        })
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.write('\n]\n')
+        super().close()
+
+
+def exporter_for(path):
+    """Create the exporter matching the file name: Chrome trace for '.json',
+    JSON Lines otherwise"""
+    if str(path).endswith('.json'):
+        return ChromeTraceExporter(path)
+    return JSONLExporter(path)
+
+
+def process_path(path, pid):
+    """Path of the trace file of another process than the one that started
+    tracing: `path` with `pid` inserted before the extension"""
+    root, extension = os.path.splitext(str(path))
+    return f'{root}.{pid}{extension}'
+
+
+def _reopen_exporters():
+    for exporter in list(_exporters):
+        exporter._reopen_in_child()
+
+
+if hasattr(os, 'register_at_fork'):  # not available on Windows, which cannot fork
+    os.register_at_fork(after_in_child=_reopen_exporters)
+
+
+def _enable_from_environment():
+    path = os.environ.get('MF2_TRACE')
+    if path:
+        # child processes inherit the pid of the process that owns `path`
+        owner = os.environ.setdefault('MF2_TRACE_PID', str(os.getpid()))
+        if owner != str(os.getpid()):
+            path = process_path(path, os.getpid())
+        exporter = exporter_for(path)
+        atexit.register(exporter.close)
+        enable(exporter)
+
+
+_enable_from_environment()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+vectorize.py:
+
+Turn functions that only evaluate a single point at a time, such as scalar
+Python functions or wrappers around external simulators, into fidelities that
+accept a batch of points like all functions in this package. The rows of a
+batch are dispatched in chunks to a pool of threads or processes, and the
+results are assembled in the original order.
+
+Use threads for simulators that release the GIL, e.g. by waiting on external
+programs or I/O, and processes for pure Python functions. The function must
+be picklable to use processes, e.g. defined at module level.
+
+Example:
+
+    >>> def simulate(x):  # returns a single float
+    ...     ...
+    >>> func = MultiFidelityFunction(
+    ...     'simulator', u_bound, l_bound,
+    ...     [vectorize(simulate, executor='process'), mf2.branin.low],
+    ...     fidelity_names=['high', 'low'],
+    ... )
+    >>> y = func.high(X)
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import os
+from threading import Lock
+
+import numpy as np
+
+from .multi_fidelity_function import as_rows
+
+
+#: Number of chunks per worker into which a batch is split, to balance the
+#: load if evaluation times differ per point
+chunks_per_worker = 4
+
+
+def vectorize(func, *, executor='thread', max_workers=None,
+              chunk_size=None) -> 'VectorizedFunction':
+    """Create a batch version of the single-point function `func`
+
+    :param func:        Callable that takes a single point as 1D array and
+                        returns a number
+    :param executor:    'thread' or 'process' for a new pool of that type,
+                        an existing :class:`concurrent.futures.Executor`, or
+                        None to evaluate all points in the calling thread
+    :param max_workers: Size of a new pool, defaults to the number of CPUs
+    :param chunk_size:  Number of points per dispatched chunk. By default,
+                        every batch is split into :data:`chunks_per_worker`
+                        chunks per worker.
+    :return:            VectorizedFunction
+    """
+    return VectorizedFunction(func, executor, max_workers, chunk_size)
+
+
+def _evaluate_points(func, points):
+    """Evaluate `func` on each row of `points`, in a worker"""
+    return np.array([func(x) for x in points], dtype=float)
+
+
+class VectorizedFunction:
+    """Batch version of a single-point function, see :func:`vectorize`"""
+
+    def __init__(self, func, executor='thread', max_workers=None, chunk_size=None):
+        if executor not in ('thread', 'process', None) and not isinstance(executor, Executor):
+            raise ValueError(f"executor must be 'thread', 'process', None or an "
+                             f"Executor, not {executor!r}")
+        self.func = func
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = executor if isinstance(executor, Executor) else None
+        self._lock = Lock()
+
+    def __call__(self, xx):
+        xx = np.asarray(as_rows(xx), dtype=float)
+        if self.executor is None or len(xx) <= 1:
+            return _evaluate_points(self.func, xx)
+
+        chunk_size = self.chunk_size or -(-len(xx) // (self.max_workers * chunks_per_worker))
+        chunks = [xx[start:start+chunk_size] for start in range(0, len(xx), chunk_size)]
+        results = self._get_pool().map(_evaluate_points, [self.func]*len(chunks), chunks)
+        return np.concatenate(list(results))
+
+    def point(self, x):
+        return float(self.func(np.asarray(x, dtype=float).ravel()))
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                pool_type = ThreadPoolExecutor if self.executor == 'thread' else ProcessPoolExecutor
+                self._pool = pool_type(self.max_workers)
+            return self._pool
+
+    def close(self):
+        """Shut down the pool, if it was created by this function"""
+        with self._lock:
+            if self._pool is not None and not isinstance(self.executor, Executor):
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        # pools cannot be pickled; a new one is created on first use
+        executor = None if isinstance(self.executor, Executor) else self.executor
+        return {'func': self.func, 'executor': executor,
+                'max_workers': self.max_workers, 'chunk_size': self.chunk_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return f"VectorizedFunction({self.func!r}, executor={self.executor!r})"
@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+
+"""
+workspace.py:
+
+Reusable scratch buffers for the intermediate results of fidelity functions.
+Allocating fresh temporaries in every call causes allocator and page-fault
+spikes in the latency of repeated calls of large batches. Instead, the kernels
+of Park91A, Borehole, Currin, Hartmann6 and the adjustable Hartmann3 are
+evaluated with :func:`evaluate`, which computes their intermediates in the
+buffers of a per-thread :class:`Workspace`.
+
+Kernels are written once, as a plain expression of the columns or rows of the
+input and an array namespace `xp`. The first call with a new combination of
+kernel, parameters and input shape evaluates the expression with numpy and
+records its operations. Later calls replay the recorded operations with their
+results written to workspace buffers, a buffer being reused as soon as its
+previous intermediate is no longer needed. The same operations are performed
+in the same order, so results are bit-identical to those of the plain
+expression.
+
+Every thread has its own workspace, so functions can be evaluated from many
+threads at once. Buffers are created on first use, grow with the batch size
+up to :data:`max_rows` rows and are then reused by all later calls. Batches
+of fewer than :data:`min_rows` rows, for which the bookkeeping costs more
+than the allocations, larger batches and input that is not a float64 numpy
+array are evaluated with the plain expression.
+
+Example:
+
+    >>> mf2.workspace.min_rows = 4096  # batches of 4096 rows use the workspace
+    >>> for X in batches:  # only the outputs are allocated after the first call
+    ...     y = mf2.borehole.high(X)
+    >>> mf2.workspace.workspace().nbytes  # four buffers for all intermediates
+    131072
+"""
+
+import operator
+from threading import local
+
+import numpy as np
+
+from .multi_fidelity_function import array_namespace
+
+
+#: Smallest number of rows for which scratch buffers are used
+min_rows = 8192
+
+#: Largest number of rows for which scratch buffers are kept. Set to 0 to
+#: disable workspaces.
+max_rows = 16384
+
+_local = local()
+_plans = {}  # plan of every kernel, parameters and input shape, see evaluate()
+_max_plans = 256
+
+
+class Workspace:
+    """Named scratch buffers, reused by all calls from the same thread"""
+
+    def __init__(self):
+        self._buffers = {}
+
+    def empty(self, name, num_rows, shape=(), dtype=np.float64):
+        """Uninitialized array of shape ``(num_rows, *shape)``, float64 unless
+        another `dtype` is given, e.g. bool for masks
+
+        The array is a view into the buffer `name`, so it is overwritten by
+        the next request of the same name.
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None or len(buffer) < num_rows or buffer.shape[1:] != shape \
+                or buffer.dtype != dtype:
+            buffer = np.empty((num_rows, *shape), dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[:num_rows]
+
+    @property
+    def nbytes(self):
+        """Total size of all buffers in bytes"""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self):
+        """Release all buffers"""
+        self._buffers.clear()
+
+
+def workspace() -> Workspace:
+    """The workspace of the current thread"""
+    try:
+        return _local.workspace
+    except AttributeError:
+        _local.workspace = Workspace()
+        return _local.workspace
+
+
+def for_arrays(*arrays):
+    """Workspace of the current thread and number of rows, if `arrays` can be
+    evaluated in it: float64 numpy arrays of :data:`min_rows` to
+    :data:`max_rows` rows, which are C-contiguous unless one-dimensional.
+
+    :return: Tuple ``(workspace, num_rows)``, or None if not applicable
+    """
+    if not isinstance(arrays[0], np.ndarray) or not arrays[0].ndim \
+            or not min_rows <= len(arrays[0]) <= max_rows:
+        return None
+    num_rows = len(arrays[0])
+    if not all(isinstance(array, np.ndarray) and array.dtype == np.float64 and array.ndim
+               and (array.ndim == 1 or array.flags.c_contiguous) and len(array) == num_rows
+               for array in arrays):
+        return None
+    return workspace(), num_rows
+
+
+def evaluate(kernel, *arrays, **kwargs):
+    """Evaluate ``kernel(*arrays, xp=..., **kwargs)``, with all intermediates
+    in the workspace of the current thread if `arrays` allow it
+
+    :param kernel: Function of the arrays and an array namespace `xp`
+    :param arrays: Columns or rows of the input, evaluated in the workspace
+                   if :func:`for_arrays` allows it
+    :param kwargs: Further arguments of `kernel`, such as parameters
+    :return:       Output of `kernel`, as a newly allocated array
+    """
+    scratch = for_arrays(*arrays)
+    if scratch is None:
+        return kernel(*arrays, xp=array_namespace(*arrays), **kwargs)
+    key = (kernel, *sorted(kwargs.items()), *(array.shape[1:] for array in arrays))
+    try:
+        plan = _plans.get(key)
+    except TypeError:  # unhashable parameters, such as values per row
+        return kernel(*arrays, xp=np, **kwargs)
+    if plan is None:
+        tracer = _Tracer(scratch[1])
+        result = kernel(*(tracer.input(array) for array in arrays), xp=tracer, **kwargs)
+        if len(_plans) >= _max_plans:  # e.g. after many different parameters
+            _plans.clear()
+        _plans[key] = tracer.plan(kernel, result) or _Unplanned(kernel, kwargs)
+        return _value(result)
+    return plan.run(arrays, *scratch)
+
+
+class _Plan:
+    """Recorded operations of a kernel, with the buffer each result is
+    written to"""
+
+    def __init__(self, kernel, initial, steps, result, buffers):
+        self._kernel = kernel  # buffers are shared by all plans of a kernel
+        self._initial = initial  # value of every slot: constants, None otherwise
+        # (func, argument slots, kwargs, buffer or None, slot to overwrite or None, target slot)
+        self._steps = steps
+        self._result = result
+        self._buffers = buffers  # (row shape, dtype) of every buffer
+
+    def run(self, arrays, ws, num_rows):
+        buffers = [ws.empty((self._kernel, index), num_rows, *spec)
+                   for index, spec in enumerate(self._buffers)]
+        values = self._initial.copy()
+        values[:len(arrays)] = arrays
+        for func, args, kwargs, buffer, overwritten, target in self._steps:
+            if buffer is not None:
+                out = buffers[buffer]
+            elif overwritten is not None:
+                out = values[overwritten]
+            else:
+                values[target] = func(*[values[arg] for arg in args], **kwargs)
+                continue
+            values[target] = func(*[values[arg] for arg in args], out=out, **kwargs)
+        return values[self._result]
+
+
+class _Unplanned:
+    """Plan of a kernel that cannot be replayed: evaluates it with numpy"""
+
+    def __init__(self, kernel, kwargs):
+        self._kernel = kernel
+        self._kwargs = kwargs
+
+    def run(self, arrays, ws, num_rows):
+        return self._kernel(*arrays, xp=np, **self._kwargs)
+
+
+class _Tracer:
+    """Array namespace that evaluates all operations with numpy and records
+    those that depend on the input"""
+
+    def __init__(self, num_rows):
+        self._num_rows = num_rows
+        self._values = []  # value of every slot
+        self._num_inputs = 0
+        self._constants = set()  # slots of values that do not depend on the input
+        self._steps = []  # (func, replay func, argument slots, kwargs, kind, target slot)
+        self._last_use = {}  # position of the last step that needs each slot
+        self._owned = set()  # slots of arrays that are newly allocated or buffers
+
+    def input(self, array):
+        self._values.append(array)
+        self._num_inputs += 1
+        return _Traced(self, len(self._values) - 1, array)
+
+    def apply(self, kind, func, *args, replay=None, **kwargs):
+        """Evaluate and, if it depends on the input, record ``func(*args, **kwargs)``
+
+        :param kind:   'elementwise' for ufuncs, whose result may replace an
+                       argument, 'buffered' for other functions with an `out`
+                       argument, and 'call' for all other functions, whose
+                       result may be a view of their arguments
+        :param replay: Function to call with an `out` argument instead of `func`
+        """
+        value = func(*(_value(arg) for arg in args), **kwargs)
+        if not any(isinstance(arg, _Traced) for arg in args):
+            return value
+        slots = []
+        for arg in args:
+            if isinstance(arg, _Traced):
+                slots.append(arg.index)
+            else:
+                self._values.append(arg)
+                self._constants.add(len(self._values) - 1)
+                slots.append(len(self._values) - 1)
+        self._values.append(value)
+        target = len(self._values) - 1
+        self._steps.append((func, replay or func, tuple(slots), kwargs, kind, target))
+        return _Traced(self, target, value)
+
+    def power(self, x, y):
+        # exponents for which ndarray.__pow__ uses a dedicated ufunc rather than np.power
+        fast = _fast_powers.get(y) if type(y) in (int, float) else None
+        if fast is not None:
+            return self.apply('elementwise', fast, x)
+        return self.apply('elementwise', np.power, x, y)
+
+    def sum(self, x, axis):
+        return self.apply('buffered', np.sum, x, axis=axis)
+
+    def where(self, condition, x, y):
+        return self.apply('buffered', np.where, condition, x, y, replay=_where)
+
+    def __getattr__(self, name):
+        func = getattr(np, name)
+        if isinstance(func, np.ufunc) and func.nout == 1 and func.signature is None:
+            return lambda *args: self.apply('elementwise', func, *args)
+        return lambda *args, **kwargs: self.apply('call', func, *args, **kwargs)
+
+    def plan(self, kernel, result):
+        """Plan to compute `result` with buffers for the intermediates, or
+        None if it is not computed from the input"""
+        if not isinstance(result, _Traced) or result.index < self._num_inputs:
+            return None
+        end = len(self._steps)
+        last_use = self._last_use = {step[5]: position
+                                     for position, step in enumerate(self._steps)}
+        for position, step in enumerate(self._steps):
+            for arg in step[2]:
+                last_use[arg] = position
+        last_use[result.index] = end  # the output is never a buffer
+        for step in reversed(self._steps):
+            if step[4] == 'call':  # a view must keep the buffer it points to
+                for arg in step[2]:
+                    last_use[arg] = max(last_use[arg], last_use[step[5]])
+
+        buffer_of, specs, free, steps = {}, [], {}, []
+        owned = self._owned
+        for position, (func, replay, args, kwargs, kind, target) in enumerate(self._steps):
+            value = self._values[target]
+            buffer, reused = None, None
+            if kind == 'elementwise':  # may overwrite an argument that is no longer needed
+                reused = next((arg for arg in args if self._replaceable(arg, value, position)
+                               and not (arg in buffer_of and last_use[target] == end)), None)
+            if reused in buffer_of:
+                buffer = buffer_of[target] = buffer_of[reused]
+            elif reused is None and kind != 'call' and last_use[target] != end \
+                    and self._fits(value):
+                spec = (value.shape[1:], value.dtype)
+                if free.get(spec):
+                    buffer = free[spec].pop()
+                else:
+                    buffer = len(specs)
+                    specs.append(spec)
+                buffer_of[target] = buffer
+            if kind != 'call':
+                owned.add(target)
+            for arg in set(args):
+                if arg in buffer_of and last_use[arg] == position and arg != reused:
+                    free.setdefault(specs[buffer_of[arg]], []).append(buffer_of[arg])
+            if buffer is not None:
+                steps.append((replay, args, kwargs, buffer, None, target))
+            else:
+                steps.append((func, args, kwargs, None, None if reused in buffer_of else reused,
+                              target))
+
+        initial = [self._values[slot] if slot in self._constants else None
+                   for slot in range(len(self._values))]
+        return _Plan(kernel, initial, steps, result.index, specs)
+
+    def _replaceable(self, slot, value, position):
+        """Whether the array in `slot` may be overwritten by `value`, as
+        numpy does for temporaries: it is newly allocated or a buffer, not
+        used after `position` and has the same shape, type and memory layout"""
+        array = self._values[slot]
+        return slot in self._owned and self._last_use[slot] == position \
+            and isinstance(array, np.ndarray) and isinstance(value, np.ndarray) \
+            and array.shape == value.shape and array.dtype == value.dtype \
+            and array.strides == value.strides
+
+    def _fits(self, value):
+        """Whether `value` can be computed in a buffer: an array with one row
+        per input row, in the memory layout numpy chose for it as well"""
+        return isinstance(value, np.ndarray) and value.ndim > 0 \
+            and len(value) == self._num_rows and value.flags.c_contiguous
+
+
+_fast_powers = {2: np.square, 0.5: np.sqrt, -1: np.reciprocal, 1: np.positive}
+
+
+def _where(condition, x, y, out):
+    np.copyto(out, y)
+    np.copyto(out, x, where=condition)
+    return out
+
+
+def _value(value):
+    return value.value if isinstance(value, _Traced) else value
+
+
+class _Traced:
+    """Array in a kernel that is being recorded, see :class:`_Tracer`"""
+
+    __slots__ = ('tracer', 'index', 'value')
+
+    def __init__(self, tracer, index, value):
+        self.tracer = tracer
+        self.index = index
+        self.value = value
+
+    @property
+    def shape(self):
+        return self.value.shape
+
+    @property
+    def ndim(self):
+        return self.value.ndim
+
+    @property
+    def dtype(self):
+        return self.value.dtype
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, key):
+        return self.tracer.apply('call', operator.getitem, self, key)
+
+    def __neg__(self):
+        return self.tracer.apply('elementwise', np.negative, self)
+
+    def __add__(self, other):
+        return self.tracer.apply('elementwise', np.add, self, other)
+
+    def __radd__(self, other):
+        return self.tracer.apply('elementwise', np.add, other, self)
+
+    def __sub__(self, other):
+        return self.tracer.apply('elementwise', np.subtract, self, other)
+
+    def __rsub__(self, other):
+        return self.tracer.apply('elementwise', np.subtract, other, self)
+
+    def __mul__(self, other):
+        return self.tracer.apply('elementwise', np.multiply, self, other)
+
+    def __rmul__(self, other):
+        return self.tracer.apply('elementwise', np.multiply, other, self)
+
+    def __truediv__(self, other):
+        return self.tracer.apply('elementwise', np.true_divide, self, other)
+
+    def __rtruediv__(self, other):
+        return self.tracer.apply('elementwise', np.true_divide, other, self)
+
+    def __pow__(self, other):
+        return self.tracer.power(self, other)
+
+    def __rpow__(self, other):
+        return self.tracer.apply('elementwise', np.power, other, self)
+
+    def __matmul__(self, other):
+        return self.tracer.apply('buffered', np.matmul, self, other)
+
+    def __rmatmul__(self, other):
+        return self.tracer.apply('buffered', np.matmul, other, self)
+
+    def __lt__(self, other):
+        return self.tracer.apply('elementwise', np.less, self, other)
+
+    def __le__(self, other):
+        return self.tracer.apply('elementwise', np.less_equal, self, other)
+
+    def __gt__(self, other):
+        return self.tracer.apply('elementwise', np.greater, self, other)
+
+    def __ge__(self, other):
+        return self.tracer.apply('elementwise', np.greater_equal, self, other)
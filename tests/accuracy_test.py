@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+accuracy_test.py: tests for chunked surrogate accuracy
+"""
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.accuracy import AccuracyStatistics, surrogate_accuracy
+from mf2.design import uniform_chunks
+
+
+def _expected(y_true, y_pred):
+    errors = np.abs(y_pred - y_true)
+    return {
+        'rmse': np.sqrt(np.mean(errors**2)),
+        'mae': np.mean(errors),
+        'r2': 1 - np.sum(errors**2) / np.sum((y_true - np.mean(y_true))**2),
+        'max_error': np.max(errors),
+    }
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+@pytest.mark.parametrize("func", [mf2.branin, mf2.hartmann6, mf2.adjustable.paciorek(0.3)],
+                         ids=lambda f: f.name)
+def test_matches_full_evaluation(func, concurrent):
+    """Low fidelity as surrogate of the high fidelity, compared in full"""
+    n = 20_000
+    report = surrogate_accuracy(func.low, func, 'high', n, seed=5, chunk_size=3000,
+                                concurrent=concurrent)
+
+    X = np.concatenate(list(uniform_chunks(func, n, seed=5)))
+    y_true, y_pred = func.high(X), func.low(X)
+    expected = _expected(y_true, y_pred)
+    assert report.num_points == n
+    for measure, value in expected.items():
+        assert getattr(report, measure) == pytest.approx(value, rel=1e-9)
+    errors = np.abs(y_pred - y_true)
+    for q, value in report.quantiles.items():
+        assert value == pytest.approx(np.quantile(errors, q))  # sample holds all errors
+
+
+def test_custom_design():
+    chunks = [np.random.uniform(size=(100, 2)) for _ in range(3)]
+    report = surrogate_accuracy(mf2.currin.high, mf2.currin, design=chunks)
+    assert report.num_points == 300
+    assert report.rmse == 0
+    assert report.r2 == 1
+
+
+def test_sampled_quantiles():
+    n = 200_000
+    statistics = AccuracyStatistics(sample_size=20_000, seed=0)
+    rng = np.random.default_rng(1)
+    for _ in range(10):
+        y_true = rng.uniform(size=n // 10)
+        statistics.update(y_true, y_true + rng.uniform(-1, 1, size=n // 10))
+    assert len(statistics.reservoir.sample) == 20_000
+    # absolute errors are uniform on [0, 1]
+    np.testing.assert_allclose(statistics.quantile([0.1, 0.5, 0.9]), [0.1, 0.5, 0.9], atol=0.02)
+
+
+def test_r2_is_numerically_stable():
+    """Large offset of the true values should not affect R^2"""
+    rng = np.random.default_rng(2)
+    y_true = rng.normal(size=10_000)
+    y_pred = y_true + rng.normal(scale=0.1, size=10_000)
+    expected = AccuracyStatistics()
+    expected.update(y_true, y_pred)
+    offset = AccuracyStatistics()
+    for start in range(0, 10_000, 1000):
+        rows = slice(start, start+1000)
+        offset.update(y_true[rows] + 1e9, y_pred[rows] + 1e9)
+    assert offset.r2 == pytest.approx(expected.r2, rel=1e-6)
+
+
+def test_invalid_input():
+    statistics = AccuracyStatistics()
+    with pytest.raises(ValueError):
+        statistics.update(np.zeros(3), np.zeros(4))
+    with pytest.raises(ValueError):
+        statistics.report()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+additive_test.py: tests for the scalable additive and Trid functions
+"""
+
+import pickle
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.additive import additive
+
+
+_base_functions = [
+    mf2.forrester,
+    mf2.branin,
+    mf2.six_hump_camelback,
+    mf2.himmelblau,
+    mf2.hartmann6,
+    mf2.adjustable.paciorek(0.5),
+]
+
+
+@pytest.mark.parametrize("base", _base_functions, ids=lambda f: f.name)
+def test_additive_is_sum_of_blocks(base):
+    num_blocks = 5
+    func = additive(base, base.ndim * num_blocks)
+    X = np.random.uniform(func.l_bound, func.u_bound, size=(20, func.ndim))
+
+    assert func.ndim == base.ndim * num_blocks
+    for fidelity, base_fidelity in zip(func.functions, base.functions):
+        expected = sum(base_fidelity(block) for block in np.split(X, num_blocks, axis=1))
+        assert np.allclose(fidelity(X), expected)
+        assert fidelity.point(X[0]) == pytest.approx(expected[0])
+
+
+def test_additive_optimum():
+    func = additive(mf2.branin, ndim=1000)
+    assert func.ndim == 1000
+    assert np.allclose(func.x_opt, np.tile(mf2.branin.x_opt, 500))
+    assert func.high(func.x_opt)[0] == pytest.approx(500 * mf2.branin.high(mf2.branin.x_opt)[0])
+
+
+@pytest.mark.parametrize("ndim", [0, 3, -2])
+def test_additive_invalid_ndim(ndim):
+    with pytest.raises(ValueError):
+        additive(mf2.branin, ndim)
+
+
+def test_additive_can_be_pickled():
+    func = additive(mf2.himmelblau, ndim=10)
+    x = np.random.uniform(func.l_bound, func.u_bound, size=(5, 10))
+    restored = pickle.loads(pickle.dumps(func.low))
+    assert np.allclose(restored(x), func.low(x))
+
+
+@pytest.mark.parametrize("func", [
+    additive(mf2.branin, ndim=2000),
+    mf2.adjustable.Trid(2000)(0.5),
+], ids=lambda f: f.name)
+def test_memory_linear_in_input(func):
+    X = np.random.uniform(func.l_bound, func.u_bound, size=(100, func.ndim))
+    for fidelity in func.functions:
+        fidelity(X)
+        tracemalloc.start()
+        try:
+            fidelity(X)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak <= 8 * X.nbytes
+
+
+@pytest.mark.parametrize("ndim", [1, 2, 10, 100])
+def test_trid_optimum(ndim):
+    func = mf2.adjustable.Trid(ndim)
+    assert func.ndim == ndim
+    assert np.all(func.u_bound == ndim**2)
+    assert np.all(func.l_bound == -ndim**2)
+    f_opt = -ndim * (ndim+4) * (ndim-1) / 6
+    assert func.high(func.x_opt)[0] == pytest.approx(f_opt)
+
+
+def test_trid_10d_is_default():
+    func = mf2.adjustable.Trid(10)
+    assert np.allclose(func.x_opt, mf2.adjustable.trid.x_opt)
+    assert np.allclose(func.correlation_table, mf2.adjustable.trid.correlation_table)
+    assert mf2.adjustable.Trid(20).correlation_table is None
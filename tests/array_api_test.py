@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+array_api_test.py: tests for evaluation on arrays of other array API libraries
+"""
+
+from itertools import chain
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.additive import additive
+from mf2.multi_fidelity_function import Columns
+
+
+_functions = list(chain(
+    mf2.bi_fidelity_functions,
+    (f(0.5) for f in mf2.adjustable.bi_fidelity_functions),
+    [additive(mf2.branin, ndim=6), mf2.invert(mf2.currin)],
+))
+
+
+def _sample(func, n=20):
+    return np.random.uniform(func.l_bound, func.u_bound, size=(n, func.ndim))
+
+
+@pytest.mark.parametrize("func", _functions, ids=lambda f: f.name)
+def test_array_api_strict(func):
+    xp = pytest.importorskip('array_api_strict')
+    X = _sample(func)
+
+    for fidelity in func.functions:
+        y = fidelity(xp.asarray(X))
+        assert isinstance(y, type(xp.asarray(0.)))
+        assert y.shape == (len(X),)
+        assert np.allclose(np.asarray(y), fidelity(X))
+
+
+def test_array_api_strict_single_point_and_columns():
+    xp = pytest.importorskip('array_api_strict')
+    X = _sample(mf2.borehole, n=5)
+    expected = mf2.borehole.high(X)
+
+    assert np.allclose(np.asarray(mf2.borehole.high(xp.asarray(X[0]))), expected[:1])
+    columns = Columns(*(xp.asarray(column) for column in X.T))
+    assert np.allclose(np.asarray(mf2.borehole.high(columns)), expected)
+
+
+@pytest.mark.parametrize("func", _functions, ids=lambda f: f.name)
+def test_dask(func):
+    da = pytest.importorskip('dask.array')
+    pytest.importorskip('array_api_compat')
+    X = _sample(func, n=100)
+
+    for fidelity in func.functions:
+        y = fidelity(da.from_array(X, chunks=(25, -1)))
+        assert isinstance(y, da.Array)
+        assert np.allclose(y.compute(), fidelity(X))
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+"""
+cache_test.py: tests for the cross-process shared evaluation cache
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import pickle
+import sqlite3
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.cache import SharedCache
+
+
+def _sample(func, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(func.l_bound, func.u_bound, size=(n, func.ndim))
+
+
+class CountingFunction:
+
+    def __init__(self, func):
+        self.func = func
+        self.rows = 0
+
+    def __call__(self, X):
+        self.rows += len(X)
+        return self.func(X)
+
+
+def _counted(mff):
+    return mf2.MultiFidelityFunction(
+        mff.name, mff.u_bound, mff.l_bound,
+        [CountingFunction(f) for f in mff.functions],
+        fidelity_names=mff.fidelity_names,
+    )
+
+
+def test_values_are_unchanged(tmp_path):
+    cache = SharedCache(tmp_path / 'cache.sqlite')
+    cached = cache.wrap(mf2.hartmann6)
+    X = _sample(mf2.hartmann6, 50)
+    for fidelity in ('high', 'low'):
+        np.testing.assert_array_equal(cached[fidelity](X), mf2.hartmann6[fidelity](X))
+        np.testing.assert_array_equal(cached[fidelity](X), mf2.hartmann6[fidelity](X))
+    assert cached.high.point(X[0]) == mf2.hartmann6.high.point(X[0])
+
+
+def test_only_missing_points_are_evaluated(tmp_path):
+    counted = _counted(mf2.borehole)
+    cache = SharedCache(tmp_path / 'cache.sqlite')
+    cached = cache.wrap(counted)
+    X = _sample(mf2.borehole, 20)
+
+    cached.high(X[:10])
+    assert counted.high.rows == 10
+    y = cached.high(X)
+    assert counted.high.rows == 20
+    np.testing.assert_array_equal(y, mf2.borehole.high(X))
+    assert (cache.hits, cache.misses) == (10, 20)
+    assert cache.hit_rate == pytest.approx(1/3)
+    assert len(cache) == 20
+
+
+def test_duplicates_evaluated_once(tmp_path):
+    counted = _counted(mf2.branin)
+    cached = SharedCache(tmp_path / 'cache.sqlite').wrap(counted)
+    X = np.repeat(_sample(mf2.branin, 3), 4, axis=0)
+    np.testing.assert_array_equal(cached.low(X), mf2.branin.low(X))
+    assert counted.low.rows == 3
+
+
+def test_keys_separate_fidelities_and_a(tmp_path):
+    cache = SharedCache(tmp_path / 'cache.sqlite')
+    X = _sample(mf2.branin, 5)
+    for a in (0.1, 0.9):
+        func = mf2.adjustable.branin(a)
+        cached = cache.wrap(func)
+        np.testing.assert_array_equal(cached.low(X), func.low(X))
+        np.testing.assert_array_equal(cached.high(X), func.high(X))
+    assert len(cache) == 20
+
+
+def test_keys_separate_transforms(tmp_path):
+    cache = SharedCache(tmp_path / 'cache.sqlite')
+    X = _sample(mf2.branin, 5)
+    np.testing.assert_array_equal(cache.wrap(mf2.branin).high(X), mf2.branin.high(X))
+    inverted = mf2.invert(mf2.branin)
+    np.testing.assert_array_equal(cache.wrap(inverted).high(X), inverted.high(X))
+    assert len(cache) == 10
+
+
+def test_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(mf2.cache, 'evict_fraction', 0.6)
+    counted = _counted(mf2.booth)
+    cache = SharedCache(tmp_path / 'cache.sqlite', max_entries=10)
+    cached = cache.wrap(counted)
+    X = _sample(mf2.booth, 12)
+
+    cached.high(X[:8])
+    cached.high(X[:2])  # recently used, so kept
+    cached.high(X[8:])
+    assert len(cache) == 6
+    assert cache.stats()['evicted'] == 6
+
+    counted.high.rows = 0
+    cached.high(X[:2])
+    cached.high(X[8:])
+    assert counted.high.rows == 0
+
+
+def test_lookups_do_not_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(mf2.cache, 'flush_interval', 60)
+    cache = SharedCache(tmp_path / 'cache.sqlite', timeout=0.1)
+    cached = cache.wrap(mf2.branin)
+    X = _sample(mf2.branin, 5)
+    cached.high(X)
+
+    writer = sqlite3.connect(tmp_path / 'cache.sqlite', isolation_level=None)
+    writer.execute('BEGIN IMMEDIATE')  # another process holds the write lock
+    np.testing.assert_array_equal(cached.high(X), mf2.branin.high(X))
+    writer.execute('ROLLBACK')
+    writer.close()
+
+    other = SharedCache(tmp_path / 'cache.sqlite')
+    assert other.stats()['hits'] == 0
+    cache.flush()
+    assert other.stats() == {'hits': 5, 'misses': 5, 'evicted': 0}
+
+
+def test_clear(tmp_path):
+    cache = SharedCache(tmp_path / 'cache.sqlite')
+    cache.wrap(mf2.currin).high(_sample(mf2.currin, 5))
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'evicted': 0}
+
+
+def test_pickle(tmp_path):
+    cache = SharedCache(tmp_path / 'cache.sqlite', max_entries=100)
+    cached = cache.wrap(mf2.branin)
+    X = _sample(mf2.branin, 5)
+    cached.high(X)
+
+    restored = pickle.loads(pickle.dumps(cached.high))
+    np.testing.assert_array_equal(restored(X), mf2.branin.high(X))
+    assert restored.cache.hits == 5
+    assert restored.cache.max_entries == 100
+
+
+def _evaluate_in_worker(cache, seed):
+    X = _sample(mf2.hartmann6, 40, seed=seed % 2)
+    return cache.wrap(mf2.hartmann6).high(X)
+
+
+def test_shared_between_processes(tmp_path):
+    cache = SharedCache(tmp_path / 'cache.sqlite')
+    with ProcessPoolExecutor(4) as pool:
+        results = list(pool.map(_evaluate_in_worker, [cache]*8, range(8)))
+
+    for seed, y in enumerate(results):
+        np.testing.assert_array_equal(y, mf2.hartmann6.high(_sample(mf2.hartmann6, 40, seed % 2)))
+    assert len(cache) == 80
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == 8 * 40
+    assert stats['hits'] >= 8 * 40 - 4 * 80
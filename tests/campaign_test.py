@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+campaign_test.py: tests for the benchmark campaign runner
+"""
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.campaign import Run, execute, load_results, run_campaign, runs
+
+
+def random_search(func, budget, seed):
+    """Evaluate random points in batches of 5 until the budget runs out"""
+    rng = np.random.default_rng(seed)
+    best = np.inf
+    while True:
+        X = rng.uniform(func.l_bound, func.u_bound, size=(5, func.ndim))
+        func.low(X)
+        best = min(best, np.min(func.high(X)))
+
+
+def fixed_evaluations(func, budget, seed):
+    """Evaluate 3 high and 2 low fidelity points, well within budget"""
+    X = np.random.default_rng(seed).uniform(func.l_bound, func.u_bound, size=(3, func.ndim))
+    func.high(X)
+    func.low.point(X[0])
+    func.low(X[1:2])
+    return 42
+
+
+def failing(func, budget, seed):
+    raise RuntimeError("optimizer bug")
+
+
+def test_runs():
+    campaign_runs = runs([mf2.branin, mf2.adjustable.paciorek(0.2),
+                          (mf2.adjustable.branin, [0, 0.5])],
+                         seeds=range(3), budgets=[10, 20])
+    assert len(campaign_runs) == 4 * 3 * 2
+    assert Run('branin', None, 0, 10.0) in campaign_runs
+    assert Run('adjustable.paciorek', 0.2, 2, 20.0) in campaign_runs
+    assert Run('adjustable.branin', 0.5, 1, 10.0) in campaign_runs
+
+
+def test_runs_full_suite():
+    campaign_runs = runs(list(mf2.bi_fidelity_functions) +
+                         [(f, [0.5]) for f in mf2.adjustable.bi_fidelity_functions],
+                         seeds=[0], budgets=[1])
+    assert len(campaign_runs) == len(mf2.bi_fidelity_functions) + len(mf2.adjustable.bi_fidelity_functions)
+
+
+@pytest.mark.parametrize("func", [
+    mf2.adjustable.branin,
+    mf2.invert(mf2.branin),
+    mf2.Forrester(ndim=3),
+], ids=lambda f: f.name)
+def test_runs_invalid_function(func):
+    with pytest.raises(ValueError):
+        runs([func], seeds=[0], budgets=[1])
+
+
+def test_execute_cost_accounting():
+    result = execute(fixed_evaluations, Run('branin', None, 0, 100.0), costs={'high': 1, 'low': 0.25})
+    assert result['status'] == 'ok'
+    assert (result['evaluations_high'], result['evaluations_low']) == (3, 2)
+    assert result['cost'] == 3.5
+    assert result['result'] == 42
+    assert result['best_high'] <= mf2.branin.high(
+        np.random.default_rng(0).uniform(mf2.branin.l_bound, mf2.branin.u_bound, size=(3, 2)))[0]
+
+
+@pytest.mark.parametrize("name", ['branin', 'currin'])
+def test_execute_best_high(name):
+    func = mf2.registry.get(name).build()
+    result = execute(fixed_evaluations, Run(name, None, 0, 100.0))
+    y = func.high(np.random.default_rng(0).uniform(func.l_bound, func.u_bound, size=(3, 2)))
+    assert result['best_high'] == (np.max(y) if func.maximize else np.min(y))
+
+
+def test_execute_budget_exhausted():
+    result = execute(random_search, Run('adjustable.branin', 0.5, 1, 31.0), costs={'high': 1, 'low': 0.2})
+    assert result['status'] == 'budget'
+    assert result['cost'] <= 31
+    assert (result['evaluations_high'], result['evaluations_low']) == (25, 30)
+    assert np.isfinite(result['best_high'])
+    assert np.isnan(result['result'])
+
+
+def test_execute_error():
+    result = execute(failing, Run('booth', None, 0, 10.0))
+    assert result['status'] == 'error'
+    assert 'optimizer bug' in result['error']
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_run_campaign(tmp_path, processes):
+    campaign_runs = runs([mf2.booth, (mf2.adjustable.paciorek, [0.1, 0.9])],
+                         seeds=range(4), budgets=[12, 24])
+    executed = run_campaign(random_search, campaign_runs, tmp_path, processes=processes, flush_every=5)
+    assert executed == len(campaign_runs)
+
+    results = load_results(tmp_path)
+    assert len(results['function']) == len(campaign_runs)
+    assert set(results['status']) == {'budget'}
+    assert np.all(results['cost'] <= results['budget'])
+    assert len(list(tmp_path.glob('results-*.npz'))) == 5
+
+
+def test_run_campaign_continues(tmp_path):
+    campaign_runs = runs([mf2.booth, mf2.currin], seeds=range(5), budgets=[10])
+    assert run_campaign(random_search, campaign_runs[:4], tmp_path, processes=0) == 4
+    assert run_campaign(random_search, campaign_runs, tmp_path, processes=0) == 6
+    assert run_campaign(random_search, campaign_runs, tmp_path, processes=0) == 0
+
+    results = load_results(tmp_path)
+    assert sorted(zip(results['function'], results['seed'])) == \
+        sorted((run.function, run.seed) for run in campaign_runs)
+
+
+def test_results_are_reproducible(tmp_path):
+    campaign_runs = runs([mf2.himmelblau], seeds=[3], budgets=[20])
+    run_campaign(random_search, campaign_runs, tmp_path / 'first', processes=0)
+    run_campaign(random_search, campaign_runs, tmp_path / 'second', processes=0)
+    first, second = load_results(tmp_path / 'first'), load_results(tmp_path / 'second')
+    assert first['best_high'] == second['best_high']
+
+
+def test_load_empty(tmp_path):
+    assert len(load_results(tmp_path)['function']) == 0
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+chunking_test.py: tests for evaluation within a memory budget
+"""
+
+from itertools import chain
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2 import chunking, workspace
+from mf2.additive import additive
+from mf2.chunking import chunked, evaluate
+from mf2.multi_fidelity_function import Columns
+
+
+def _sample(func, n):
+    return np.random.uniform(func.l_bound, func.u_bound, size=(n, func.ndim))
+
+
+def _peak_memory(func, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+@pytest.mark.parametrize("func", list(chain(
+    mf2.bi_fidelity_functions,
+    (f(0.5) for f in mf2.adjustable.bi_fidelity_functions),
+    [mf2.Forrester(ndim=20), mf2.adjustable.Trid(50)(0.5),
+     mf2.invert(mf2.currin), additive(mf2.branin, ndim=20)],
+)), ids=lambda f: f.name)
+def test_declared_memory_per_row(func):
+    """Declared bytes_per_row must cover the actual peak memory of a call"""
+    n = 10_000
+    X = _sample(func, n)
+    for fidelity in func.functions:
+        assert getattr(fidelity, 'bytes_per_row', None) is not None
+        fidelity(X)
+        assert _peak_memory(fidelity, X) <= n * chunking.bytes_per_row(fidelity, func.ndim)
+
+
+@pytest.mark.parametrize("func,fidelity", [
+    (mf2.hartmann6, 'high'),
+    (mf2.hartmann6, 'low'),
+    (mf2.currin, 'low'),
+    (mf2.borehole, 'high'),
+    (mf2.adjustable.hartmann3(0.5), 'high'),
+    (mf2.adjustable.hartmann3(0.5), 'low'),
+])
+def test_peak_memory_within_budget(func, fidelity):
+    n = 200_000
+    max_memory = 4 * 2**20
+    X = _sample(func, n)
+    evaluate(func[fidelity], X[:10], max_memory=max_memory)  # warm-up
+
+    assert _peak_memory(func[fidelity], X) > max_memory
+    assert _peak_memory(evaluate, func[fidelity], X, max_memory=max_memory) <= max_memory
+    assert np.allclose(evaluate(func[fidelity], X, max_memory=max_memory), func[fidelity](X))
+
+
+@pytest.mark.parametrize("fidelity", ['high', 'low'])
+def test_small_blocks_within_budget(fidelity):
+    func = mf2.adjustable.hartmann3(0.5)[fidelity]
+    n = 200_000
+    max_memory = 8*n + 2000*chunking.bytes_per_row(func, 3)  # blocks of 2000 rows
+    X = _sample(mf2.adjustable.hartmann3(0.5), n)
+    evaluate(func, X[:10], max_memory=max_memory)  # warm-up
+    assert _peak_memory(evaluate, func, X, max_memory=max_memory) <= max_memory
+
+
+def test_columnar_input():
+    X = _sample(mf2.park91a, 1000)
+    columns = Columns(*X.T.copy())
+    y = evaluate(mf2.park91a.low, columns, max_memory=20_000)
+    assert np.allclose(y, mf2.park91a.low(X))
+
+
+def test_block_sizes():
+    func = mf2.hartmann6.high
+    workspace.workspace().clear()
+    assert chunking.block_size(func, 1000, 6) == 1000
+    assert chunking.block_size(func, 1000, 6, max_memory=8000 + 10*400) == 10
+    assert chunking.block_size(func, 10**6, 6, cache_blocks=True) == chunking.l2_cache_size // 400
+    with pytest.raises(ValueError):
+        chunking.block_size(func, 1000, 6, max_memory=8000)
+
+
+def test_workspace_within_budget():
+    func = mf2.hartmann6.high
+    ws = workspace.workspace()
+    ws.clear()
+    ws.empty('retained', 100)
+    assert chunking.block_size(func, 1000, 6, max_memory=8000 + 10*400) == 8
+    assert ws.nbytes == 800
+
+    ws.empty('retained', 300)  # more than half of the budget
+    assert chunking.block_size(func, 1000, 6, max_memory=8000 + 10*400) == 10
+    assert ws.nbytes == 0
+
+
+def test_global_default(monkeypatch):
+    calls = []
+
+    def func(xx):
+        calls.append(len(xx))
+        return mf2.branin.high(xx)
+    func.bytes_per_row = 100
+
+    X = _sample(mf2.branin, 100)
+    monkeypatch.setattr(chunking, 'default_max_memory', 800 + 10*100)
+    wrapped = chunked(mf2.MultiFidelityFunction('test', mf2.branin.u_bound, mf2.branin.l_bound,
+                                                [func], fidelity_names=['high']))
+    assert np.allclose(wrapped.high(X), mf2.branin.high(X))
+    assert calls == [10]*10
+    assert wrapped.high.point(X[0]) == pytest.approx(mf2.branin.high(X[0])[0])
+
+
+def test_fallback_memory_per_row():
+    assert chunking.bytes_per_row(lambda x: x, ndim=3) == 8 * chunking.fallback_floats_per_dim * 3
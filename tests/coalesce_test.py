@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+coalesce_test.py: tests for merging concurrent calls into batches
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+import time
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.coalesce import coalesce, CoalescedFunction
+from mf2.handles import handle
+
+
+class CountingFunction:
+    """Records the number of points in every call"""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = []
+
+    def __call__(self, xx):
+        xx = np.atleast_2d(xx)
+        self.calls.append(len(xx))
+        return self.func(xx)
+
+
+def test_coalesced_values_match():
+    coalesced = coalesce(mf2.hartmann6, window=0)
+    X = np.random.uniform(mf2.hartmann6.l_bound, mf2.hartmann6.u_bound, size=(10, 6))
+
+    assert coalesced.name == mf2.hartmann6.name
+    assert coalesced.fidelity_names == mf2.hartmann6.fidelity_names
+    assert np.allclose(coalesced.high(X), mf2.hartmann6.high(X))
+    assert np.allclose(coalesced['low'](X), mf2.hartmann6.low(X))
+    assert coalesced.high.point(X[0]) == pytest.approx(mf2.hartmann6.high.point(X[0]))
+
+
+def test_concurrent_calls_are_batched():
+    n_threads = 16
+    counter = CountingFunction(mf2.hartmann6.high)
+    coalesced = CoalescedFunction(counter, window=5, max_batch=n_threads)
+    X = np.random.uniform(mf2.hartmann6.l_bound, mf2.hartmann6.u_bound, size=(n_threads, 6))
+    barrier = Barrier(n_threads)
+
+    def evaluate(x):
+        barrier.wait()
+        return coalesced.point(x)
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        results = list(pool.map(evaluate, X))
+
+    # batch is closed as soon as it is full, long before the window ends
+    assert counter.calls == [n_threads]
+    assert np.allclose(results, mf2.hartmann6.high(X))
+
+
+def test_batches_are_split_at_max_batch():
+    counter = CountingFunction(mf2.forrester.high)
+    coalesced = CoalescedFunction(counter, window=0.05, max_batch=4)
+    X = np.random.rand(20, 1)
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(coalesced, X))
+
+    assert max(counter.calls) <= 4
+    assert sum(counter.calls) == 20
+    assert np.allclose(np.concatenate(results), mf2.forrester.high(X))
+
+
+def test_multi_point_calls_get_own_rows():
+    coalesced = CoalescedFunction(mf2.branin.high, window=0.05)
+    X = np.random.uniform(mf2.branin.l_bound, mf2.branin.u_bound, size=(30, 2))
+    chunks = np.split(X, [1, 5, 6, 20])
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        results = list(pool.map(coalesced, chunks))
+
+    for chunk, result in zip(chunks, results):
+        assert np.allclose(result, mf2.branin.high(chunk))
+
+
+def test_errors_reach_every_caller():
+    def failing(xx):
+        raise RuntimeError("evaluation failed")
+
+    coalesced = CoalescedFunction(failing, window=0.05)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(coalesced, [0.5]) for _ in range(4)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+
+
+def test_invalid_input_fails_only_its_caller():
+    coalesced = coalesce(mf2.branin, window=0.05)
+    inputs = [[0.5, 0.5], [0.5, 0.5, 0.5], ['a', 'b'], [0.2, 0.8]]
+    with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+        futures = [pool.submit(coalesced.high, x) for x in inputs]
+
+    for future in [futures[1], futures[2]]:
+        with pytest.raises(ValueError):
+            future.result()
+    for future, x in [(futures[0], inputs[0]), (futures[3], inputs[3])]:
+        assert np.allclose(future.result(), mf2.branin.high(x))
+
+
+def test_failed_batch_is_evaluated_per_caller():
+    def fails_for_negative(xx):
+        if np.any(xx < 0):
+            raise RuntimeError("negative input")
+        return xx.sum(axis=1)
+
+    counter = CountingFunction(fails_for_negative)
+    coalesced = CoalescedFunction(counter, window=5, max_batch=4)
+    inputs = [[1.0], [-1.0], [2.0], [3.0]]
+    barrier = Barrier(len(inputs))
+
+    def evaluate(x):
+        barrier.wait()
+        return coalesced(x)
+
+    with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+        futures = [pool.submit(evaluate, x) for x in inputs]
+
+    assert counter.calls == [4, 1, 1, 1, 1]
+    with pytest.raises(RuntimeError):
+        futures[1].result()
+    assert [futures[i].result()[0] for i in [0, 2, 3]] == [1.0, 2.0, 3.0]
+
+
+def test_single_caller_does_not_wait():
+    coalesced = CoalescedFunction(mf2.forrester.high, window=0.5)
+    coalesced([0.5])  # waits, as there is no previous batch yet
+    start = time.perf_counter()
+    for x in np.random.rand(10, 1):
+        coalesced(x)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_handle_of_coalesced_function():
+    coalesced = coalesce(mf2.invert(mf2.adjustable.branin(0.5)))
+    assert handle(coalesced, 'low') == handle(mf2.invert(mf2.adjustable.branin(0.5)), 'low')
+
+
+@pytest.mark.parametrize("kwargs", [{'window': -1}, {'max_batch': 0}])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        coalesce(mf2.branin, **kwargs)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+continuous_test.py: tests for evaluation at continuous fidelity levels
+"""
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.continuous import continuous
+
+
+def _sample(func, n=50):
+    return np.random.uniform(func.l_bound, func.u_bound, size=(n, func.ndim))
+
+
+@pytest.mark.parametrize("mff", mf2.bi_fidelity_functions, ids=lambda f: f.name)
+def test_interpolated_levels(mff):
+    func = continuous(mff)
+    X = _sample(mff)
+    t = np.random.rand(len(X))
+    t[:5], t[5:10] = 0, 1
+
+    expected = t * mff.high(X) + (1-t) * mff.low(X)
+    assert np.allclose(func(X, t), expected)
+    assert np.allclose(func(X, 0), mff.low(X))
+    assert np.allclose(func(X, 1), mff.high(X))
+
+
+@pytest.mark.parametrize("mff", mf2.adjustable.bi_fidelity_functions, ids=lambda f: f.name)
+def test_adjustable_levels(mff):
+    func = continuous(mff)
+    X = _sample(mff)
+    t = np.random.rand(len(X))
+    t[:5] = 1
+
+    y = func(X, t)
+    assert np.allclose(y[:5], mff.high(X[:5]))
+    expected = [mff(a).low(x)[0] for a, x in zip(func.a(t[5:]), X[5:])]
+    assert np.allclose(y[5:], expected)
+
+
+def test_default_a_range_increases_correlation():
+    func = continuous(mf2.adjustable.branin)
+    assert func.a_range == (1, -0.5)
+    assert func.a(0) == 1
+
+
+def test_discrete_levels():
+    func = continuous(mf2.branin, levels=3)
+    X = _sample(mf2.branin, n=4)
+    t = np.array([0.1, 0.4, 0.6, 0.9])
+
+    assert np.allclose(func.fidelity_levels(t), [0, 0.5, 0.5, 1])
+    assert np.allclose(func(X, t), continuous(mf2.branin)(X, [0, 0.5, 0.5, 1]))
+
+
+@pytest.mark.parametrize("kwargs", [
+    {'levels': 1},
+    {'a_range': (0, 1)},
+])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        continuous(mf2.branin, **kwargs)
+
+
+def test_invalid_levels():
+    func = continuous(mf2.branin)
+    with pytest.raises(ValueError):
+        func(_sample(mf2.branin, n=2), [0.5, 1.5])
+
+
+def test_requires_bi_fidelity():
+    from mf2.forrester import forrester_sf
+    with pytest.raises(ValueError):
+        continuous(forrester_sf)
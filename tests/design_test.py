@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+"""
+design_test.py: tests for chunked test designs
+"""
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.design import uniform_chunks
+
+
+@pytest.mark.parametrize("func", [mf2.branin, mf2.borehole, mf2.Forrester(ndim=7)], ids=lambda f: f.name)
+def test_uniform_chunks_within_bounds(func):
+    chunks = list(uniform_chunks(func, 1000, chunk_size=300, seed=1))
+    assert [len(X) for X in chunks] == [300, 300, 300, 100]
+    X = np.concatenate(chunks)
+    assert X.shape == (1000, func.ndim)
+    assert np.all(X >= func.l_bound) and np.all(X <= func.u_bound)
+
+
+def test_uniform_chunks_independent_of_chunk_size():
+    full = np.concatenate(list(uniform_chunks(mf2.hartmann6, 1000, chunk_size=1000, seed=7)))
+    chunked = np.concatenate(list(uniform_chunks(mf2.hartmann6, 1000, chunk_size=37, seed=7)))
+    np.testing.assert_array_equal(full, chunked)
+
+
+def test_uniform_chunks_seeded():
+    first, = uniform_chunks(mf2.booth, 10, seed=3)
+    second, = uniform_chunks(mf2.booth, 10, seed=3)
+    other, = uniform_chunks(mf2.booth, 10, seed=4)
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, other)
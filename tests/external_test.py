@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+external_test.py: tests for fidelities evaluated by external processes
+"""
+
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.external import ExternalFunction, WorkerError, serve
+from mf2.multi_fidelity_function import Columns
+
+_repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_worker_script = """
+import os, sys, time
+sys.path.insert(0, {repository!r})
+import numpy as np
+from mf2.external import serve
+
+mode, marker = sys.argv[1], sys.argv[2]
+
+def first_time():
+    if os.path.exists(marker):
+        return False
+    open(marker, 'w').close()
+    return True
+
+def func(X):
+    if mode == 'hang' and first_time():
+        time.sleep(30)
+    if mode == 'crash' and first_time():
+        os._exit(3)
+    if mode == 'invalid':
+        print('not a number', flush=True)
+    return np.sum(X**2, axis=1)
+
+if mode == 'deaf' and first_time():
+    time.sleep(30)  # does not read its input
+serve(func)
+"""
+
+
+@pytest.fixture
+def command(tmp_path):
+    script = tmp_path / 'worker.py'
+    script.write_text(_worker_script.format(repository=_repository))
+    return lambda mode='normal': [sys.executable, str(script), mode, str(tmp_path / f'{mode}.marker')]
+
+
+def _sample(n, ndim=3):
+    return np.random.uniform(-1, 1, size=(n, ndim))
+
+
+@pytest.mark.parametrize("protocol", ['stdin', 'files'])
+@pytest.mark.parametrize("workers,batch_size", [(1, 1000), (3, 7)])
+def test_evaluate(command, protocol, workers, batch_size):
+    X = _sample(50)
+    with ExternalFunction(command(), workers=workers, batch_size=batch_size,
+                          protocol=protocol) as func:
+        np.testing.assert_array_equal(func(X), np.sum(X**2, axis=1))  # exact round trip
+        np.testing.assert_array_equal(func(X[:0]), np.empty(0))
+        assert func.point(X[0]) == np.sum(X[0]**2)
+
+
+def test_in_multi_fidelity_function(command):
+    with ExternalFunction(command(), workers=2, batch_size=10) as high:
+        func = mf2.MultiFidelityFunction('external', [1, 1, 1], [-1, -1, -1],
+                                         [high, mf2.Forrester(3).low],
+                                         fidelity_names=['high', 'low'])
+        X = _sample(25)
+        np.testing.assert_array_equal(func.high(X), np.sum(X**2, axis=1))
+        np.testing.assert_array_equal(func.high(Columns(X[:, 0], X[:, 1], X[:, 2])), np.sum(X**2, axis=1))
+        y = func.evaluate_mixed(X, [0, 1] * 12 + [0])
+        np.testing.assert_allclose(y[::2], np.sum(X[::2]**2, axis=1))
+
+
+def test_workers_are_persistent(command):
+    with ExternalFunction(command(), workers=2) as func:
+        pids = {worker.process.pid for worker in func._all}
+        for _ in range(5):
+            func(_sample(10))
+        assert {worker.process.pid for worker in func._all} == pids
+
+
+def test_timeout_and_retry(command):
+    with ExternalFunction(command('hang'), timeout=1, retries=1) as func:
+        X = _sample(5)
+        start = time.monotonic()
+        np.testing.assert_array_equal(func(X), np.sum(X**2, axis=1))
+        assert time.monotonic() - start < 10
+
+
+def test_timeout_without_retry(command):
+    with ExternalFunction(command('hang'), timeout=0.5, retries=0) as func:
+        with pytest.raises(TimeoutError):
+            func(_sample(5))
+        X = _sample(5)  # worker was restarted
+        np.testing.assert_array_equal(func(X), np.sum(X**2, axis=1))
+
+
+def test_timeout_while_sending(command):
+    X = _sample(10_000)  # larger than the buffer of the pipe
+    with ExternalFunction(command('deaf'), timeout=1, retries=0, batch_size=len(X)) as func:
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            func(X)
+        assert time.monotonic() - start < 10
+        np.testing.assert_array_equal(func(X), np.sum(X**2, axis=1))
+
+
+def test_crash_and_retry(command):
+    with ExternalFunction(command('crash'), retries=1) as func:
+        X = _sample(5)
+        np.testing.assert_array_equal(func(X), np.sum(X**2, axis=1))
+
+
+def test_invalid_reply(command):
+    with ExternalFunction(command('invalid'), retries=1) as func:
+        with pytest.raises(WorkerError):
+            func(_sample(2))
+
+
+def test_worker_replaced_after_unexpected_error(command, monkeypatch):
+    evaluate = mf2.external._Worker.evaluate
+    def fail_once(self, *args):
+        monkeypatch.setattr(mf2.external._Worker, 'evaluate', evaluate)
+        raise ValueError("could not convert string to float")
+
+    with ExternalFunction(command(), workers=1, retries=1) as func:
+        pid = func._all[0].process.pid
+        monkeypatch.setattr(mf2.external._Worker, 'evaluate', fail_once)
+        with pytest.raises(ValueError):
+            func(_sample(2))
+        assert func._idle.qsize() == 1
+        assert func._all[0].process.pid != pid
+        X = _sample(5)
+        np.testing.assert_array_equal(func(X), np.sum(X**2, axis=1))
+
+
+def test_pickle(command):
+    with ExternalFunction(command(), workers=2, batch_size=3) as func:
+        with pickle.loads(pickle.dumps(func)) as copy:
+            X = _sample(10)
+            np.testing.assert_array_equal(copy(X), func(X))
+            assert copy.batch_size == 3
+
+
+def test_close_stops_workers(command):
+    func = ExternalFunction(command(), workers=2)
+    processes = [worker.process for worker in func._all]
+    func.close()
+    assert all(process.poll() is not None for process in processes)
+    assert all(process.stdin.closed and process.stdout.closed for process in processes)
+
+
+def test_replaced_workers_are_released(command):
+    with ExternalFunction(command('crash'), retries=1) as func:
+        process = func._all[0].process
+        func(_sample(5))
+        assert process not in [worker.process for worker in func._all]
+        assert process.stdin.closed and process.stdout.closed
+
+
+def test_serve(tmp_path):
+    import io
+    stdin = io.StringIO('1.0 2.0\n3.0 0.5\n\n-1 -1\n\n')
+    stdout = io.StringIO()
+    serve(lambda X: X.sum(axis=1), stdin, stdout)
+    assert stdout.getvalue().split() == ['3.0', '3.5', '-2.0']
+
+
+@pytest.mark.parametrize("kwargs", [{'protocol': 'http'}, {'workers': 0}])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        ExternalFunction([sys.executable, '-c', 'pass'], **kwargs)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+grid_test.py: tests for evaluation on tensor grids
+"""
+
+from itertools import chain
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2 import grid
+from mf2.additive import additive
+from mf2.chunking import chunked
+from mf2.coalesce import coalesce
+
+
+def _axes(func, n):
+    """Axes of different lengths to catch transposed results, up to 4D"""
+    extra = range(func.ndim) if func.ndim <= 4 else [0] * func.ndim
+    return [np.linspace(l, u, n + i) for i, l, u in zip(extra, func.l_bound, func.u_bound)]
+
+
+def _meshgrid_evaluate(fidelity, axes):
+    mesh = np.meshgrid(*axes, indexing='ij')
+    X = np.stack([x.ravel() for x in mesh], axis=1)
+    return fidelity(X).reshape(mesh[0].shape)
+
+
+def _peak_memory(func, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+@pytest.mark.parametrize("func", list(chain(
+    mf2.bi_fidelity_functions,
+    (f(0.5) for f in mf2.adjustable.bi_fidelity_functions),
+    [mf2.Forrester(ndim=3), mf2.invert(mf2.branin), additive(mf2.booth, ndim=4),
+     chunked(mf2.six_hump_camelback), coalesce(mf2.himmelblau)],
+)), ids=lambda f: f.name)
+def test_on_grid_matches_meshgrid(func):
+    n = 3 if func.ndim > 4 else 6
+    axes = _axes(func, n)
+    for fidelity in func.functions:
+        y = fidelity.on_grid(axes)
+        assert y.shape == tuple(len(ax) for ax in axes)
+        np.testing.assert_allclose(y, _meshgrid_evaluate(fidelity, axes), rtol=1e-12, atol=1e-9)
+
+
+def test_on_grid_without_attribute():
+    axes = _axes(mf2.branin, 5)
+    y = grid.on_grid(lambda xx: mf2.branin.high(xx) + 1, axes)
+    np.testing.assert_allclose(y, mf2.branin.high.on_grid(axes) + 1)
+
+
+def test_streamed_in_blocks(monkeypatch):
+    """Blocks that do not align with the grid dimensions give the same result"""
+    monkeypatch.setattr(grid, 'block_memory', 7 * 1000)
+    axes = _axes(mf2.park91a, 4)
+    y = mf2.park91a.high.on_grid(axes)
+    np.testing.assert_allclose(y, _meshgrid_evaluate(mf2.park91a.high, axes))
+
+
+def test_adjustable_on_grid_with_a():
+    axes = _axes(mf2.adjustable.paciorek, 5)
+    low = mf2.adjustable.paciorek.low
+    np.testing.assert_allclose(grid.on_grid(low, axes, a=0.2),
+                               mf2.adjustable.paciorek(0.2).low.on_grid(axes))
+
+
+@pytest.mark.parametrize("func,fidelity,n", [
+    (mf2.Forrester(ndim=4), 'high', 40),
+    (mf2.Forrester(ndim=4), 'low', 40),
+    (mf2.branin, 'high', 1000),
+    (mf2.six_hump_camelback, 'low', 1000),
+    (mf2.park91a, 'high', 30),
+])
+def test_peak_memory(func, fidelity, n):
+    """Grids use a few output-sized arrays at most, no meshgrid of inputs"""
+    axes = _axes(func, n)
+    output_size = 8 * np.prod([len(ax) for ax in axes])
+    func[fidelity].on_grid([ax[:2] for ax in axes])  # warm-up
+    peak = _peak_memory(func[fidelity].on_grid, axes)
+    assert peak <= 3 * output_size + grid.block_memory * 1.1
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+handles_test.py: tests for picklable fidelity handles
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.handles import FidelityHandle, build, handle, handles
+
+
+_derived_functions = [
+    mf2.branin,
+    mf2.invert(mf2.currin),
+    mf2.adjustable.trid(0.3),
+    mf2.invert(mf2.adjustable.branin(0.5)),
+    mf2.invert(mf2.invert(mf2.hartmann6)),
+]
+
+
+@pytest.mark.parametrize("func", _derived_functions, ids=lambda f: f.name)
+def test_handle_matches_function(func):
+    x = np.random.uniform(func.l_bound, func.u_bound, size=(10, func.ndim))
+    for fidelity, fidelity_handle in zip(func.fidelity_names, handles(func)):
+        restored = pickle.loads(pickle.dumps(fidelity_handle))
+        assert restored == fidelity_handle
+        assert np.allclose(restored(x), func[fidelity](x))
+
+
+def test_handle_is_compact():
+    assert len(pickle.dumps(handle(mf2.invert(mf2.adjustable.branin(0.5)), 'low'))) < 150
+
+
+def test_handle_unregistered_function():
+    with pytest.raises(ValueError):
+        handle(mf2.Forrester(ndim=3), 'high')
+
+
+def test_inverted_function_pickles():
+    inverted = mf2.invert(mf2.booth)
+    restored = pickle.loads(pickle.dumps(inverted.high))
+    assert np.allclose(restored([1, 1]), inverted.high([1, 1]))
+
+
+def test_handles_in_spawned_process_pool():
+    low = FidelityHandle('adjustable.paciorek', 'low', a=0.5, transforms=('invert',))
+    chunks = [np.random.uniform(.3, 1, size=(5, 2)) for _ in range(4)]
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as pool:
+        results = list(pool.map(low, chunks))
+
+    expected = mf2.invert(mf2.adjustable.paciorek(0.5)).low
+    for chunk, result in zip(chunks, results):
+        assert np.allclose(result, expected(chunk))
+
+
+def test_build_cache_is_bounded():
+    maxsize = build.cache_info().maxsize
+    assert maxsize is not None
+    for a in np.linspace(0, 1, maxsize + 10):
+        build('adjustable.branin', float(a))
+    assert build.cache_info().currsize == maxsize
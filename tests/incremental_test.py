@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+incremental_test.py: tests for incremental evaluation of coordinate changes
+"""
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2 import incremental as incremental_module
+from mf2.incremental import incremental
+
+
+def _sample(func, n=None):
+    shape = (func.ndim,) if n is None else (n, func.ndim)
+    return np.random.uniform(func.l_bound, func.u_bound, size=shape)
+
+
+def _changed(x, indices, values):
+    candidates = np.repeat(x.reshape(1, -1), len(indices), axis=0)
+    candidates[np.arange(len(indices)), indices] = values
+    return candidates
+
+
+@pytest.mark.parametrize("func", [
+    mf2.Forrester(ndim=1000),
+    mf2.Forrester(ndim=1),
+    mf2.adjustable.Trid(100)(0.3),
+    mf2.adjustable.Trid(2)(0.8),
+    mf2.invert(mf2.adjustable.Trid(10)(0.1)),
+    mf2.branin,
+    mf2.adjustable.paciorek(0.5),
+], ids=lambda f: f.name)
+def test_evaluate_changes(func):
+    x = _sample(func)
+    num_changes = 50
+    indices = np.random.randint(func.ndim, size=num_changes)
+    indices[:2] = [0, func.ndim-1]  # edges of neighbour terms
+    values = _sample(func, num_changes)[np.arange(num_changes), indices]
+
+    for fidelity in func.functions:
+        state = incremental(fidelity, x)
+        expected = fidelity(_changed(x, indices, values))
+        np.testing.assert_allclose(state.evaluate_changes(indices, values), expected,
+                                   rtol=1e-9, atol=1e-9 * np.max(np.abs(expected)))
+
+
+@pytest.mark.parametrize("func", [
+    mf2.Forrester(ndim=5),
+    mf2.adjustable.Trid(5)(0.3),
+    mf2.invert(mf2.adjustable.Trid(5)(0.3)),
+], ids=lambda f: f.name)
+def test_delta_available(func):
+    """Functions with a separable or banded structure avoid full evaluation"""
+    for fidelity in func.functions:
+        assert getattr(fidelity, 'delta', None) is not None
+
+
+@pytest.mark.parametrize("func,fidelity", [
+    (mf2.Forrester(ndim=50), 'low'),
+    (mf2.adjustable.Trid(50)(0.3), 'low'),
+    (mf2.adjustable.Trid(50)(0.3), 'high'),
+    (mf2.currin, 'high'),
+])
+def test_move(func, fidelity):
+    fidelity = func[fidelity]
+    x = np.random.uniform(0, 1, size=func.ndim)
+    state = incremental(fidelity, x)
+    for _ in range(20):
+        index, value = np.random.randint(func.ndim), np.random.uniform(0, 1)
+        new_value = state.move(index, value)
+        x[index] = value
+        assert new_value == pytest.approx(fidelity.point(x))
+        assert state.value == new_value
+    np.testing.assert_array_equal(state.x, x)
+
+
+def test_refresh_interval(monkeypatch):
+    monkeypatch.setattr(incremental_module, 'refresh_interval', 3)
+    state = incremental(mf2.Forrester(ndim=10).high, np.zeros(10))
+    for i in range(3):
+        state.move(i, 0.5)
+    assert state._moves == 0
+    assert state.value == mf2.Forrester(ndim=10).high.point(state.x)
+
+
+def test_base_point_is_copied():
+    x = np.zeros(5)
+    state = incremental(mf2.Forrester(ndim=5).high, x)
+    state.move(0, 1)
+    assert x[0] == 0
+
+
+def test_negative_indices():
+    x = np.random.uniform(size=5)
+    state = incremental(mf2.Forrester(ndim=5).high, x)
+    np.testing.assert_allclose(state.evaluate_changes([-1], [0.3]),
+                               state.evaluate_changes([4], [0.3]))
+
+
+@pytest.mark.parametrize("index,error", [
+    (5, IndexError),
+    (-6, IndexError),
+    (1.5, TypeError),
+])
+def test_invalid_indices(index, error):
+    state = incremental(mf2.Forrester(ndim=5).high, np.zeros(5))
+    with pytest.raises(error):
+        state.evaluate_changes([index], [0.3])
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+instances_test.py: tests for random function instances
+"""
+
+from itertools import chain
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.instances import instance
+
+
+def _sample(func, n):
+    return np.random.uniform(func.l_bound, func.u_bound, size=(n, func.ndim))
+
+
+functions = list(chain(
+    mf2.bi_fidelity_functions,
+    (f(0.5) for f in mf2.adjustable.bi_fidelity_functions),
+    [mf2.Forrester(ndim=20)],
+))
+
+
+@pytest.mark.parametrize("ambient_ndim", [None, 30])
+@pytest.mark.parametrize("func", functions, ids=lambda f: f.name)
+def test_optimum_is_remapped(func, ambient_ndim):
+    if func.x_opt is None:
+        pytest.skip("optimum unknown")
+    inst = instance(func, seed=7, ambient_ndim=ambient_ndim)
+    assert np.all(inst.x_opt >= inst.l_bound) and np.all(inst.x_opt <= inst.u_bound)
+    for inst_fidelity, fidelity in zip(inst.functions, func.functions):
+        expected = fidelity(np.reshape(func.x_opt, (1, -1)))[0] + inst.offset
+        assert inst_fidelity(np.reshape(inst.x_opt, (1, -1)))[0] == pytest.approx(expected)
+        assert inst_fidelity.point(inst.x_opt) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("rotate", [False, True])
+@pytest.mark.parametrize("shift", [False, True])
+@pytest.mark.parametrize("offset", [False, True])
+@pytest.mark.parametrize("ambient_ndim", [None, 12])
+@pytest.mark.parametrize("func", [mf2.branin, mf2.hartmann6, mf2.currin], ids=lambda f: f.name)
+def test_optimum_for_all_flags(func, rotate, shift, offset, ambient_ndim):
+    for seed in range(20):
+        try:
+            inst = instance(func, seed, rotate=rotate, shift=shift, offset=offset,
+                            ambient_ndim=ambient_ndim)
+        except ValueError:
+            assert not shift and (rotate or ambient_ndim)
+            continue
+        assert np.all(inst.x_opt >= inst.l_bound) and np.all(inst.x_opt <= inst.u_bound)
+        expected = func.high(np.reshape(func.x_opt, (1, -1)))[0] + inst.offset
+        assert inst.high(np.reshape(inst.x_opt, (1, -1)))[0] == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("func", [mf2.branin, mf2.park91a, mf2.forrester], ids=lambda f: f.name)
+def test_identity_instance(func):
+    inst = instance(func, seed=1, rotate=False, shift=False, offset=False)
+    X = _sample(func, 20)
+    for inst_fidelity, fidelity in zip(inst.functions, func.functions):
+        np.testing.assert_allclose(inst_fidelity(X), fidelity(X))
+    np.testing.assert_allclose(inst.x_opt, func.x_opt)
+
+
+def test_same_seed_same_instance():
+    first, second = instance(mf2.hartmann6, seed=3), instance(mf2.hartmann6, seed=3)
+    other = instance(mf2.hartmann6, seed=4)
+    X = _sample(mf2.hartmann6, 10)
+    np.testing.assert_array_equal(first.high(X), second.high(X))
+    assert not np.allclose(first.high(X), other.high(X))
+    assert first.functions[0].A is not other.functions[0].A
+
+
+def test_rotation_is_orthogonal_and_cached():
+    from mf2.instances import _rotation
+    R = _rotation(10, 5)
+    np.testing.assert_allclose(R @ R.T, np.eye(10), atol=1e-12)
+    assert _rotation(10, 5) is R
+    assert not R.flags.writeable
+
+
+def test_offset():
+    inst = instance(mf2.booth, seed=2, rotate=False, shift=False)
+    X = _sample(mf2.booth, 10)
+    assert inst.offset != 0
+    assert abs(inst.offset) <= mf2.instances.max_offset
+    np.testing.assert_allclose(inst.low(X), mf2.booth.low(X) + inst.offset)
+
+
+def test_embedding():
+    inst = instance(mf2.branin, seed=9, ambient_ndim=100)
+    assert inst.ndim == 100
+    Z = _sample(inst, 50)
+    y = inst.high(Z)
+    assert y.shape == (50,)
+    # moving orthogonally to the embedded subspace does not change the value
+    A = inst.functions[0].A
+    direction = np.random.standard_normal(100)
+    direction -= A @ np.linalg.lstsq(A, direction, rcond=None)[0]
+    np.testing.assert_allclose(inst.high(Z + 0.01 * direction), y)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        instance(mf2.adjustable.branin, seed=0)
+    with pytest.raises(ValueError):
+        instance(mf2.hartmann6, seed=0, ambient_ndim=3)
@@ -2,7 +2,12 @@ from string import ascii_letters, printable
 
 from hypothesis import given
 from hypothesis.strategies import integers, lists, text
+import numpy as np
+import pytest
 from mf2 import MultiFidelityFunction
+from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction, fidelity_keys, \
+    with_functions
+import mf2
 from pytest import raises, warns
 
 
@@ -58,6 +63,13 @@ def _list_of_strings(n):
 @given(_list_of_strings(100).filter(lambda x: len(x) == len(set(x))))
 def test_access_with_fidelity_names(fidelity_names):
     functions = [lambda x: None for _ in fidelity_names]
+    reference = MultiFidelityFunction('test', [1], [0], functions=None)
+    if any(hasattr(reference, name) for name in fidelity_names):
+        with raises(ValueError):
+            MultiFidelityFunction('test', [1], [0], functions=functions,
+                                  fidelity_names=fidelity_names)
+        return
+
     mff = MultiFidelityFunction(
         'test', [1], [0],
         functions=functions,
@@ -68,6 +80,22 @@ def test_access_with_fidelity_names(fidelity_names):
         assert mff[idx] is mff[name] is getattr(mff, name)
 
 
+@pytest.mark.parametrize("name", ['name', 'ndim', 'f_opt', 'maximize', 'u_bound', 'fidelity_dict',
+                                  'evaluate_mixed'])
+def test_fidelity_name_of_existing_attribute(name):
+    with raises(ValueError):
+        MultiFidelityFunction('test', [1], [0], functions=[lambda x: None, lambda x: None],
+                              fidelity_names=['high', name])
+
+
+def test_adjustable_fidelity_name_of_existing_attribute():
+    with raises(ValueError):
+        AdjustableMultiFidelityFunction(
+            'test', [1], [0], [lambda x: None], [lambda x, a: None],
+            fidelity_names=['high', 'static_functions'],
+        )
+
+
 @given(integers(1, 100))
 def test_access_without_fidelity_names(num_fidelities):
     mff = MultiFidelityFunction(
@@ -87,3 +115,81 @@ def test_access_without_fidelity_names(num_fidelities):
 
     for idx in range(num_fidelities):
         assert mff[idx]() == idx
+
+
+@pytest.mark.parametrize("function", mf2.adjustable.bi_fidelity_functions)
+@pytest.mark.parametrize("correlation", [0.2, 0.5, 0.8, 0.95])
+def test_for_correlation(function, correlation):
+    """Check that the interpolated `a` gives approximately the correlation"""
+    rng = np.random.default_rng(20221014)
+    X = rng.uniform(function.l_bound, function.u_bound, size=(100_000, function.ndim))
+    func = function.for_correlation(correlation)
+    measured = np.corrcoef(func.high(X), func.low(X))[0, 1]
+    assert abs(measured - correlation) < 0.02
+
+
+@pytest.mark.parametrize("function", mf2.adjustable.bi_fidelity_functions)
+def test_for_correlation_out_of_range(function):
+    with raises(ValueError):
+        function.for_correlation(1.1)
+    with raises(ValueError):
+        function.for_correlation(-1.1)
+
+
+def test_for_correlation_without_table():
+    mff = AdjustableMultiFidelityFunction('test', [1], [0], [], [])
+    with raises(ValueError):
+        mff.for_correlation(0.5)
+
+
+@pytest.mark.parametrize("function", mf2.bi_fidelity_functions)
+def test_evaluate_mixed(function):
+    X = np.random.uniform(function.l_bound, function.u_bound, size=(100, function.ndim))
+    fidelity_idx = np.random.randint(2, size=len(X))
+    expected = np.where(fidelity_idx == 0, function.high(X), function.low(X))
+
+    assert np.allclose(function.evaluate_mixed(X, fidelity_idx), expected)
+    names = np.array(function.fidelity_names)[fidelity_idx]
+    assert np.allclose(function.evaluate_mixed(X, names), expected)
+    assert np.allclose(function.evaluate_mixed(X, list(names)), expected)
+
+
+def test_evaluate_mixed_single_fidelity_is_not_copied():
+    X = np.random.rand(10, 1)
+    received = []
+    mff = MultiFidelityFunction('test', [1], [0], [received.append, None],
+                                fidelity_names=['high', 'low'])
+    mff.evaluate_mixed(X, 'high')
+    mff.evaluate_mixed(X, [0]*10)
+    assert all(x is X for x in received)
+
+
+def test_evaluate_mixed_indices_and_names():
+    X = np.random.uniform(mf2.branin.l_bound, mf2.branin.u_bound, size=(4, 2))
+    y = mf2.branin.evaluate_mixed(X, [0, 'low', -1, 'high'])
+    expected = [mf2.branin.high(X[0])[0], mf2.branin.low(X[1])[0],
+                mf2.branin.low(X[2])[0], mf2.branin.high(X[3])[0]]
+    assert np.allclose(y, expected)
+
+
+@pytest.mark.parametrize("fidelity_idx", [2, -3, 'medium', [0, 1, 'medium']])
+def test_evaluate_mixed_invalid_index(fidelity_idx):
+    X = np.random.uniform(mf2.branin.l_bound, mf2.branin.u_bound, size=(3, 2))
+    with raises(IndexError):
+        mf2.branin.evaluate_mixed(X, fidelity_idx)
+
+
+def test_with_functions_keeps_origin():
+    inverted = mf2.invert(mf2.adjustable.branin(0.5))
+    copy = with_functions(inverted, [np.negative, np.positive])
+    assert copy.fidelity_names == inverted.fidelity_names
+    assert np.array_equal(copy.x_opt, inverted.x_opt)
+    assert copy._origin == inverted._origin
+    assert with_functions(mf2.booth, mf2.booth.functions)._origin == (mf2.booth, None, ())
+
+
+def test_fidelity_keys():
+    assert fidelity_keys(mf2.branin) == (['high', 'low'], None, ())
+    assert fidelity_keys(mf2.invert(mf2.adjustable.branin(0.5))) == (['high', 'low'], 0.5, ('invert',))
+    unnamed = MultiFidelityFunction('unnamed', [1], [0], [mf2.forrester.high, mf2.forrester.low])
+    assert fidelity_keys(with_functions(unnamed, unnamed.functions)) == ([0, 1], None, ())
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+optima_test.py: tests for the batched multi-start optimisation
+"""
+
+import numpy as np
+import pytest
+
+from .utils import rescale, ValueRange
+import mf2
+from mf2.optima import find_optimum
+
+
+_known_minima = [
+    (mf2.forrester, -6.020740055767083),
+    (mf2.six_hump_camelback, -1.031628453489877),
+    (mf2.adjustable.hartmann3(0), -3.862779787332663),
+    (mf2.adjustable.trid(0), -210),
+]
+
+
+@pytest.mark.parametrize("function,f_min", _known_minima)
+def test_known_minima(function, f_min):
+    assert np.isclose(function.f_opt, f_min, rtol=1e-8)
+    assert function.optima[0].verified
+
+
+@pytest.mark.parametrize("function", mf2.bi_fidelity_functions)
+def test_optima_not_beaten(function, n_cases=1_000):
+    x = rescale(np.random.rand(n_cases, function.ndim),
+                range_in=ValueRange(0, 1),
+                range_out=ValueRange(*function.bounds))
+
+    sign = -1 if function.maximize else 1
+    assert np.all(sign * function.f_opt <= sign * function.high(x))
+    assert np.all(sign * function.low(function.x_opt_low) <= sign * function.low(x))
+    if function.x_opt is not None:
+        assert sign * function.f_opt <= sign * function.high(function.x_opt)
+
+
+def test_optima_are_cached():
+    func = mf2.Forrester(ndim=2)
+    assert func.optima is func.optima
+
+
+def test_find_optimum_at_bound():
+    opt = find_optimum(lambda x: np.sum(np.atleast_2d(x), axis=1), [1, 2], [3, 4])
+    assert np.allclose(opt.x, [1, 2])
+    assert np.isclose(opt.f, 3)
+
+
+def test_maximum_matches_x_opt():
+    currin = mf2.currin
+    assert currin.maximize
+    assert np.isclose(currin.f_opt, currin.high(currin.x_opt)[0], rtol=1e-8)
+    inverted = mf2.invert(currin)
+    assert not inverted.maximize
+    assert np.isclose(inverted.f_opt, -currin.f_opt, rtol=1e-8)
+
+
+def test_adjustable_optima_need_a():
+    with pytest.raises(ValueError, match="fixed `a`"):
+        mf2.adjustable.branin.optima
+    assert mf2.adjustable.branin(0.5).maximize is False
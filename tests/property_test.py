@@ -20,6 +20,7 @@ import pytest
 
 from .utils import rescale, ValueRange
 import mf2
+from mf2.multi_fidelity_function import Columns
 
 
 def quadratic(xx):
@@ -89,6 +90,7 @@ def test_nd_functions(function, x):
 @given(integers(1, 100))
 @pytest.mark.parametrize("factory", [
     mf2.Forrester,
+    mf2.adjustable.Trid,
 ])
 def test_dimensionality_factory_valid_ndim(factory, ndim):
     func = factory(ndim)
@@ -98,6 +100,7 @@ def test_dimensionality_factory_valid_ndim(factory, ndim):
 @given(integers(max_value=0))
 @pytest.mark.parametrize("factory", [
     mf2.Forrester,
+    mf2.adjustable.Trid,
 ])
 def test_dimensionality_factory_invalid_ndim(factory, ndim):
     with pytest.raises(ValueError):
@@ -127,10 +130,10 @@ def test_invert_currin(x):
 
 
 @given(data())
-@pytest.mark.parametrize("function", chain(
+@pytest.mark.parametrize("function", list(chain(
     mf2.bi_fidelity_functions,
     (f(0.5) for f in mf2.adjustable.bi_fidelity_functions),
-))
+)))
 def test_functions_run_without_error(function, data):
     x = data.draw(ndim_array(function.ndim))
     _test_single_function(function, x)
@@ -150,3 +153,92 @@ def test_x_opt_is_optimum(function, n_cases=1_000):
 
     y_opt = function.high(function.x_opt)
     assert np.all((y_opt - y) < 1e8)
+
+
+@given(data())
+@pytest.mark.parametrize("function", list(chain(
+    mf2.bi_fidelity_functions,
+    (f(0.5) for f in mf2.adjustable.bi_fidelity_functions),
+)))
+def test_columnar_input(function, data):
+    x = data.draw(ndim_array(function.ndim))
+    X = rescale(x, range_in=ValueRange(0, 1), range_out=ValueRange(*function.bounds))
+    names = [f'x{i}' for i in range(1, function.ndim+1)]
+    if function is mf2.borehole:
+        from mf2.borehole import variable_names as names
+    structured = np.empty(len(X), dtype=[(name, float) for name in names])
+    for name, column in zip(names, X.T):
+        structured[name] = column
+
+    for fidelity in function.functions:
+        expected = fidelity(X)
+        assert np.allclose(fidelity(Columns(*X.T.copy())), expected)
+        assert np.allclose(fidelity(dict(zip(names, X.T))), expected)
+        assert np.allclose(fidelity(dict(reversed(list(zip(names, X.T))))), expected)
+        assert np.allclose(fidelity(structured), expected)
+
+
+def test_dataframe_input():
+    pd = pytest.importorskip('pandas')
+    X = rescale(np.random.rand(10, 4), range_in=ValueRange(0, 1),
+                range_out=ValueRange(*mf2.park91a.bounds))
+    df = pd.DataFrame(X, columns=['x1', 'x2', 'x3', 'x4'])
+    assert np.allclose(mf2.park91a.high(df), mf2.park91a.high(X))
+
+
+def test_borehole_named_input():
+    from mf2.borehole import variable_names
+    X = rescale(np.random.rand(10, 8), range_in=ValueRange(0, 1),
+                range_out=ValueRange(*mf2.borehole.bounds))
+    named = {name: X[:, i] for i, name in enumerate(variable_names)}
+    reordered = dict(reversed(list(named.items())))
+    assert np.allclose(mf2.borehole.high(reordered), mf2.borehole.high(X))
+
+
+def test_borehole_misspelled_name():
+    from mf2.borehole import variable_names
+    X = np.tile(mf2.borehole.l_bound, (3, 1))
+    named = {name: X[:, i] for i, name in enumerate(variable_names)}
+    named['kw'] = named.pop('Kw')
+    with pytest.raises(KeyError, match='Kw'):
+        mf2.borehole.high(named)
+
+
+@pytest.mark.parametrize("keys", [['a', 'b'], ['x0', 'x1'], ['x1', 'x2', 'y']])
+def test_unknown_variable_names(keys):
+    X = np.random.rand(3, len(keys))
+    with pytest.raises(KeyError):
+        mf2.booth.high(dict(zip(keys, X.T)))
+
+
+def test_tuple_of_arrays_is_rows():
+    X = np.random.rand(2, 2)
+    assert np.array_equal(mf2.booth.high(tuple(X)), mf2.booth.high(X))
+    with pytest.raises(ValueError):
+        Columns(X)
+
+
+@given(data())
+@pytest.mark.parametrize("function", list(chain(
+    mf2.bi_fidelity_functions,
+    (f(0.5) for f in mf2.adjustable.bi_fidelity_functions),
+    (mf2.invert(f) for f in mf2.bi_fidelity_functions),
+)))
+def test_point_fast_path(function, data):
+    x = data.draw(ndim_array(function.ndim))
+    X = rescale(x, range_in=ValueRange(0, 1), range_out=ValueRange(*function.bounds))
+
+    for fidelity in function.functions:
+        expected = fidelity(X)
+        for row, y in zip(X, expected):
+            for point in (row, tuple(row.tolist()), list(row.tolist())):
+                result = fidelity.point(point)
+                assert isinstance(result, float)
+                assert np.isclose(result, y, rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+def test_evaluate_point_fallback():
+    from mf2.multi_fidelity_function import evaluate_point
+    x = [3.0, 4.0]
+    assert evaluate_point(quadratic, x) == 5.0
+    assert evaluate_point(mf2.branin.high, x) == mf2.branin.high.point(x)
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+recording_test.py: tests for recording and replaying evaluations
+"""
+
+import gc
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.recording import Recorder, Replayer, read_log
+
+
+def _sample(func, n):
+    return np.random.uniform(func.l_bound, func.u_bound, size=(n, func.ndim))
+
+
+@pytest.mark.parametrize("segment_rows", [1, 25, 10_000])
+def test_record_and_replay_in_order(tmp_path, segment_rows):
+    calls = [(mf2.branin, 'high', _sample(mf2.branin, 10)),
+             (mf2.branin, 'low', _sample(mf2.branin, 30)),
+             (mf2.hartmann6, 'low', _sample(mf2.hartmann6, 5)),
+             (mf2.branin, 'high', _sample(mf2.branin, 1))]
+
+    outputs = []
+    with Recorder(tmp_path, segment_rows=segment_rows) as recorder:
+        wrapped = {func: recorder.wrap(func) for func in (mf2.branin, mf2.hartmann6)}
+        for func, fidelity, X in calls:
+            outputs.append(wrapped[func][fidelity](X))
+
+    with Replayer(tmp_path) as replayer:
+        replayed = {func: replayer.wrap(func) for func in (mf2.branin, mf2.hartmann6)}
+        for (func, fidelity, X), y in zip(calls, outputs):
+            np.testing.assert_array_equal(replayed[func][fidelity](X), y)
+        assert replayer.remaining == 0
+
+
+def test_read_log(tmp_path):
+    func = mf2.adjustable.branin(0.25)
+    X = _sample(func, 20)
+    with Recorder(tmp_path) as recorder:
+        y = recorder.wrap(func).low(X)
+        recorder.wrap(func).high.point(X[0])
+
+    evaluations = list(read_log(tmp_path))
+    assert len(evaluations) == 2
+    first, second = evaluations
+    assert (first.function, first.fidelity, first.a) == (func.name, 'low', 0.25)
+    assert first.transforms == ()
+    assert first.X.tobytes() == X.tobytes()
+    assert first.y.tobytes() == y.tobytes()
+    assert second.X.shape == (1, 2)
+    assert first.timestamp <= second.timestamp
+
+
+def test_input_is_copied(tmp_path):
+    X = _sample(mf2.booth, 5)
+    with Recorder(tmp_path) as recorder:
+        recorder.wrap(mf2.booth).high(X)
+        X_original = X.copy()
+        X[:] = 0
+    np.testing.assert_array_equal(next(read_log(tmp_path)).X, X_original)
+
+
+def test_append_to_existing_log(tmp_path):
+    X1, X2 = _sample(mf2.currin, 5), _sample(mf2.currin, 7)
+    with Recorder(tmp_path) as recorder:
+        recorder.wrap(mf2.currin).high(X1)
+    with Recorder(tmp_path) as recorder:
+        recorder.wrap(mf2.currin).low(X2)
+
+    evaluations = list(read_log(tmp_path))
+    assert [e.fidelity for e in evaluations] == ['high', 'low']
+    np.testing.assert_array_equal(evaluations[1].X, X2)
+
+
+def test_buffered_until_flush(tmp_path):
+    recorder = Recorder(tmp_path, segment_rows=100)
+    recorder.wrap(mf2.booth).high(_sample(mf2.booth, 10))
+    assert list(read_log(tmp_path)) == []
+    recorder.flush()
+    assert len(list(read_log(tmp_path))) == 1
+    recorder.close()
+    with pytest.raises(ValueError):
+        recorder.wrap(mf2.booth).high(_sample(mf2.booth, 1))
+
+
+def test_flushed_when_garbage_collected(tmp_path):
+    recorder = Recorder(tmp_path, segment_rows=100)
+    recorder.wrap(mf2.booth).high(_sample(mf2.booth, 10))
+    del recorder
+    gc.collect()
+    assert len(list(read_log(tmp_path))) == 1
+
+
+def test_truncated_index_line(tmp_path):
+    X1, X2 = _sample(mf2.currin, 5), _sample(mf2.currin, 7)
+    with Recorder(tmp_path) as recorder:
+        recorder.wrap(mf2.currin).high(X1)
+        recorder.flush()
+        recorder.wrap(mf2.currin).high(X1)
+    index = tmp_path / 'index.jsonl'
+    index.write_bytes(index.read_bytes()[:-20])  # interrupted while writing
+    assert len(list(read_log(tmp_path))) == 1
+
+    with Recorder(tmp_path) as recorder:
+        recorder.wrap(mf2.currin).low(X2)
+    evaluations = list(read_log(tmp_path))
+    assert [e.fidelity for e in evaluations] == ['high', 'low']
+    np.testing.assert_array_equal(evaluations[1].X, X2)
+
+
+def test_replay_by_hash(tmp_path):
+    X = _sample(mf2.park91a, 50)
+    with Recorder(tmp_path) as recorder:
+        y = recorder.wrap(mf2.park91a).high(X)
+
+    order = np.random.permutation(50)[:20]
+    with Replayer(tmp_path, match='hash') as replayer:
+        replayed = replayer.wrap(mf2.park91a)
+        np.testing.assert_array_equal(replayed.high(X[order]), y[order])
+        np.testing.assert_array_equal(replayed.high(X[order]), y[order])  # repeatable
+        assert replayed.high.point(X[3]) == y[3]
+        with pytest.raises(KeyError):
+            replayed.low(X[:1])
+        with pytest.raises(KeyError):
+            replayed.high(X[:1] + 1e-12)
+
+
+def test_replay_mismatch(tmp_path):
+    X = _sample(mf2.booth, 5)
+    with Recorder(tmp_path) as recorder:
+        recorder.wrap(mf2.booth).high(X)
+
+    with Replayer(tmp_path) as replayer:
+        replayed = replayer.wrap(mf2.booth)
+        with pytest.raises(ValueError):
+            replayed.low(X)
+        with pytest.raises(ValueError):
+            replayed.high(X[:4])
+        replayed.high(X)
+        with pytest.raises(ValueError):
+            replayed.high(X)  # log exhausted
+
+
+@pytest.mark.parametrize("match", ['order', 'hash'])
+def test_transforms_are_distinguished(tmp_path, match):
+    inverted = mf2.invert(mf2.branin)
+    X = _sample(mf2.branin, 10)
+    with Recorder(tmp_path) as recorder:
+        y = recorder.wrap(inverted).high(X)
+
+    evaluation, = read_log(tmp_path)
+    assert evaluation.transforms == ('invert',)
+    with Replayer(tmp_path, match=match) as replayer:
+        with pytest.raises(KeyError if match == 'hash' else ValueError):
+            replayer.wrap(mf2.branin).high(X)
+        np.testing.assert_array_equal(replayer.wrap(inverted).high(X), y)
+
+
+def test_replay_does_not_evaluate(tmp_path):
+    calls = []
+    def counting(xx):
+        calls.append(len(xx))
+        return mf2.booth.high(xx)
+    func = mf2.MultiFidelityFunction('counting', mf2.booth.u_bound, mf2.booth.l_bound,
+                                     [counting], fidelity_names=['high'])
+    X = _sample(func, 8)
+    with Recorder(tmp_path) as recorder:
+        recorder.wrap(func).high(X)
+    with Replayer(tmp_path) as replayer:
+        replayer.wrap(func).high(X)
+    assert calls == [8]
+
+
+def test_invalid_match(tmp_path):
+    with pytest.raises(ValueError):
+        Replayer(tmp_path, match='nearest')
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+reductions_test.py: tests for streaming reductions over large designs
+"""
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.chunking import chunked
+from mf2.design import uniform_chunks
+from mf2.reductions import ArgMin, Histogram, Quantiles, Reservoir, TopK, argmin, \
+    histogram, quantiles, reduce, top_k
+
+
+def _design(func, n=10_000, chunk_size=999, seed=3):
+    return list(uniform_chunks(func, n, chunk_size, seed))
+
+
+@pytest.mark.parametrize("workers", [None, 1, 4])
+@pytest.mark.parametrize("func", [mf2.borehole, mf2.branin, mf2.hartmann6], ids=lambda f: f.name)
+def test_matches_full_evaluation(func, workers):
+    design = _design(func)
+    X = np.concatenate(design)
+    y = func.high(X)
+
+    best = argmin(func.high, design, workers=workers)
+    assert best.index == np.argmin(y)
+    assert best.y == y.min()
+    np.testing.assert_array_equal(best.x, X[np.argmin(y)])
+
+    top = top_k(func.high, design, 10, workers=workers)
+    np.testing.assert_array_equal(top.index, np.argsort(y, kind='stable')[:10])
+    np.testing.assert_array_equal(top.y, np.sort(y)[:10])
+    np.testing.assert_array_equal(top.x, X[top.index])
+
+    largest = top_k(func.high, design, 5, largest=True, workers=workers)
+    np.testing.assert_array_equal(largest.y, np.sort(y)[::-1][:5])
+
+    edges = np.linspace(y.min(), y.max(), 21)
+    counts, result_edges = histogram(func.high, design, 20, (y.min(), y.max()), workers=workers)
+    np.testing.assert_array_equal(counts, np.histogram(y, edges)[0])
+    np.testing.assert_array_equal(result_edges, edges)
+
+    q = [0.1, 0.5, 0.99]
+    np.testing.assert_allclose(quantiles(func.high, design, q, workers=workers), np.quantile(y, q))
+
+
+def test_single_pass_for_multiple_reducers():
+    calls = []
+    def counting(X):
+        calls.append(len(X))
+        return mf2.park91a.low(X)
+    design = _design(mf2.park91a, 2_000, 500)
+    best, top, (counts, _), q = reduce(counting, design, ArgMin(), TopK(3),
+                                       Histogram(10, (0, 10)), Quantiles(0.5))
+    assert calls == [500] * 4
+    assert best.y == top.y[0]
+
+
+def test_ties_keep_earliest():
+    design = [np.zeros((5, 2)), np.zeros((5, 2))]
+    constant = lambda X: np.ones(len(X))
+    assert argmin(constant, design).index == 0
+    np.testing.assert_array_equal(top_k(constant, design, 7).index, np.arange(7))
+
+
+def test_nan_values_are_ignored():
+    values = iter([np.array([np.nan, 3.0, 1.0]), np.array([np.nan, np.nan, np.nan]), np.array([2.0, np.nan, 0.5])])
+    func = lambda X: next(values)
+    design = [np.zeros((3, 1))] * 3
+    best, top, q = reduce(func, design, ArgMin(), TopK(2), Quantiles([0, 1]))
+    assert (best.y, best.index) == (0.5, 8)
+    np.testing.assert_array_equal(top.index, [8, 2])
+    np.testing.assert_array_equal(q, [0.5, 3.0])
+
+
+@pytest.mark.parametrize("func", [mf2.borehole, mf2.adjustable.branin(0.3), mf2.invert(mf2.currin)],
+                         ids=lambda f: f.name)
+def test_attributes_of_fidelities(func):
+    design = _design(func, 1000, 100)
+    for fidelity in func.fidelity_names:
+        best, expected = func[fidelity].argmin(design), argmin(func[fidelity], design)
+        assert (best.y, best.index) == (expected.y, expected.index)
+        np.testing.assert_array_equal(func[fidelity].top_k(design, 3).y,
+                                      top_k(func[fidelity], design, 3).y)
+        np.testing.assert_array_equal(func[fidelity].histogram(design, 5, (0, 1))[0],
+                                      histogram(func[fidelity], design, 5, (0, 1))[0])
+        np.testing.assert_array_equal(func[fidelity].quantiles(design, [0.5]),
+                                      quantiles(func[fidelity], design, [0.5]))
+
+
+def test_user_functions_not_modified():
+    class Model:
+        def __call__(self, X):
+            return np.sum(X, axis=1)
+
+        def quantiles(self):
+            return 'own method'
+
+    def plain(X):
+        return np.sum(X, axis=1)
+
+    model = Model()
+    func = mf2.MultiFidelityFunction('user', [1, 1], [0, 0], [model, plain],
+                                     fidelity_names=['high', 'low'])
+    assert func.high.quantiles() == 'own method'
+    assert not hasattr(func.high, 'argmin')
+    assert not hasattr(plain, 'argmin')
+    assert hasattr(chunked(func).low, 'argmin')  # wrappers of mf2 do offer them
+
+
+def test_attributes_are_traced():
+    events = []
+    mf2.tracing.enable(events.append)
+    try:
+        mf2.booth.high.argmin(_design(mf2.booth, 100, 10))
+    finally:
+        mf2.tracing.disable()
+        mf2.tracing.remove_hook(events.append)
+    assert sum(event.phase == 'after' for event in events) == 10
+
+
+def test_histogram_out_of_range():
+    reducer = Histogram(2, (0, 1))
+    reducer.update(None, np.array([-1, 0.25, 0.75, 1, 2, 3]), 0, 0)
+    counts, _ = reducer.result()
+    np.testing.assert_array_equal(counts, [1, 2])
+    assert (reducer.below, reducer.above) == (1, 2)
+
+
+def test_deterministic_sample():
+    """The sample depends on the seed and blocks, not on the number of workers"""
+    design = _design(mf2.borehole, 50_000, 5_000)
+    results = [quantiles(mf2.borehole.low, design, [0.25, 0.75], sample_size=1000, workers=workers)
+               for workers in [None, 3, 3]]
+    np.testing.assert_array_equal(results[0], results[1])
+    np.testing.assert_array_equal(results[1], results[2])
+
+
+def test_reservoir_is_uniform():
+    reservoir = Reservoir(10_000, seed=1)
+    for block in range(100):
+        reservoir.add(np.arange(block * 1000, (block+1) * 1000), block)
+    assert len(reservoir.sample) == 10_000
+    assert len(np.unique(reservoir.sample)) == 10_000
+    assert np.mean(reservoir.sample) == pytest.approx(50_000, rel=0.02)
+
+
+def test_invalid_k():
+    with pytest.raises(ValueError):
+        TopK(0)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+registry_test.py: tests for the static function registry
+"""
+
+from itertools import chain
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2 import registry
+from mf2.multi_fidelity_function import AdjustableMultiFidelityFunction
+
+
+@pytest.mark.parametrize("entry", registry.entries, ids=lambda e: e.name)
+def test_metadata_matches_function(entry):
+    func = entry.build()
+    assert func.ndim == entry.ndim
+    assert len(func.functions) == entry.num_fidelities
+    assert tuple(func.fidelity_names) == entry.fidelity_names
+    assert isinstance(func, AdjustableMultiFidelityFunction) == entry.adjustable
+    assert np.array_equal(func.l_bound, entry.l_bound)
+    assert np.array_equal(func.u_bound, entry.u_bound)
+    assert np.array_equal(func.x_opt, entry.x_opt)
+
+
+def test_all_functions_registered():
+    registered = [entry.build() for entry in registry.entries]
+    for func in chain(mf2.bi_fidelity_functions, mf2.adjustable.bi_fidelity_functions):
+        assert any(func is reg for reg in registered)
+
+
+def test_select():
+    selected = registry.select(ndim=2, adjustable=False)
+    assert [entry.name for entry in selected] == [
+        'bohachevsky', 'booth', 'branin', 'currin', 'himmelblau', 'six_hump_camelback'
+    ]
+
+    selected = registry.select(ndim=lambda d: d > 4)
+    assert {entry.name for entry in selected} == {'hartmann6', 'borehole', 'adjustable.trid'}
+
+    with pytest.raises(ValueError):
+        registry.select(dimensionality=2)
+
+
+def test_build_adjustable():
+    func = registry.get('adjustable.paciorek').build(a=0.5)
+    x = np.random.rand(10, 2)*.7 + .3
+    assert np.allclose(func.low(x), mf2.adjustable.paciorek(0.5).low(x))
+
+    with pytest.raises(ValueError):
+        registry.get('booth').build(a=0.5)
+
+
+def test_get_unknown():
+    with pytest.raises(KeyError):
+        registry.get('rosenbrock')
+
+
+def test_import_does_not_build_functions():
+    code = ('import sys, mf2.registry\n'
+            'assert mf2.registry.select(ndim=2)\n'
+            'print(sorted(name for name in sys.modules if name.startswith("mf2")))')
+    result = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True)
+    assert result.stdout.split() == ["['mf2',", "'mf2.registry']"]
+
+
+def test_lazy_attributes():
+    assert mf2.bi_fidelity_functions[0] is mf2.forrester
+    assert 'cache' in dir(mf2)
+    with pytest.raises(AttributeError):
+        mf2.not_a_function
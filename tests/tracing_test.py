@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""
+tracing_test.py: tests for the profiling and tracing hooks
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2 import tracing
+
+_repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_pool_script = """
+import sys
+sys.path.insert(0, {repository!r})
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import mf2
+
+def work(X):
+    return mf2.branin.high(X)
+
+if __name__ == '__main__':
+    X = [[0.5, 0.5]] * 3
+    for _ in range(5):
+        mf2.branin.high(X)
+    context = multiprocessing.get_context(sys.argv[1])
+    with ProcessPoolExecutor(2, mp_context=context) as pool:
+        list(pool.map(work, [X] * 4))
+    for _ in range(2):
+        mf2.branin.high(X)
+"""
+from mf2.branin import branin_hf
+
+
+@pytest.fixture
+def events():
+    events = []
+    tracing.enable(events.append)
+    yield events
+    tracing.disable()
+    tracing.remove_hook(events.append)
+
+
+def test_disabled_tracing_uses_bare_functions():
+    assert not tracing.is_enabled()
+    assert mf2.branin.high is branin_hf
+    assert mf2.branin['high'] is branin_hf
+    assert mf2.branin.functions[0] is branin_hf
+
+
+def test_events(events):
+    X = np.random.uniform(mf2.branin.l_bound, mf2.branin.u_bound, size=(10, 2))
+    y = mf2.branin.high(X)
+
+    assert np.allclose(y, branin_hf(X))
+    before, after = events
+    assert before.phase == 'before' and after.phase == 'after'
+    assert after.function == 'Branin' and after.fidelity == 'high'
+    assert after.shape == (10, 2) and after.dtype == 'float64'
+    assert before.elapsed is None and after.elapsed > 0
+    assert before.start == after.start
+
+
+def test_restored_after_disable(events):
+    assert mf2.branin.high is not branin_hf
+    tracing.disable()
+    assert mf2.branin.high is branin_hf
+    mf2.branin.high([0, 0])
+    assert events == []
+
+
+def test_derived_functions_silent_after_disable(events):
+    X = np.random.rand(3, 2)
+    derived = [mf2.invert(mf2.branin), mf2.coalesce.coalesce(mf2.branin),
+               mf2.chunking.chunked(mf2.branin)]
+    tracing.disable()
+    for func in derived:
+        func.high(X)
+        func.low.point(X[0])
+    assert events == []
+
+
+def test_new_and_derived_functions(events):
+    inverted = mf2.invert(mf2.adjustable.branin(0.5))
+    inverted.low([[0, 0], [1, 1]])
+    inverted.high.point([0, 0])
+
+    # nested call to the original fidelity is not reported separately
+    after = [event for event in events if event.phase == 'after']
+    assert [(event.fidelity, event.shape) for event in after] == [('low', (2, 2)), ('high', (2,))]
+
+
+def test_jsonl_exporter(tmp_path, events):
+    path = tmp_path / 'trace.jsonl'
+    with tracing.JSONLExporter(path) as exporter:
+        tracing.add_hook(exporter)
+        mf2.currin.low(np.random.rand(5, 2))
+        mf2.currin.high(np.random.rand(3, 2))
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r['fidelity'], r['shape']) for r in records] == [('low', [5, 2]), ('high', [3, 2])]
+    assert all(r['elapsed'] > 0 for r in records)
+
+
+def test_chrome_trace_exporter(tmp_path, events):
+    path = tmp_path / 'trace.json'
+    with tracing.ChromeTraceExporter(path) as exporter:
+        tracing.add_hook(exporter)
+        mf2.park91a.high(np.random.rand(5, 4))
+        mf2.park91a.low(np.random.rand(5, 4))
+
+    trace = json.loads(path.read_text())
+    assert [event['name'] for event in trace] == ['Park91A.high', 'Park91A.low']
+    assert all(event['ph'] == 'X' for event in trace)
+
+
+def test_environment_variable(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    env = dict(os.environ, MF2_TRACE=str(path))
+    subprocess.run([sys.executable, '-c', 'import mf2; mf2.hartmann6.low([[0.5]*6]*4)'],
+                   env=env, check=True)
+
+    record, = [json.loads(line) for line in path.read_text().splitlines()]
+    assert record['function'] == 'Hartmann6'
+    assert record['shape'] == [4, 6]
+
+
+def test_import_without_fork(tmp_path):
+    """Platforms such as Windows have no os.register_at_fork"""
+    code = ('import os, sys, concurrent.futures.process  # standard library users of fork\n'
+            f'del os.register_at_fork; sys.path.insert(0, {_repository!r})\n'
+            'import mf2; mf2.branin.high([[0.5, 0.5]])')
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+@pytest.mark.parametrize("start_method", ['spawn', 'fork'])
+@pytest.mark.parametrize("extension", ['.jsonl', '.json'])
+def test_environment_variable_with_process_pool(tmp_path, start_method, extension):
+    script = tmp_path / 'pool.py'
+    script.write_text(_pool_script.format(repository=_repository))
+    path = tmp_path / f'trace{extension}'
+    env = dict(os.environ, MF2_TRACE=str(path))
+    env.pop('MF2_TRACE_PID', None)
+    subprocess.run([sys.executable, str(script), start_method], env=env, check=True)
+
+    def read(trace_file):
+        if extension == '.json':
+            text = trace_file.read_text()  # closing bracket is optional
+            return json.loads(text if text.rstrip().endswith(']') else text + ']')
+        return [json.loads(line) for line in trace_file.read_text().splitlines()]
+
+    assert len(read(path)) == 7
+    worker_files = [f for f in tmp_path.iterdir() if f.name.startswith('trace.') and f != path]
+    assert worker_files
+    assert sum(len(read(f)) for f in worker_files) == 4
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+vectorize_test.py: tests for batch versions of single-point functions
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+import threading
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2.multi_fidelity_function import Columns
+from mf2.vectorize import VectorizedFunction, vectorize
+
+
+def scalar_branin(x):
+    """Single-point function, as a user would write it"""
+    x1, x2 = x
+    return mf2.branin.high.point([x1, x2])
+
+
+def _sample(n):
+    return np.random.uniform(mf2.branin.l_bound, mf2.branin.u_bound, size=(n, 2))
+
+
+@pytest.mark.parametrize("executor", [None, 'thread', 'process'])
+@pytest.mark.parametrize("chunk_size", [None, 1, 7, 1000])
+def test_matches_vectorized(executor, chunk_size):
+    X = _sample(50)
+    with vectorize(scalar_branin, executor=executor, max_workers=2, chunk_size=chunk_size) as func:
+        np.testing.assert_allclose(func(X), mf2.branin.high(X))
+
+
+@pytest.mark.parametrize("num_points", [0, 1, 2])
+def test_small_batches(num_points):
+    X = _sample(num_points)
+    with vectorize(scalar_branin, max_workers=2) as func:
+        y = func(X)
+    assert y.shape == (num_points,)
+    np.testing.assert_allclose(y, mf2.branin.high(X))
+
+
+def test_order_with_varying_durations():
+    """Results are in input order, also if later chunks finish first"""
+    def slow_for_small(x):
+        threading.Event().wait(0.001 * (10 - x[0]))
+        return x[0]
+    X = np.arange(10, dtype=float).reshape(-1, 1)
+    with vectorize(slow_for_small, max_workers=5, chunk_size=1) as func:
+        np.testing.assert_array_equal(func(X), np.arange(10))
+
+
+def test_in_multi_fidelity_function():
+    func = mf2.MultiFidelityFunction(
+        'scalar branin', mf2.branin.u_bound, mf2.branin.l_bound,
+        [vectorize(scalar_branin, max_workers=2), mf2.branin.low],
+        fidelity_names=['high', 'low'],
+    )
+    X = _sample(20)
+    np.testing.assert_allclose(func.high(X), mf2.branin.high(X))
+    assert func.high.point(X[0]) == pytest.approx(mf2.branin.high.point(X[0]))
+    np.testing.assert_allclose(func.high(Columns(X[:, 0], X[:, 1])), mf2.branin.high(X))  # columns
+    func.high.close()
+
+
+def test_shared_executor():
+    with ThreadPoolExecutor(2) as pool:
+        func = vectorize(scalar_branin, executor=pool, chunk_size=3)
+        X = _sample(10)
+        np.testing.assert_allclose(func(X), mf2.branin.high(X))
+        func.close()  # does not shut down the shared pool
+        np.testing.assert_allclose(func(X), mf2.branin.high(X))
+
+
+def test_pickle():
+    func = vectorize(scalar_branin, executor='thread', max_workers=2)
+    X = _sample(5)
+    func(X)
+    copy = pickle.loads(pickle.dumps(func))
+    np.testing.assert_allclose(copy(X), mf2.branin.high(X))
+    func.close()
+    copy.close()
+
+
+def test_errors_propagate():
+    def failing(x):
+        raise RuntimeError("simulator crashed")
+    with vectorize(failing, max_workers=2) as func, pytest.raises(RuntimeError):
+        func(_sample(10))
+
+
+def test_invalid_executor():
+    with pytest.raises(ValueError):
+        VectorizedFunction(scalar_branin, executor='gpu')
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+workspace_test.py: tests for the reusable per-thread scratch buffers
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import mf2
+from mf2 import workspace
+
+
+functions = [mf2.park91a, mf2.borehole, mf2.currin, mf2.hartmann6, mf2.adjustable.hartmann3(0.5)]
+
+
+def _sample(func, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(func.l_bound, func.u_bound, size=(n, func.ndim))
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(workspace, 'min_rows', 2)
+
+
+@pytest.fixture
+def no_workspace(monkeypatch):
+    monkeypatch.setattr(workspace, 'max_rows', 0)
+
+
+def _without_workspace(func, X):
+    max_rows, workspace.max_rows = workspace.max_rows, 0
+    try:
+        return func(X)
+    finally:
+        workspace.max_rows = max_rows
+
+
+@pytest.mark.parametrize('func', functions)
+@pytest.mark.parametrize('fidelity', ['high', 'low'])
+@pytest.mark.parametrize('n', [1, 10, 4096])
+def test_identical_to_plain_evaluation(func, fidelity, n):
+    X = _sample(func, n)
+    expected = _without_workspace(func[fidelity], X)
+    for _ in range(2):  # recorded in the first call, replayed in the second
+        np.testing.assert_array_equal(func[fidelity](X), expected)
+
+
+def test_replayed_for_other_batch_sizes():
+    for n in [100, 30, 200]:
+        X = _sample(mf2.hartmann6, n, seed=n)
+        np.testing.assert_array_equal(mf2.hartmann6.low(X),
+                                      _without_workspace(mf2.hartmann6.low, X))
+
+
+def test_currin_at_zero():
+    X = _sample(mf2.currin, 30)
+    X[::2, 1] = 0
+    for fidelity in ['high', 'low']:
+        for _ in range(2):
+            np.testing.assert_array_equal(mf2.currin[fidelity](X),
+                                          _without_workspace(mf2.currin[fidelity], X))
+
+
+@pytest.mark.parametrize('n', [1, 100])
+def test_hartmann3_with_a_per_row(n):
+    low = mf2.adjustable.hartmann3.adjustable_functions[0]
+    X = _sample(mf2.adjustable.hartmann3(0.5), n)
+    a = np.linspace(0, 1, n)
+    np.testing.assert_array_equal(low(X, a), _without_workspace(lambda X: low(X, a), X))
+
+
+def test_hartmann3_with_other_a():
+    low = mf2.adjustable.hartmann3.adjustable_functions[0]
+    X = _sample(mf2.adjustable.hartmann3(0.5), 50)
+    for a in [0.25, 0.75, 0.25, np.float64(0.75)]:
+        np.testing.assert_array_equal(low(X, a), _without_workspace(lambda X: low(X, a), X))
+
+
+@pytest.mark.parametrize('func', functions)
+def test_outputs_are_not_shared(func):
+    X1, X2 = _sample(func, 50, seed=1), _sample(func, 50, seed=2)
+    y1 = func.high(X1)
+    y1_copy = y1.copy()
+    func.high(X2)
+    func.low(X2)
+    np.testing.assert_array_equal(y1, y1_copy)
+
+
+@pytest.mark.parametrize('func', functions)
+@pytest.mark.parametrize('fidelity', ['high', 'low'])
+def test_uses_workspace(func, fidelity):
+    X = _sample(func, 10)
+    func[fidelity](X)
+    workspace.workspace().clear()
+    func[fidelity](X)
+    assert workspace.workspace().nbytes > 0
+
+
+def test_small_batches_not_in_workspace(monkeypatch):
+    monkeypatch.setattr(workspace, 'min_rows', 100)
+    X = _sample(mf2.park91a, 99)
+    mf2.park91a.low(X)
+    workspace.workspace().clear()
+    mf2.park91a.low(X)
+    assert workspace.workspace().nbytes == 0
+
+
+def test_buffers_are_reused():
+    mf2.borehole.high(_sample(mf2.borehole, 100))
+    workspace.workspace().clear()
+    mf2.borehole.high(_sample(mf2.borehole, 100))
+    nbytes = workspace.workspace().nbytes
+    assert 0 < nbytes <= 4 * 8 * 100  # far fewer buffers than intermediates
+    mf2.borehole.high(_sample(mf2.borehole, 60))
+    mf2.borehole.high(_sample(mf2.borehole, 100))
+    assert workspace.workspace().nbytes == nbytes
+
+
+def test_other_dtype_replaces_buffer():
+    ws = workspace.Workspace()
+    assert ws.empty('mask', 10).dtype == np.float64
+    mask = ws.empty('mask', 10, dtype=bool)
+    assert mask.dtype == bool and mask.shape == (10,)
+    assert ws.nbytes == 10
+
+
+def test_large_batches_not_kept(monkeypatch):
+    monkeypatch.setattr(workspace, 'max_rows', 10)
+    workspace.workspace().clear()
+    X = _sample(mf2.hartmann6, 11)
+    np.testing.assert_array_equal(mf2.hartmann6.high(X),
+                                  _without_workspace(mf2.hartmann6.high, X))
+    assert workspace.workspace().nbytes == 0
+
+
+def test_other_dtypes_not_converted():
+    X = _sample(mf2.park91a, 10).astype(np.float32)
+    assert mf2.park91a.high(X).dtype == np.float32
+
+
+def test_separate_per_thread():
+    def evaluate(seed):
+        X = _sample(mf2.hartmann6, 200, seed)
+        return [mf2.hartmann6.high(X) for _ in range(20)]
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(evaluate, range(8)))
+
+    for seed, outputs in enumerate(results):
+        expected = _without_workspace(mf2.hartmann6.high, _sample(mf2.hartmann6, 200, seed))
+        for y in outputs:
+            np.testing.assert_array_equal(y, expected)
+
+
+def test_disabled(no_workspace):
+    workspace.workspace().clear()
+    mf2.park91a.low(_sample(mf2.park91a, 10))
+    assert workspace.workspace().nbytes == 0